@@ -1,30 +1,156 @@
 """Main Business Analyst Agent that coordinates business analysis tasks."""
-from google.adk.agents import SequentialAgent, LlmAgent
-from .utils.utils import get_env_var
-from .sub_agents.ur_agent.agent import ur_agent
-from .sub_agents.ac_agent.agent import ac_agent
-from .sub_agents.do_agent.agent import do_agent
-from .sub_agents.uc_agent.agent import uc_agent
-
-sequential_agent = SequentialAgent(
-    name="sequential_agent", 
-    sub_agents=[
-        ur_agent,
-        ac_agent,
-        do_agent,
-        uc_agent,
+from google.adk.agents import LlmAgent
+from .models import build_model
+from .documents import extractor_version
+from .documents.extraction import EXTRACTORS
+from .documents.normalization import normalization_fingerprint
+from .config import (
+    PIPELINE_MODES,
+    PIPELINE_MODE,
+    UR_CHUNKING_ENABLED,
+    UR_CHUNK_MAX_TOKENS,
+    UR_CHUNK_CONCURRENCY,
+    UC_RETRIEVAL_ENABLED,
+    UC_RETRIEVAL_TOP_K,
+    UC_RETRIEVAL_MIN_REQUIREMENTS,
+    UC_RETRIEVAL_CONCURRENCY,
+    INCREMENTAL_ANALYSIS_ENABLED,
+    INCREMENTAL_STORE_DIR,
+    STAGE_CACHE_ENABLED,
+    STAGE_CACHE_PATH,
+    STAGE_CACHE_MAX_BYTES,
+    COALESCE_ENABLED,
+    DOCUMENT_NORMALIZATION_ENABLED,
+)
+from .pipeline import (
+    Stage,
+    StageScheduler,
+    StageCache,
+    SQLiteCacheBackend,
+    SingleFlight,
+    ChunkedExtractionAgent,
+    IncrementalAnalysisAgent,
+    ProjectSnapshotStore,
+    ActorScopedUseCaseAgent,
+    DocumentNormalizationAgent,
+)
+from .sub_agents.ur_agent.agent import ur_agent, ur_extraction, ur_direct_extraction
+from .sub_agents.ac_agent.agent import ac_agent, ac_extraction, ac_direct_extraction
+from .sub_agents.do_agent.agent import do_agent, do_extraction, do_direct_extraction
+from .sub_agents.uc_agent.agent import uc_agent, uc_extraction, uc_direct_extraction
+
+if PIPELINE_MODE not in PIPELINE_MODES:
+    raise ValueError(f"Invalid BA_PIPELINE_MODE: {PIPELINE_MODE}. Expected one of {PIPELINE_MODES}")
+
+# In "direct" mode every stage runs its extraction agent straight from the
+# pipeline; both variants write the same output keys.
+DIRECT_MODE = PIPELINE_MODE == "direct"
+
+if UR_CHUNKING_ENABLED:
+    # Large documents: run `ur_extraction` over token-bounded chunks concurrently
+    ur_stage_agent = ChunkedExtractionAgent(
+        name="ur_chunked_extraction",
+        extraction=ur_extraction,
+        input_key="business_analyst_output",
+        output_key="user_requirements_extraction",
+        max_chunk_tokens=UR_CHUNK_MAX_TOKENS,
+        max_concurrency=UR_CHUNK_CONCURRENCY,
+    )
+elif DIRECT_MODE:
+    ur_stage_agent = ur_direct_extraction
+else:
+    ur_stage_agent = ur_agent
+
+if UC_RETRIEVAL_ENABLED:
+    # Large projects: generate use cases per actor from the top-k relevant requirements
+    uc_stage_agent = ActorScopedUseCaseAgent(
+        name="uc_actor_scoped_extraction",
+        extraction=uc_extraction,
+        top_k=UC_RETRIEVAL_TOP_K,
+        min_requirements=UC_RETRIEVAL_MIN_REQUIREMENTS,
+        max_concurrency=UC_RETRIEVAL_CONCURRENCY,
+    )
+elif DIRECT_MODE:
+    uc_stage_agent = uc_direct_extraction
+else:
+    uc_stage_agent = uc_agent
+
+stage_cache = (
+    StageCache(SQLiteCacheBackend(STAGE_CACHE_PATH, STAGE_CACHE_MAX_BYTES))
+    if STAGE_CACHE_ENABLED
+    else None
+)
+
+# Each stage declares the state keys it reads and the key it writes; the
+# scheduler derives the execution order and overlaps independent stages.
+stage_scheduler = StageScheduler(
+    name="stage_scheduler",
+    stages=[
+        Stage(
+            name="ur_extraction",
+            agent=ur_stage_agent,
+            inputs=["business_analyst_output"],
+            output_key="user_requirements_extraction",
+        ),
+        Stage(
+            name="ac_extraction",
+            agent=ac_direct_extraction if DIRECT_MODE else ac_agent,
+            inputs=["user_requirements_extraction"],
+            output_key="ac_agent_output",
+        ),
+        Stage(
+            name="do_extraction",
+            agent=do_direct_extraction if DIRECT_MODE else do_agent,
+            inputs=["user_requirements_extraction"],
+            output_key="do_agent_output",
+        ),
+        Stage(
+            name="uc_extraction",
+            agent=uc_stage_agent,
+            inputs=["user_requirements_extraction", "ac_agent_output", "do_agent_output"],
+            output_key="uc_agent_output",
+        ),
     ],
+    cache=stage_cache,
+    coalescer=SingleFlight() if COALESCE_ENABLED else None,
+    # Uploads are keyed by their bytes; these settings decide the text the stages see
+    document_fingerprint={
+        "extractors": [extractor_version(extractor) for extractor in EXTRACTORS],
+        "normalization": normalization_fingerprint() if DOCUMENT_NORMALIZATION_ENABLED else None,
+    },
+    description="Runs the extraction stages in dependency order"
+)
+
+# Revised documents in the same project only re-run the changed parts
+incremental_analysis = IncrementalAnalysisAgent(
+    name="incremental_analysis",
+    sub_agents=[stage_scheduler],
+    store=ProjectSnapshotStore(INCREMENTAL_STORE_DIR) if INCREMENTAL_ANALYSIS_ENABLED else None,
+    extractors={
+        "user_requirements_extraction": ur_extraction,
+        "ac_agent_output": ac_extraction,
+        "do_agent_output": do_extraction,
+        "uc_agent_output": uc_extraction,
+    },
+    description="Re-runs only the changed parts of revised documents"
+)
+
+# The parsed document is normalized once before any stage reads it
+analysis_pipeline = DocumentNormalizationAgent(
+    name="analysis_pipeline",
+    sub_agents=[incremental_analysis],
+    enabled=DOCUMENT_NORMALIZATION_ENABLED,
     description="Business Analyst Multi-Agent System for comprehensive business analysis"
 )
 
 root_agent = LlmAgent(
     name="business_analyst_root_agent",
-    model=get_env_var("BA_VISTA_COORDINATOR_MODEL"),
+    model=build_model("BA_VISTA_COORDINATOR_MODEL"),
     instruction="""
     You are Business Analyst Coordinator, the main agent responsible for coordinating a structured, multi-step business analysis process.
 
     **HARD CONSTRAINTS**:
-    - Do NOT generate, transform, or explain outputs by yourself, you must use your tools and 'sequential_agent'.
+    - Do NOT generate, transform, or explain outputs by yourself, you must use your tools and 'analysis_pipeline'.
     - Do NOT skip, reorder, or reinterpret steps.
     - Your job is to start the defined workflow, if user input is not clear , ask them if they want to upload file to analyse 
     
@@ -36,22 +162,17 @@ root_agent = LlmAgent(
     If user confirms, you must proceed to ANALYSIS WORKFLOW.
     If user does not confirm, you must restart file workflow.
 
-    **ANALYSIS WORKFLOW ** NOTE: If any of the following outputs already exist in `State`, you MUST return them immediately to the user and use them for subsequent steps. DO NOT re-run the corresponding agents.
+    **ANALYSIS WORKFLOW ** NOTE: If any of the following outputs already exist in `State`, you MUST return them immediately to the user and use them for subsequent steps. `analysis_pipeline` skips every step whose output already exists.
     
-    Pass uploaded content from 'business_analyst_output' to `sequential_agent` to control execution in the following logical order:
-    First, invoke `ur_agent` to extract user requirements, Store the result in `user_requirements_extraction`
-    After 'ur_agent', invoke `ac_agent` to extract actors from `user_requirements_extraction`, Store the result in `ac_agent_output`
-    After 'ac_agent', invoke `do_agent` to extract data objects from `user_requirements_extraction`, Store the result in `do_agent_output` 
-    Finally, you MUST generate use cases as the final step in the ANALYSIS WORKFLOW.
-    To do this, invoke `uc_agent` ONLY using the following contents:
-    - `user_requirements_extraction`
-    - `ac_agent_output`
-    - `do_agent_output`
-    - Store the result in `uc_agent_output`.
-    CAUTION: In the last step of the ANALYSIS WORKFLOW, you MUST call `uc_agent` to generate use cases based on the extracted user requirements, actors, and data objects.
+    Pass uploaded content from 'business_analyst_output' to `analysis_pipeline`. It runs each extraction step as soon as the `State` keys it needs are available:
+    - user requirements are stored in `user_requirements_extraction`
+    - actors are stored in `ac_agent_output`
+    - data objects are stored in `do_agent_output`
+    - use cases are stored in `uc_agent_output`
+    CAUTION: The ANALYSIS WORKFLOW is complete only when `uc_agent_output` is available. You MUST invoke `analysis_pipeline` until use cases are generated based on the extracted user requirements, actors, and data objects.
     """
     ,
-    sub_agents=[sequential_agent],
+    sub_agents=[analysis_pipeline],
     output_key="business_analyst_output",
 
 )
@@ -0,0 +1,13 @@
+"""HTTP API extensions for the Business Analyst FastAPI app."""
+
+from .jobs import JobStore, JobWorkerPool, create_jobs_router
+from .metrics import create_metrics_router
+from .stream import create_stream_router
+
+__all__ = [
+    "JobStore",
+    "JobWorkerPool",
+    "create_jobs_router",
+    "create_metrics_router",
+    "create_stream_router",
+]
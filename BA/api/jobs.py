@@ -0,0 +1,418 @@
+"""
+Asynchronous batch analysis jobs.
+
+Clients submit N documents in one request and get a job id back, then poll the
+job status and fetch the `ur`/`ac`/`do`/`uc` outputs per document. A bounded
+worker pool runs the analysis pipeline, and jobs are persisted in SQLite so
+queued work survives a restart. Several processes can share the database:
+a document is only analysed by the worker that claimed it, and a running
+document is taken over only once its claim has expired.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+from ..config import ARTIFACT_OFFLOAD_BYTES, ARTIFACT_OFFLOAD_ENABLED, ARTIFACT_STORE_PATH
+from ..documents import decode_text, format_pages, get_page_extractor
+from ..pipeline.artifacts import ArtifactStore, OffloadingSessionService
+from ..telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+JOBS_APP_NAME = "ba_jobs"
+JOBS_USER_ID = "ba_jobs"
+
+# Short names used by the API -> session state keys written by the pipeline
+OUTPUT_KEYS = {
+    "ur": "user_requirements_extraction",
+    "ac": "ac_agent_output",
+    "do": "do_agent_output",
+    "uc": "uc_agent_output",
+}
+
+SUPPORTED_EXTENSIONS = {".pdf", ".md", ".txt"}
+
+
+def build_session_service() -> BaseSessionService:
+    """Returns the session service of the API runners, offloading large state values when enabled."""
+    if not ARTIFACT_OFFLOAD_ENABLED:
+        return InMemorySessionService()
+    return OffloadingSessionService(
+        InMemorySessionService(), ArtifactStore(ARTIFACT_STORE_PATH), ARTIFACT_OFFLOAD_BYTES
+    )
+
+
+@traced("parse")
+def document_text(name: str, data: bytes) -> str:
+    """
+    Extracts the text of an uploaded document.
+
+    Args:
+        name: File name, used to pick the reader by extension
+        data: Raw file bytes
+
+    Returns:
+        str: Document text; PDF pages are separated by `--- Page N ---` markers
+    """
+    if name.lower().endswith(".pdf"):
+        return format_pages(get_page_extractor().extract(data, "pypdf"))
+    return decode_text(data)
+
+
+class JobStore:
+    """
+    SQLite persistence for batch jobs and their documents.
+
+    A worker claims a document before analysing it. The claim is a lease of
+    `lease_seconds` that the worker renews while it runs; a 'running' document
+    whose lease has expired (e.g. its process died) can be claimed again.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, project_id TEXT, created_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_documents ("
+                "job_id TEXT NOT NULL, idx INTEGER NOT NULL, name TEXT NOT NULL, "
+                "data BLOB NOT NULL, status TEXT NOT NULL, outputs TEXT, error TEXT, "
+                "updated_at TEXT NOT NULL, worker TEXT, lease_until REAL, "
+                "PRIMARY KEY (job_id, idx))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_documents)")}
+            for column, kind in (("worker", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE job_documents ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def create_job(self, documents: List[Tuple[str, bytes]], project_id: Optional[str] = None) -> str:
+        """Persists a new job with all of its documents queued and returns its id."""
+        job_id = uuid.uuid4().hex
+        now = self._now()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, project_id, created_at) VALUES (?, ?, ?)",
+                (job_id, project_id, now),
+            )
+            conn.executemany(
+                "INSERT INTO job_documents (job_id, idx, name, data, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                [(job_id, idx, name, data, now) for idx, (name, data) in enumerate(documents)],
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job with per-document statuses, or None if it does not exist."""
+        with closing(self._connect()) as conn:
+            job = conn.execute(
+                "SELECT id, project_id, created_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = conn.execute(
+                "SELECT idx, name, status, error, updated_at FROM job_documents "
+                "WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        documents = [
+            {"index": idx, "name": name, "status": status, "error": error, "updated_at": updated_at}
+            for idx, name, status, error, updated_at in rows
+        ]
+        statuses = {document["status"] for document in documents}
+        if statuses <= {"completed", "failed"}:
+            status = "failed" if statuses == {"failed"} else "completed"
+        elif statuses == {"queued"}:
+            status = "queued"
+        else:
+            status = "running"
+        return {
+            "job_id": job[0],
+            "project_id": job[1],
+            "created_at": job[2],
+            "status": status,
+            "documents": documents,
+        }
+
+    def get_outputs(self, job_id: str, index: int) -> Optional[Dict[str, Any]]:
+        """Returns the status and stage outputs of one document, or None if it does not exist."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT name, status, outputs, error FROM job_documents WHERE job_id = ? AND idx = ?",
+                (job_id, index),
+            ).fetchone()
+        if row is None:
+            return None
+        name, status, outputs, error = row
+        return {
+            "job_id": job_id,
+            "index": index,
+            "name": name,
+            "status": status,
+            "error": error,
+            "outputs": json.loads(outputs) if outputs else None,
+        }
+
+    def load_input(self, job_id: str, index: int) -> Tuple[str, bytes, Optional[str]]:
+        """Returns the file name, bytes and project id of a queued document."""
+        with closing(self._connect()) as conn:
+            name, data, project_id = conn.execute(
+                "SELECT d.name, d.data, j.project_id FROM job_documents d "
+                "JOIN jobs j ON j.id = d.job_id WHERE d.job_id = ? AND d.idx = ?",
+                (job_id, index),
+            ).fetchone()
+        return name, data, project_id
+
+    def pending_documents(self) -> List[Tuple[str, int]]:
+        """Returns queued documents and running documents whose lease has expired."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT d.job_id, d.idx FROM job_documents d JOIN jobs j ON j.id = d.job_id "
+                "WHERE d.status = 'queued' OR (d.status = 'running' AND "
+                "(d.lease_until IS NULL OR d.lease_until < ?)) ORDER BY j.created_at, d.idx",
+                (time.time(),),
+            ).fetchall()
+
+    def claim(self, job_id: str, index: int, worker: str) -> bool:
+        """
+        Marks a document as running for `worker` unless another worker holds it.
+
+        Args:
+            job_id: Job id
+            index: Document index within the job
+            worker: Id of the claiming worker
+
+        Returns:
+            bool: True if the document was queued, or running with an expired lease, and is now claimed
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE job_documents SET status = 'running', worker = ?, lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ? AND (status = 'queued' OR (status = 'running' AND "
+                "(lease_until IS NULL OR lease_until < ?)))",
+                (worker, now + self.lease_seconds, self._now(), job_id, index, now),
+            )
+            return cursor.rowcount == 1
+
+    def renew(self, job_id: str, index: int, worker: str) -> bool:
+        """Extends the lease of a document `worker` is running; returns False if the claim was lost."""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE job_documents SET lease_until = ? "
+                "WHERE job_id = ? AND idx = ? AND status = 'running' AND worker = ?",
+                (time.time() + self.lease_seconds, job_id, index, worker),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, job_id: str, index: int, worker: str) -> None:
+        """Puts a document `worker` is running back in the queue, e.g. on shutdown."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE job_documents SET status = 'queued', worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ? AND idx = ? AND status = 'running' AND worker = ?",
+                (self._now(), job_id, index, worker),
+            )
+
+    def set_status(
+        self,
+        job_id: str,
+        index: int,
+        status: str,
+        outputs: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        worker: Optional[str] = None,
+    ) -> None:
+        """Updates the status, outputs and error of one document; with `worker`, only while it holds the claim."""
+        query = (
+            "UPDATE job_documents SET status = ?, outputs = ?, error = ?, updated_at = ?, lease_until = NULL "
+            "WHERE job_id = ? AND idx = ?"
+        )
+        params: List[Any] = [
+            status, json.dumps(outputs) if outputs is not None else None, error, self._now(), job_id, index,
+        ]
+        if worker is not None:
+            query += " AND worker = ?"
+            params.append(worker)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(query, params)
+
+
+class JobWorkerPool:
+    """
+    Runs queued job documents through the analysis pipeline with bounded concurrency.
+
+    Every document is claimed in the store before it runs, so pools in
+    several processes sharing one database never analyse a document twice.
+    """
+
+    def __init__(self, store: JobStore, agent: BaseAgent, concurrency: int):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.runner = Runner(
+            app_name=JOBS_APP_NAME,
+            agent=agent,
+            session_service=build_session_service(),
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Starts the workers and queues unclaimed documents and documents whose lease expired."""
+        self._queue = asyncio.Queue()
+        pending = await asyncio.to_thread(self.store.pending_documents)
+        for job_id, index in pending:
+            self._queue.put_nowait((job_id, index))
+        if pending:
+            logger.info("Queued %d unclaimed job document(s) from the store", len(pending))
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Stops the workers; documents they were running are queued again in the store."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, documents: List[Tuple[str, bytes]], project_id: Optional[str] = None) -> str:
+        """Persists a job and queues its documents; returns the job id."""
+        job_id = await asyncio.to_thread(self.store.create_job, documents, project_id)
+        for index in range(len(documents)):
+            self._queue.put_nowait((job_id, index))
+        return job_id
+
+    async def _work(self) -> None:
+        while True:
+            job_id, index = await self._queue.get()
+            try:
+                if not await asyncio.to_thread(self.store.claim, job_id, index, self.worker_id):
+                    logger.info("Document %d of job %s is claimed by another worker", index, job_id)
+                    continue
+                renewal = asyncio.create_task(self._renew_lease(job_id, index))
+                try:
+                    await self._analyse(job_id, index)
+                except asyncio.CancelledError:
+                    # Hand the document to the next process instead of waiting for the lease to expire
+                    self.store.release(job_id, index, self.worker_id)
+                    raise
+                finally:
+                    renewal.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error(f"Error analysing document {index} of job {job_id}: {error}", exc_info=True)
+                await asyncio.to_thread(
+                    self.store.set_status, job_id, index, "failed", None, str(error), self.worker_id
+                )
+            finally:
+                self._queue.task_done()
+
+    async def _renew_lease(self, job_id: str, index: int) -> None:
+        """Renews the claim on a running document until cancelled."""
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, index, self.worker_id):
+                logger.warning("Lost the claim on document %d of job %s", index, job_id)
+                return
+
+    async def _analyse(self, job_id: str, index: int) -> None:
+        """Runs the pipeline on one claimed document and stores its outputs."""
+        name, data, project_id = await asyncio.to_thread(self.store.load_input, job_id, index)
+        text = await asyncio.to_thread(document_text, name, data)
+
+        state: Dict[str, Any] = {"business_analyst_output": text}
+        if project_id:
+            state["project_id"] = project_id
+        session = await self.runner.session_service.create_session(
+            app_name=JOBS_APP_NAME, user_id=JOBS_USER_ID, state=state
+        )
+        try:
+            message = types.Content(role="user", parts=[types.Part(text=f"Analyse {name}.")])
+            async for _ in self.runner.run_async(
+                user_id=JOBS_USER_ID, session_id=session.id, new_message=message
+            ):
+                pass
+            session = await self.runner.session_service.get_session(
+                app_name=JOBS_APP_NAME, user_id=JOBS_USER_ID, session_id=session.id
+            )
+            outputs = {short: session.state.get(key) for short, key in OUTPUT_KEYS.items()}
+        finally:
+            await self.runner.session_service.delete_session(
+                app_name=JOBS_APP_NAME, user_id=JOBS_USER_ID, session_id=session.id
+            )
+
+        missing = [short for short, value in outputs.items() if value is None]
+        status = "failed" if missing else "completed"
+        error = f"Missing outputs: {', '.join(missing)}" if missing else None
+        await asyncio.to_thread(self.store.set_status, job_id, index, status, outputs, error, self.worker_id)
+
+
+def create_jobs_router(pool: JobWorkerPool) -> APIRouter:
+    """
+    Builds the `/jobs` routes backed by `pool`.
+
+    Args:
+        pool: The worker pool that runs submitted documents
+
+    Returns:
+        APIRouter: Router to include in the FastAPI app
+    """
+    router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+    @router.post("", status_code=202)
+    async def submit_job(
+        files: List[UploadFile] = File(...),
+        project_id: Optional[str] = Form(None),
+    ) -> Dict[str, Any]:
+        documents = []
+        for upload in files:
+            name = upload.filename or "document.txt"
+            if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                raise HTTPException(status_code=400, detail=f"Unsupported file type: {name}")
+            documents.append((name, await upload.read()))
+        job_id = await pool.submit(documents, project_id)
+        return {"job_id": job_id, "status": "queued", "documents": len(documents)}
+
+    @router.get("/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        job = await asyncio.to_thread(pool.store.get_job, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return job
+
+    @router.get("/{job_id}/documents/{index}")
+    async def get_document_outputs(job_id: str, index: int) -> Dict[str, Any]:
+        outputs = await asyncio.to_thread(pool.store.get_outputs, job_id, index)
+        if outputs is None:
+            raise HTTPException(status_code=404, detail=f"Document {index} not found in job {job_id}")
+        return outputs
+
+    return router
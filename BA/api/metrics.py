@@ -0,0 +1,27 @@
+"""
+Prometheus scrape endpoint for stage, model, tool and storage metrics.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..telemetry import REGISTRY
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def create_metrics_router() -> APIRouter:
+    """
+    Builds the `/metrics` route rendering all registered metrics.
+
+    Returns:
+        APIRouter: Router to include in the FastAPI app
+    """
+    router = APIRouter(tags=["metrics"])
+
+    @router.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return router
@@ -0,0 +1,97 @@
+"""
+Server-sent event stream of extracted items for a single analysis.
+
+Each validated requirement, actor, data object and use case is pushed to the
+client as soon as it is complete, instead of after the whole stage output.
+Streaming happens per item in `direct` pipeline mode; in `agent_tool` mode
+items are pushed when each stage finishes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+
+from ..pipeline.streaming import ExtractionItemStream
+from .jobs import OUTPUT_KEYS, SUPPORTED_EXTENSIONS, build_session_service, document_text
+
+logger = logging.getLogger(__name__)
+
+STREAM_APP_NAME = "ba_stream"
+STREAM_USER_ID = "ba_stream"
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def create_stream_router(agent: BaseAgent) -> APIRouter:
+    """
+    Builds the `/analyses/stream` route running `agent` with SSE model streaming.
+
+    Args:
+        agent: The analysis pipeline agent
+
+    Returns:
+        APIRouter: Router to include in the FastAPI app
+    """
+    router = APIRouter(prefix="/analyses", tags=["analyses"])
+    runner = Runner(
+        app_name=STREAM_APP_NAME,
+        agent=agent,
+        session_service=build_session_service(),
+    )
+
+    @router.post("/stream")
+    async def stream_analysis(
+        file: UploadFile = File(...),
+        project_id: Optional[str] = Form(None),
+    ) -> StreamingResponse:
+        name = file.filename or "document.txt"
+        if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {name}")
+        text = await asyncio.to_thread(document_text, name, await file.read())
+        state: Dict[str, Any] = {"business_analyst_output": text}
+        if project_id:
+            state["project_id"] = project_id
+
+        async def events() -> AsyncGenerator[str, None]:
+            session = await runner.session_service.create_session(
+                app_name=STREAM_APP_NAME, user_id=STREAM_USER_ID, state=state
+            )
+            items = ExtractionItemStream()
+            try:
+                message = types.Content(role="user", parts=[types.Part(text=f"Analyse {name}.")])
+                async for event in runner.run_async(
+                    user_id=STREAM_USER_ID,
+                    session_id=session.id,
+                    new_message=message,
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+                ):
+                    for item in items.process(event):
+                        yield _sse(item["type"], item["item"])
+
+                session = await runner.session_service.get_session(
+                    app_name=STREAM_APP_NAME, user_id=STREAM_USER_ID, session_id=session.id
+                )
+                outputs = {short: session.state.get(key) for short, key in OUTPUT_KEYS.items()}
+                yield _sse("complete", {"outputs": outputs})
+            except Exception as error:
+                logger.error(f"Error streaming analysis of {name}: {error}", exc_info=True)
+                yield _sse("error", {"message": str(error)})
+            finally:
+                await runner.session_service.delete_session(
+                    app_name=STREAM_APP_NAME, user_id=STREAM_USER_ID, session_id=session.id
+                )
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return router
@@ -2,6 +2,7 @@
 Configuration settings for the UR agent.
 """
 
+import json
 import os
 from ..utils.utils import get_env_var
 
@@ -21,6 +22,114 @@ AGENT_NAME = "ur_agent"
 AGENT_MODEL = "gemini-2.5-pro-preview-05-06"
 AGENT_OUTPUT_KEY = "last_response"
 
+# Pipeline Settings
+# "agent_tool": each stage is a wrapper agent calling its extraction agent as a tool
+# "direct": each stage calls the schema-constrained extraction agent straight away
+PIPELINE_MODES = ("agent_tool", "direct")
+PIPELINE_MODE = os.environ.get("BA_PIPELINE_MODE", "agent_tool").lower()
+
+# Chunked user requirement extraction for large documents
+UR_CHUNKING_ENABLED = os.environ.get("BA_UR_CHUNKING_ENABLED", "false").lower() in ("1", "true", "yes")
+UR_CHUNK_MAX_TOKENS = int(os.environ.get("BA_UR_CHUNK_MAX_TOKENS", "8000"))
+UR_CHUNK_CONCURRENCY = int(os.environ.get("BA_UR_CHUNK_CONCURRENCY", "4"))
+
+# Feed `uc_agent` a compact, ID-referenced form of the upstream outputs
+UC_COMPACT_CONTEXT = os.environ.get("BA_UC_COMPACT_CONTEXT", "true").lower() in ("1", "true", "yes")
+
+# Per-actor use case generation over the top-k requirements from a local BM25 index
+UC_RETRIEVAL_ENABLED = os.environ.get("BA_UC_RETRIEVAL_ENABLED", "false").lower() in ("1", "true", "yes")
+UC_RETRIEVAL_TOP_K = int(os.environ.get("BA_UC_RETRIEVAL_TOP_K", "20"))
+UC_RETRIEVAL_MIN_REQUIREMENTS = int(os.environ.get("BA_UC_RETRIEVAL_MIN_REQUIREMENTS", "50"))
+UC_RETRIEVAL_CONCURRENCY = int(os.environ.get("BA_UC_RETRIEVAL_CONCURRENCY", "4"))
+
+# Incremental Re-analysis Settings
+INCREMENTAL_ANALYSIS_ENABLED = os.environ.get("BA_INCREMENTAL_ANALYSIS_ENABLED", "false").lower() in ("1", "true", "yes")
+INCREMENTAL_STORE_DIR = os.environ.get("BA_INCREMENTAL_STORE_DIR", os.path.join(".cache", "analyses"))
+
+# Stage Result Cache Settings
+STAGE_CACHE_ENABLED = os.environ.get("BA_STAGE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+STAGE_CACHE_PATH = os.environ.get("BA_STAGE_CACHE_PATH", os.path.join(".cache", "stage_results.sqlite3"))
+STAGE_CACHE_MAX_BYTES = int(os.environ.get("BA_STAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Coalesce identical stage runs of concurrent sessions (same document and configuration)
+COALESCE_ENABLED = os.environ.get("BA_COALESCE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Normalize the parsed document (repeated headers/footers, hyphenation, whitespace) before the stages
+DOCUMENT_NORMALIZATION_ENABLED = os.environ.get("BA_DOCUMENT_NORMALIZATION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# PDF Extraction Settings
+# Worker processes for page-parallel PDF extraction (0 uses all available cores);
+# documents shorter than two ranges of BA_PDF_MIN_PAGES_PER_WORKER pages are extracted inline
+PDF_WORKERS = int(os.environ.get("BA_PDF_WORKERS", "0"))
+PDF_MIN_PAGES_PER_WORKER = int(os.environ.get("BA_PDF_MIN_PAGES_PER_WORKER", "16"))
+
+# Parsed Document Cache Settings
+# Page texts keyed by file SHA-256 and extractor version, shared by all workers
+PARSED_CACHE_ENABLED = os.environ.get("BA_PARSED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PARSED_CACHE_PATH = os.environ.get("BA_PARSED_CACHE_PATH", os.path.join(".cache", "parsed_documents.sqlite3"))
+PARSED_CACHE_MAX_BYTES = int(os.environ.get("BA_PARSED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Parsed Output Store Settings
+# One markdown file per document written by parse_file, indexed by file SHA-256;
+# the oldest outputs are removed past the count, size or age limits (0 disables a limit)
+PARSED_OUTPUT_DIR = os.environ.get("BA_PARSED_OUTPUT_DIR", os.path.join(".cache", "parsed"))
+PARSED_OUTPUT_MAX_DOCUMENTS = int(os.environ.get("BA_PARSED_OUTPUT_MAX_DOCUMENTS", "1000"))
+PARSED_OUTPUT_MAX_BYTES = int(os.environ.get("BA_PARSED_OUTPUT_MAX_BYTES", str(256 * 1024 * 1024)))
+PARSED_OUTPUT_RETENTION_DAYS = float(os.environ.get("BA_PARSED_OUTPUT_RETENTION_DAYS", "30"))
+
+# Upload Store Settings
+# Documents saved by save_document_files_tool, one file per SHA-256 of their
+# bytes; per-session file names are hard links to them
+UPLOAD_STORE_DIR = os.environ.get("BA_UPLOAD_STORE_DIR", os.path.join(".cache", "uploads"))
+
+# Directory Index Settings
+# Document files per directory listed by find_document_files_tool; an unchanged
+# directory is re-stat-ed once its last scan is older than BA_DIRECTORY_INDEX_MAX_AGE seconds
+DIRECTORY_INDEX_PATH = os.environ.get("BA_DIRECTORY_INDEX_PATH", os.path.join(".cache", "directory_index.sqlite3"))
+DIRECTORY_INDEX_MAX_AGE = float(os.environ.get("BA_DIRECTORY_INDEX_MAX_AGE", "30"))
+
+# Artifact Store Settings
+# State values whose JSON encoding reaches BA_ARTIFACT_OFFLOAD_BYTES are kept on
+# disk under BA_ARTIFACT_STORE_PATH; session state only holds a small handle
+ARTIFACT_OFFLOAD_ENABLED = os.environ.get("BA_ARTIFACT_OFFLOAD_ENABLED", "true").lower() in ("1", "true", "yes")
+ARTIFACT_STORE_PATH = os.environ.get("BA_ARTIFACT_STORE_PATH", os.path.join(".cache", "artifacts"))
+ARTIFACT_OFFLOAD_BYTES = int(os.environ.get("BA_ARTIFACT_OFFLOAD_BYTES", str(16 * 1024)))
+
+# Batch Job Settings
+JOBS_DB_PATH = os.environ.get("BA_JOBS_DB_PATH", os.path.join(".cache", "jobs.sqlite3"))
+JOB_CONCURRENCY = int(os.environ.get("BA_JOB_CONCURRENCY", "4"))
+# A running document is handed to another process only after its worker has not
+# renewed the claim for this many seconds
+JOB_LEASE_SECONDS = float(os.environ.get("BA_JOB_LEASE_SECONDS", "300"))
+
+# Model Governor Settings
+# Process-wide limits applied per model name; 0 disables a limit.
+# BA_MODEL_LIMITS overrides them per model, e.g. '{"gemini-2.5-pro": {"requests_per_minute": 150}}'
+MODEL_GOVERNOR_ENABLED = os.environ.get("BA_MODEL_GOVERNOR_ENABLED", "true").lower() in ("1", "true", "yes")
+MODEL_DEFAULT_LIMITS = {
+    "requests_per_minute": float(os.environ.get("BA_MODEL_REQUESTS_PER_MINUTE", "0")),
+    "tokens_per_minute": float(os.environ.get("BA_MODEL_TOKENS_PER_MINUTE", "0")),
+    "max_in_flight": int(os.environ.get("BA_MODEL_MAX_IN_FLIGHT", "8")),
+    "max_retries": int(os.environ.get("BA_MODEL_MAX_RETRIES", "5")),
+    "backoff_base": float(os.environ.get("BA_MODEL_BACKOFF_BASE", "1.0")),
+    "backoff_max": float(os.environ.get("BA_MODEL_BACKOFF_MAX", "60.0")),
+}
+MODEL_LIMITS = json.loads(os.environ.get("BA_MODEL_LIMITS", "{}"))
+
+# Model Record/Replay Settings
+# Record every model call to a JSONL file, or answer all calls from one offline.
+# Replay sleeps the recorded latency times the scale, or a fixed latency when set.
+MODEL_RECORD_PATH = os.environ.get("BA_MODEL_RECORD_PATH", "")
+MODEL_REPLAY_PATH = os.environ.get("BA_MODEL_REPLAY_PATH", "")
+MODEL_REPLAY_LATENCY = float(os.environ["BA_MODEL_REPLAY_LATENCY"]) if os.environ.get("BA_MODEL_REPLAY_LATENCY") else None
+MODEL_REPLAY_LATENCY_SCALE = float(os.environ.get("BA_MODEL_REPLAY_LATENCY_SCALE", "1.0"))
+
+# Tracing and Metrics Settings
+# Fraction of traces kept by the OpenTelemetry sampler; metrics are always recorded
+TRACE_SAMPLE_RATE = float(os.environ.get("BA_TRACE_SAMPLE_RATE", "0.1"))
+# Storage calls (caches, stores, indexes) only get spans when enabled explicitly
+TRACE_STORAGE_SPANS = os.environ.get("BA_TRACE_STORAGE_SPANS", "false").lower() in ("1", "true", "yes")
+
 # Logging Settings
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
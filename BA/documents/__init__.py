@@ -0,0 +1,38 @@
+"""Text extraction from uploaded documents."""
+
+from .pdf import open_pdf, iter_page_parts, iter_page_texts, write_page_texts
+from .extraction import PageExtractor, get_page_extractor, format_pages, page_count
+from .cache import ParsedDocumentCache, extractor_version
+from .reader import iter_document, iter_pdf_pages, iter_text_sections, read_document_parts, read_preview
+from .text import decode_text, detect_encoding
+from .store import ParsedOutputStore, get_parsed_output_store
+from .directory import DirectoryIndex, get_directory_index
+from .uploads import UploadStore, get_upload_store, iter_base64_chunks, iter_byte_chunks
+
+__all__ = [
+    "open_pdf",
+    "iter_page_parts",
+    "iter_page_texts",
+    "write_page_texts",
+    "PageExtractor",
+    "get_page_extractor",
+    "format_pages",
+    "page_count",
+    "ParsedDocumentCache",
+    "extractor_version",
+    "iter_document",
+    "iter_pdf_pages",
+    "iter_text_sections",
+    "read_document_parts",
+    "read_preview",
+    "decode_text",
+    "detect_encoding",
+    "ParsedOutputStore",
+    "get_parsed_output_store",
+    "DirectoryIndex",
+    "get_directory_index",
+    "UploadStore",
+    "get_upload_store",
+    "iter_base64_chunks",
+    "iter_byte_chunks",
+]
@@ -0,0 +1,91 @@
+"""
+Persistent cache of extracted PDF page texts.
+
+Entries are keyed by the SHA-256 of the file bytes and the extractor with its
+library version, so `parse_file` (pdfplumber), `read_document_content_tool`
+and the API endpoints (pypdf) each parse a document once and re-uploads of
+the same file are served from disk. Upgrading a PDF library or bumping
+`EXTRACTION_VERSION` makes old entries unreachable; they age out of the LRU.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from importlib import metadata
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..telemetry import REGISTRY, traced
+
+if TYPE_CHECKING:
+    from ..pipeline.cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the page texts produced for the same library version change
+EXTRACTION_VERSION = 2
+
+PARSED_CACHE_LOOKUPS = REGISTRY.counter(
+    "ba_parsed_document_cache_lookups_total", "Parsed document cache lookups by outcome", ["outcome"]
+)
+
+
+def extractor_version(extractor: str) -> str:
+    """Returns the extractor name with its library version, e.g. `pypdf-5.6.0/1`."""
+    try:
+        version = metadata.version(extractor)
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"{extractor}-{version}/{EXTRACTION_VERSION}"
+
+
+class ParsedDocumentCache:
+    """Cache of page texts in front of the PDF extractors."""
+
+    def __init__(self, backend: "CacheBackend"):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[str, str] = {}
+
+    def key_for(self, data: bytes, extractor: str) -> str:
+        """Computes the cache key of a document parsed with `extractor`."""
+        if extractor not in self._versions:
+            self._versions[extractor] = extractor_version(extractor)
+        return f"{hashlib.sha256(data).hexdigest()}:{self._versions[extractor]}"
+
+    @traced("storage", "parsed_document_cache.get")
+    def get(self, key: str) -> Optional[List[str]]:
+        """Returns the cached page texts for `key` and updates the hit/miss counters."""
+        try:
+            raw = self.backend.get(key)
+        except Exception as error:
+            logger.error(f"Error reading parsed document cache: {error}")
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        PARSED_CACHE_LOOKUPS.inc(outcome="miss" if raw is None else "hit")
+        return None if raw is None else json.loads(zlib.decompress(raw))
+
+    @traced("storage", "parsed_document_cache.set")
+    def set(self, key: str, texts: List[str]) -> None:
+        """Stores the page texts of a document under `key`, compressed."""
+        try:
+            self.backend.set(key, zlib.compress(json.dumps(texts).encode("utf-8"), 1))
+        except Exception as error:
+            logger.error(f"Error writing parsed document cache: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
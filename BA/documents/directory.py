@@ -0,0 +1,222 @@
+"""
+Persistent, incrementally refreshed index of document files per directory.
+
+`find_document_files_tool` lists uploads through `DirectoryIndex` instead of
+walking and stat-ing the directory on every call. Each .pdf/.md/.txt file is
+recorded with its size and modification time in a SQLite index. A refresh
+first checks the directory's own modification time: if no file was added,
+removed or renamed since the last scan, the index is served as is. If it
+changed, the directory is listed and only new files are stat-ed. Known
+files are stat-ed again once the last full scan is older than `max_age`,
+which catches files overwritten in place, and only rows whose size or
+modification time changed are rewritten. Listings are filtered and
+paginated in SQL with a keyset cursor, the name of the last file returned.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from ..config import DIRECTORY_INDEX_MAX_AGE, DIRECTORY_INDEX_PATH
+from ..telemetry import REGISTRY, traced
+from .reader import SUPPORTED_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+DIRECTORY_INDEX_ENTRIES = REGISTRY.counter(
+    "ba_directory_index_entries_total", "Directory index entries seen by scans, by outcome", ["outcome"]
+)
+
+
+def _like_pattern(text: str) -> str:
+    """Escapes `text` for a case-insensitive substring match with `LIKE ... ESCAPE '\\'`."""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class DirectoryIndex:
+    """
+    SQLite index of the document files of the directories listed so far.
+
+    Attributes:
+        path: Path of the SQLite database
+        max_age: Seconds after which known files are stat-ed again; 0 always re-stats
+    """
+
+    def __init__(self, path: str, max_age: float = 0):
+        self.path = path
+        self.max_age = max_age
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS directories ("
+                "directory TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, "
+                "other_files INTEGER NOT NULL, scanned_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS directory_entries ("
+                "directory TEXT NOT NULL, name TEXT NOT NULL, suffix TEXT NOT NULL, "
+                "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                "PRIMARY KEY (directory, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @traced("storage", "directory_index.refresh")
+    def refresh(self, directory: str) -> Dict[str, int]:
+        """
+        Brings the index of a directory up to date.
+
+        Args:
+            directory: Absolute path of the directory
+
+        Returns:
+            Dict[str, int]: Entries `added`, `updated`, `removed` and `unchanged`, all 0 if the directory was not scanned
+
+        Raises:
+            OSError: If the directory cannot be read.
+        """
+        # Taken before the scan, so changes made during the scan trigger the next one
+        started = time.time()
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT mtime_ns, scanned_at FROM directories WHERE directory = ?", (directory,)
+            ).fetchone()
+            full = row is None or started - row[1] >= self.max_age
+            if not full and row[0] == mtime_ns:
+                return {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            known = {
+                name: (size, entry_mtime)
+                for name, size, entry_mtime in conn.execute(
+                    "SELECT name, size, mtime_ns FROM directory_entries WHERE directory = ?", (directory,)
+                )
+            }
+
+        changed = []
+        seen = set()
+        other_files = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                suffix = os.path.splitext(entry.name)[1].lower()
+                try:
+                    if suffix not in SUPPORTED_SUFFIXES or not entry.is_file():
+                        other_files += 1
+                        continue
+                    seen.add(entry.name)
+                    if not full and entry.name in known:
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Removed while scanning
+                    seen.discard(entry.name)
+                    continue
+                if known.get(entry.name) != (stat.st_size, stat.st_mtime_ns):
+                    changed.append((directory, entry.name, suffix, stat.st_size, stat.st_mtime_ns))
+        removed = [(directory, name) for name in known.keys() - seen]
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO directory_entries (directory, name, suffix, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?)",
+                changed,
+            )
+            conn.executemany("DELETE FROM directory_entries WHERE directory = ? AND name = ?", removed)
+            # scanned_at is the time of the last full scan
+            conn.execute(
+                "INSERT OR REPLACE INTO directories (directory, mtime_ns, other_files, scanned_at) VALUES (?, ?, ?, ?)",
+                (directory, mtime_ns, other_files, started if full else row[1]),
+            )
+
+        added = sum(1 for row in changed if row[1] not in known)
+        counts = {
+            "added": added,
+            "updated": len(changed) - added,
+            "removed": len(removed),
+            "unchanged": len(seen) - len(changed),
+        }
+        for outcome, count in counts.items():
+            if count:
+                DIRECTORY_INDEX_ENTRIES.inc(count, outcome=outcome)
+        if changed or removed:
+            logger.info("Indexed %s: %d added, %d updated, %d removed", directory, added, counts["updated"], len(removed))
+        return counts
+
+    @traced("storage", "directory_index.list")
+    def list(
+        self,
+        directory: str,
+        name_filter: str = "",
+        file_type: str = "",
+        after: str = "",
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Lists indexed document files by name, one page at a time.
+
+        Args:
+            directory: Absolute path of a directory passed to `refresh`
+            name_filter: Case-insensitive substring the file name must contain
+            file_type: Suffix the files must have, e.g. ".pdf"
+            after: Name of the last file of the previous page; empty for the first page
+            limit: Most files returned
+
+        Returns:
+            Dict[str, Any]: `files` (name, path, size in bytes, mtime_ns, type),
+                `total` files matching the filters, `other_files` in the directory
+                and `next` (the cursor of the next page, empty on the last page)
+        """
+        where = ["directory = ?"]
+        params: List[Any] = [directory]
+        if name_filter:
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(name_filter))
+        if file_type:
+            where.append("suffix = ?")
+            params.append(file_type.lower() if file_type.startswith(".") else f".{file_type.lower()}")
+        clause = " AND ".join(where)
+
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM directory_entries WHERE {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT name, suffix, size, mtime_ns FROM directory_entries WHERE {clause} AND name > ? "
+                "ORDER BY name LIMIT ?",
+                params + [after, limit + 1],
+            ).fetchall()
+            row = conn.execute("SELECT other_files FROM directories WHERE directory = ?", (directory,)).fetchone()
+
+        files = [
+            {
+                "name": name,
+                "path": os.path.join(directory, name),
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "type": suffix,
+            }
+            for name, suffix, size, mtime_ns in rows[:limit]
+        ]
+        return {
+            "files": files,
+            "total": total,
+            "other_files": row[0] if row is not None else 0,
+            "next": files[-1]["name"] if len(rows) > limit else "",
+        }
+
+
+_index: Optional[DirectoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_directory_index() -> DirectoryIndex:
+    """Returns the process-wide directory index configured by `BA_DIRECTORY_INDEX_*`."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DirectoryIndex(DIRECTORY_INDEX_PATH, max_age=DIRECTORY_INDEX_MAX_AGE)
+        return _index
@@ -0,0 +1,190 @@
+"""
+Page-parallel PDF text extraction.
+
+`PageExtractor` splits the pages of a large PDF into contiguous ranges and
+extracts them in a process pool sized to the available cores, so a long
+specification no longer pins a single core. Small documents are extracted
+in the calling process, where the pool would only add overhead. Page order
+is kept, and `extract_async` runs the whole extraction off the event loop.
+With a `ParsedDocumentCache`, a document parsed before is read from disk.
+
+Workers are started with the `spawn` method and only import this package,
+so they are safe to start from a threaded server process.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+from ..config import (
+    PARSED_CACHE_ENABLED,
+    PARSED_CACHE_MAX_BYTES,
+    PARSED_CACHE_PATH,
+    PDF_MIN_PAGES_PER_WORKER,
+    PDF_WORKERS,
+)
+from ..telemetry import span
+from .cache import ParsedDocumentCache
+from .pdf import iter_page_texts, open_pdf
+
+logger = logging.getLogger(__name__)
+
+# Text libraries a PDF can be extracted with
+EXTRACTORS = ("pypdf", "pdfplumber")
+
+# Placeholder for pages without a text layer, e.g. scanned images
+EMPTY_PAGE_TEXT = "[No extractable text on this page]"
+
+
+def available_cores() -> int:
+    """Returns the number of cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def page_count(data: bytes) -> int:
+    """Returns the number of pages of a PDF without extracting any text."""
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_page_range(data: bytes, extractor: str, start: int, stop: int) -> List[str]:
+    """
+    Extracts the text of pages `start` to `stop - 1` of a PDF.
+
+    Args:
+        data: Raw PDF bytes
+        extractor: "pypdf" or "pdfplumber"
+        start: Index of the first page
+        stop: Index after the last page
+
+    Returns:
+        List[str]: Text per page, empty for pages without text
+    """
+    if extractor == "pdfplumber":
+        with open_pdf(data) as pdf:
+            return list(iter_page_texts(pdf, start, stop))
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def format_pages(texts: Iterable[str], first_page: int = 1) -> str:
+    """Joins page texts behind `--- Page N ---` markers, with a placeholder for empty pages."""
+    parts = []
+    for number, text in enumerate(texts, start=first_page):
+        parts.append(f"\n--- Page {number} ---\n")
+        parts.append(text or EMPTY_PAGE_TEXT)
+    return "".join(parts)
+
+
+class PageExtractor:
+    """
+    Extracts PDF page texts, in parallel across processes for large documents.
+
+    Attributes:
+        workers: Size of the process pool; 1 extracts everything in the calling process
+        min_pages_per_worker: Smallest page range sent to a worker; shorter
+            documents are extracted in the calling process
+        cache: Optional cache of page texts consulted before extracting
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        min_pages_per_worker: int = 16,
+        cache: Optional[ParsedDocumentCache] = None,
+    ):
+        self.workers = workers if workers > 0 else available_cores()
+        self.min_pages_per_worker = max(1, min_pages_per_worker)
+        self.cache = cache
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def ranges(self, pages: int) -> List[Tuple[int, int]]:
+        """Splits `pages` into at most `workers` contiguous ranges of similar size."""
+        chunks = max(1, min(self.workers, pages // self.min_pages_per_worker))
+        size = math.ceil(pages / chunks) if pages else 0
+        return [(start, min(start + size, pages)) for start in range(0, pages, size or 1)]
+
+    def extract(self, data: bytes, extractor: str = "pypdf") -> List[str]:
+        """
+        Extracts the text of every page in order, blocking until done.
+
+        Args:
+            data: Raw PDF bytes
+            extractor: "pypdf" or "pdfplumber"
+
+        Returns:
+            List[str]: Text per page, empty for pages without text
+
+        Raises:
+            ValueError: If `extractor` is not supported.
+        """
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"Unsupported PDF extractor: {extractor}")
+        key = self.cache.key_for(data, extractor) if self.cache else None
+        if key is not None:
+            texts = self.cache.get(key)
+            if texts is not None:
+                return texts
+        pages = page_count(data)
+        ranges = self.ranges(pages)
+        with span("parse", extractor, {"ba.pages": pages, "ba.workers": len(ranges)}):
+            if len(ranges) <= 1:
+                texts = extract_page_range(data, extractor, 0, pages)
+            else:
+                executor = self._executor()
+                futures = [executor.submit(extract_page_range, data, extractor, start, stop) for start, stop in ranges]
+                texts = [text for future in futures for text in future.result()]
+        if key is not None:
+            self.cache.set(key, texts)
+        return texts
+
+    async def extract_async(self, data: bytes, extractor: str = "pypdf") -> List[str]:
+        """Runs `extract` in a thread so the event loop keeps serving other requests."""
+        return await asyncio.to_thread(self.extract, data, extractor)
+
+    def close(self) -> None:
+        """Shuts the process pool down."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+_extractor: Optional[PageExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_page_extractor() -> PageExtractor:
+    """Returns the process-wide page extractor configured by `BA_PDF_*` and `BA_PARSED_CACHE_*`."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            cache = None
+            if PARSED_CACHE_ENABLED:
+                # Imported here so that pool workers, which only extract, never load the pipeline
+                from ..pipeline.cache import SQLiteCacheBackend
+
+                cache = ParsedDocumentCache(
+                    SQLiteCacheBackend(PARSED_CACHE_PATH, PARSED_CACHE_MAX_BYTES, table="parsed_documents")
+                )
+            _extractor = PageExtractor(PDF_WORKERS, PDF_MIN_PAGES_PER_WORKER, cache)
+            logger.info("PDF page extraction uses %d worker processes", _extractor.workers)
+        return _extractor
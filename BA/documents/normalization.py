@@ -0,0 +1,212 @@
+"""
+Token-saving normalization of extracted document text.
+
+PDF text layers repeat running headers, footers and page numbers on every
+page, break words with hyphens at line ends and pad lines with runs of
+spaces. `normalize_document` removes lines repeated at the same place at the
+top or bottom of most pages, repairs hyphenated line breaks and collapses
+whitespace, while
+keeping the `--- Page N ---` markers and markdown structure that chunking
+and incremental re-analysis split on. `markdown_table` renders the cells
+of a pdfplumber table as a compact markdown table.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Bumped when `normalize_document` produces different text for the same input
+NORMALIZATION_VERSION = 1
+
+# Lines at the top and bottom of a page that may be running headers or footers
+EDGE_LINES = 2
+
+# Share of pages a line must appear on (at the page edges) to count as repeated
+REPEATED_LINE_MIN_SHARE = 0.5
+
+# Repeated lines are only detected in documents with at least this many pages
+REPEATED_LINE_MIN_PAGES = 3
+
+_PAGE_MARKER = re.compile(r"^(--- Page \d+ ---[ \t]*)$", re.MULTILINE)
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+# Page furniture whose digits change from page to page: "Page 3 of 40", "3 / 40", dates
+_FURNITURE = re.compile(
+    r"\bpage\s*#|#\s*(of|/)\s*#|#[-./]#[-./]#|^#$",
+    re.IGNORECASE,
+)
+_WORD = re.compile(r"[A-Za-z]+(?:-[A-Za-z]+)*")
+# A word broken by a hyphen and a line break, continued by a lowercase part
+_HYPHENATED_BREAK = re.compile(r"\b([A-Za-z]+)-\n[ \t]*([a-z]+)\b")
+_INNER_SPACES = re.compile(r"(?<=\S)[ \t]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _line_key(line: str) -> str:
+    """Identity of a line for repeat detection; page furniture ignores its page numbers and dates."""
+    key = " ".join(line.lower().split())
+    masked = _DIGITS.sub("#", key)
+    return masked if _FURNITURE.search(masked) else key
+
+
+def _split_pages(text: str) -> Tuple[str, List[str], List[str]]:
+    """Splits text at page markers (or form feeds) into the text before the first page, separators and pages."""
+    pieces = _PAGE_MARKER.split(text)
+    if len(pieces) > 1:
+        return pieces[0], pieces[1::2], pieces[2::2]
+    pages = text.split("\f")
+    return "", [""] + ["\f"] * (len(pages) - 1), pages
+
+
+def _edge_lines(lines: List[str]) -> Dict[int, Tuple[int, str]]:
+    """
+    Maps the indexes of the first and last `EDGE_LINES` non-empty lines of a
+    page to their edge position and repeat key; none for very short pages.
+
+    Positions count from the top (0, 1, ...) and from the bottom (-1, -2, ...).
+    """
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    if len(filled) <= 2 * EDGE_LINES:
+        return {}
+    edges = {index: position for position, index in enumerate(filled[:EDGE_LINES])}
+    edges.update({index: -1 - position for position, index in enumerate(reversed(filled[-EDGE_LINES:]))})
+    return {index: (position, _line_key(lines[index])) for index, position in edges.items()}
+
+
+def remove_repeated_lines(pages: List[str]) -> Tuple[List[str], int]:
+    """
+    Drops running headers, footers and page numbers from the edges of every page.
+
+    A line is dropped when it is a bare page number, or when the same line
+    is at the same edge position (e.g. first line, last line) of at least
+    half of the pages, and every line between it and the page edge is
+    dropped too. Lines are compared ignoring whitespace; page furniture
+    such as "Page 3 of 40" or a date also ignores its digits, so numbered
+    content like requirement headings must repeat exactly.
+
+    Args:
+        pages: Page texts in order
+
+    Returns:
+        Tuple[List[str], int]: Page texts without the repeated lines, number of lines dropped
+    """
+    page_lines = [page.split("\n") for page in pages]
+    page_edges = [_edge_lines(lines) for lines in page_lines]
+    counts: Dict[Tuple[int, str], int] = {}
+    for edges in page_edges:
+        for edge in set(edges.values()):
+            counts[edge] = counts.get(edge, 0) + 1
+
+    filled_pages = sum(1 for page in pages if page.strip())
+    threshold = max(2, math.ceil(filled_pages * REPEATED_LINE_MIN_SHARE))
+    repeated = (
+        {key for key, count in counts.items() if count >= threshold}
+        if filled_pages >= REPEATED_LINE_MIN_PAGES
+        else set()
+    )
+
+    removed = 0
+    result = []
+    for lines, edges in zip(page_lines, page_edges):
+        drop = set()
+        # Headers and footers stack from the page edge
+        top = sorted(index for index in edges if edges[index][0] >= 0)
+        bottom = sorted((index for index in edges if edges[index][0] < 0), reverse=True)
+        for side in (top, bottom):
+            for index in side:
+                if not (edges[index] in repeated or _PAGE_NUMBER.match(lines[index].strip())):
+                    break
+                drop.add(index)
+        removed += len(drop)
+        result.append("\n".join(line for index, line in enumerate(lines) if index not in drop))
+    return result, removed
+
+
+def repair_hyphenation(text: str) -> Tuple[str, int]:
+    """
+    Joins words split by a hyphen at a line end, e.g. `require-\\nments`.
+
+    A break is joined only when the joined word is used elsewhere in the text
+    and the hyphenated form is not, so compounds such as `self-\\nservice` or
+    `e-\\nmail` keep their hyphen (and line break).
+
+    Returns:
+        Tuple[str, int]: Repaired text and the number of words joined
+    """
+    words = {word.lower() for word in _WORD.findall(text)}
+    repaired = 0
+
+    def join(match: "re.Match[str]") -> str:
+        nonlocal repaired
+        head, tail = match.group(1), match.group(2)
+        if (head + tail).lower() in words and f"{head}-{tail}".lower() not in words:
+            repaired += 1
+            return head + tail
+        return match.group(0)
+
+    return _HYPHENATED_BREAK.sub(join, text), repaired
+
+
+def collapse_whitespace(text: str) -> str:
+    """Strips line ends, collapses runs of spaces inside lines and keeps at most one blank line."""
+    lines = [_INNER_SPACES.sub(" ", line.rstrip()) for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines))
+
+
+def normalization_fingerprint() -> Dict[str, Any]:
+    """Settings that change the normalized text, used by the stage cache key."""
+    return {
+        "version": NORMALIZATION_VERSION,
+        "edge_lines": EDGE_LINES,
+        "repeated_line_min_share": REPEATED_LINE_MIN_SHARE,
+        "repeated_line_min_pages": REPEATED_LINE_MIN_PAGES,
+    }
+
+
+def normalize_document(text: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Normalizes extracted document text before it is sent to the models.
+
+    Args:
+        text: Parsed document text, with or without `--- Page N ---` markers
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: Normalized text and counts of what was removed or repaired
+    """
+    head, separators, pages = _split_pages(text)
+    pages, removed = remove_repeated_lines(pages)
+    joined = head + "".join(separator + page for separator, page in zip(separators, pages))
+
+    joined, repaired = repair_hyphenation(joined)
+    normalized = collapse_whitespace(joined).strip("\n")
+    return normalized, {
+        "chars_before": len(text),
+        "chars_after": len(normalized),
+        "repeated_lines_removed": removed,
+        "hyphenations_repaired": repaired,
+    }
+
+
+def markdown_table(rows: Sequence[Sequence[Optional[str]]]) -> str:
+    """
+    Renders table cells as a compact markdown table, the first row being the header.
+
+    Empty rows and columns are dropped, and line breaks inside cells become spaces.
+
+    Args:
+        rows: Cell texts row by row, as returned by pdfplumber's `Table.extract`
+
+    Returns:
+        str: Markdown table, or an empty string if the table has no text
+    """
+    cells = [[" ".join((cell or "").split()).replace("|", "\\|") for cell in row] for row in rows]
+    cells = [row for row in cells if any(row)]
+    if not cells:
+        return ""
+    width = max(len(row) for row in cells)
+    cells = [row + [""] * (width - len(row)) for row in cells]
+    columns = [column for column in range(width) if any(row[column] for row in cells)]
+    cells = [[row[column] for column in columns] for row in cells]
+    lines = ["| " + " | ".join(row) + " |" for row in cells]
+    lines.insert(1, "|" + "---|" * len(columns))
+    return "\n".join(lines)
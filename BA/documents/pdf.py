@@ -0,0 +1,127 @@
+"""
+PDF text extraction from in-memory bytes.
+
+Reads uploaded PDFs straight from a memory buffer with pdfplumber, without a
+temporary file. Pages are read one at a time and each page's layout objects
+are released before the next one is parsed, so peak memory is the input,
+one page of layout objects and the extracted text. Ruled tables are written
+as compact markdown tables where they appear on the page.
+"""
+
+import contextlib
+import io
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+import pdfplumber
+from pdfplumber.page import Page
+from pdfplumber.pdf import PDF
+
+from .normalization import markdown_table
+
+
+@contextlib.contextmanager
+def open_pdf(data: bytes) -> Iterator[PDF]:
+    """
+    Opens an in-memory PDF with pdfplumber.
+
+    Args:
+        data: Raw PDF bytes; the buffer shares them instead of copying
+
+    Yields:
+        PDF: The opened document
+    """
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        yield pdf
+
+
+def page_text(page: Page) -> str:
+    """
+    Extracts the text of a page, with every ruled table as a markdown table.
+
+    Text beside or above a table is written before it, so tables keep their
+    place in the reading order.
+
+    Args:
+        page: The pdfplumber page
+
+    Returns:
+        str: Page text, empty if the page has no text layer
+    """
+    tables = sorted(page.find_tables(), key=lambda table: table.bbox[1])
+    if not tables:
+        return page.extract_text() or ""
+
+    def outside_tables(obj: Dict[str, Any]) -> bool:
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in (t.bbox for t in tables))
+
+    x0, top, x1, bottom = page.bbox
+    parts = []
+    for table in tables + [None]:
+        band_bottom = bottom if table is None else max(top, min(table.bbox[3], bottom))
+        if band_bottom > top:
+            parts.append(page.crop((x0, top, x1, band_bottom)).filter(outside_tables).extract_text() or "")
+            top = band_bottom
+        if table is not None:
+            parts.append(markdown_table(table.extract()))
+    return "\n".join(part for part in parts if part.strip())
+
+
+def iter_page_texts(pdf: PDF, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Yields the text of pages `start` to `stop - 1` in order, closing every page once it is read."""
+    for page in pdf.pages[start:stop]:
+        try:
+            yield page_text(page)
+        finally:
+            page.close()
+
+
+def iter_page_parts(texts: Iterable[str], separator: str = "\n\n") -> Iterator[str]:
+    """
+    Yields the non-empty page texts with a separator between two of them.
+
+    Leading whitespace of the first page and trailing whitespace of every
+    page are dropped, so the parts concatenate to the stripped join of the
+    pages without building that join.
+
+    Args:
+        texts: Page texts in order, e.g. from `iter_page_texts`
+        separator: Yielded between two non-empty pages
+
+    Yields:
+        str: Page texts and separators in order
+    """
+    first = True
+    for text in texts:
+        text = text.rstrip()
+        if first:
+            text = text.lstrip()
+        if not text:
+            continue
+        if not first:
+            yield separator
+        first = False
+        yield text
+
+
+def write_page_texts(texts: Iterable[str], out: TextIO, separator: str = "\n\n") -> int:
+    """
+    Writes all non-empty page texts to `out` in one pass.
+
+    Leading whitespace of the first page and trailing whitespace of every
+    page are dropped, so the result equals the stripped join of the pages.
+
+    Args:
+        texts: Page texts in order, e.g. from `iter_page_texts`
+        out: Text stream the pages are written to
+        separator: Written between two non-empty pages
+
+    Returns:
+        int: Number of characters written
+    """
+    written = 0
+    for part in iter_page_parts(texts, separator):
+        out.write(part)
+        written += len(part)
+    return written
@@ -0,0 +1,146 @@
+"""
+Lazy page and section reader over PDF, markdown and text files.
+
+`iter_document` yields a document one part at a time: PDF pages, or text
+sections that start at a markdown heading or page marker and are cut at
+line boundaries once they reach `max_section_chars`. Callers that only need
+a preview, the first pages or a page range stop iterating early, and
+nothing after the last part they consume is parsed or read from disk. PDFs
+already in the parsed document cache are served from the cache; text files
+are read once, memory-mapped when large, see `text.iter_sections`.
+"""
+
+import io
+import itertools
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from pypdf import PdfReader
+
+from .extraction import format_pages, get_page_extractor
+from .text import ENCODING_SAMPLE_BYTES, detect_encoding, iter_sections
+
+# File types the reader understands
+SUPPORTED_SUFFIXES = (".pdf", ".md", ".txt")
+
+# Text sections are cut at the next line once they reach this many bytes (about a page)
+DEFAULT_SECTION_CHARS = 4000
+
+
+def text_encoding(path: Union[str, Path]) -> str:
+    """Returns the encoding of a text file detected from its first `ENCODING_SAMPLE_BYTES`, see `detect_encoding`."""
+    with open(path, "rb") as f:
+        return detect_encoding(f.read(ENCODING_SAMPLE_BYTES))
+
+
+def iter_pdf_pages(path: Union[str, Path]) -> Iterator[str]:
+    """Yields the text of each PDF page in order, parsing a page only when it is requested."""
+    data = Path(path).read_bytes()
+    cache = get_page_extractor().cache
+    if cache is not None:
+        texts = cache.get(cache.key_for(data, "pypdf"))
+        if texts is not None:
+            yield from texts
+            return
+    reader = PdfReader(io.BytesIO(data))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def iter_text_sections(path: Union[str, Path], max_section_chars: int = DEFAULT_SECTION_CHARS) -> Iterator[str]:
+    """
+    Yields the sections of a text or markdown file, reading it once.
+
+    Args:
+        path: Path of the file
+        max_section_chars: Length in bytes after which a section ends at the next line break
+
+    Yields:
+        str: Sections in order; concatenated they give back the file text
+    """
+    return iter_sections(path, max_section_chars)
+
+
+def iter_document(
+    path: Union[str, Path],
+    start: int = 0,
+    stop: Optional[int] = None,
+    max_section_chars: int = DEFAULT_SECTION_CHARS,
+) -> Iterator[str]:
+    """
+    Yields the parts `start` to `stop - 1` of a document: pages of a PDF, sections of a text file.
+
+    Args:
+        path: Path of a .pdf, .md or .txt file
+        start: Index of the first part
+        stop: Index after the last part, None for the end of the document
+        max_section_chars: Section length of text files, see `iter_text_sections`
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        parts = iter_pdf_pages(path)
+    elif suffix in SUPPORTED_SUFFIXES:
+        parts = iter_text_sections(path, max_section_chars)
+    else:
+        raise ValueError(f"Unsupported file type: {suffix}")
+    return itertools.islice(parts, start, stop)
+
+
+def read_preview(path: Union[str, Path], max_chars: int) -> str:
+    """Returns the first `max_chars` characters of a document, reading only the parts needed."""
+    parts: List[str] = []
+    size = 0
+    for part in iter_document(path):
+        parts.append(part)
+        size += len(part)
+        if size >= max_chars:
+            break
+    return "".join(parts)[:max_chars]
+
+
+def read_document_parts(
+    path: Union[str, Path],
+    start: int = 0,
+    stop: Optional[int] = None,
+    max_chars: int = 0,
+    offset: int = 0,
+) -> Tuple[str, Optional[Tuple[int, int]]]:
+    """
+    Reads parts `start` to `stop - 1` of a document, stopping once `max_chars` characters are read.
+
+    Args:
+        path: Path of a .pdf, .md or .txt file
+        start: Index of the first part
+        stop: Index after the last part, None for the end of the document
+        max_chars: Length at which the text is cut and reading stops, 0 for no limit
+        offset: Characters of the first part to skip, to resume a cut part
+
+    Returns:
+        Tuple of the text, PDF pages behind `--- Page N ---` markers, and the
+        cursor to read on from: the number (from 1) of the part and the
+        offset in it, None if the range was read to its end. The last part
+        read is cut at `max_chars`, so every read fills its budget.
+    """
+    pdf = Path(path).suffix.lower() == ".pdf"
+    parts: List[str] = []
+    size = 0
+    remaining = enumerate(iter_document(path, start, stop), start=start)
+    for index, part in remaining:
+        if pdf:
+            part = format_pages([part], index + 1)
+        skipped = offset if index == start else 0
+        part = part[skipped:]
+        if 0 < max_chars < size + len(part):
+            taken = max_chars - size
+            parts.append(part[:taken])
+            return "".join(parts), (index + 1, skipped + taken)
+        parts.append(part)
+        size += len(part)
+        if size == max_chars:
+            # Full on a part boundary: only point at the next part if there is one
+            following = next(remaining, None)
+            return "".join(parts), (following[0] + 1, 0) if following is not None else None
+    return "".join(parts), None
@@ -0,0 +1,222 @@
+"""
+Bounded, indexed store of parsed document outputs.
+
+Every parsed document is written to its own markdown file,
+`<root>/<digest[:2]>/<digest>.md`, and recorded in a SQLite index keyed by
+the SHA-256 of the source file (path, size, pages, parse time, extractor
+version). A lookup is a primary-key read of the index. Files are written to
+a temp file and renamed, and index rows are written in one transaction, so
+concurrent requests and server processes never see a partial output.
+Outputs older than the retention period are removed, and the oldest
+outputs are rotated out once the document count or total size limit is
+exceeded.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..config import (
+    PARSED_OUTPUT_DIR,
+    PARSED_OUTPUT_MAX_BYTES,
+    PARSED_OUTPUT_MAX_DOCUMENTS,
+    PARSED_OUTPUT_RETENTION_DAYS,
+)
+from ..telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedOutputStore:
+    """
+    One markdown file per parsed document plus a SQLite index.
+
+    Attributes:
+        root: Directory holding the outputs and `index.sqlite3`
+        max_documents: Most outputs kept; 0 for no limit
+        max_bytes: Largest total size of the outputs; 0 for no limit
+        retention_seconds: Age after which an output is removed; 0 keeps outputs forever
+    """
+
+    def __init__(self, root: str, max_documents: int = 0, max_bytes: int = 0, retention_seconds: float = 0):
+        self.root = root
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self.index_path = os.path.join(root, "index.sqlite3")
+        os.makedirs(root, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_outputs ("
+                "digest TEXT PRIMARY KEY, path TEXT NOT NULL, file_name TEXT, "
+                "size INTEGER NOT NULL, pages INTEGER NOT NULL, "
+                "extractor TEXT NOT NULL, parsed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS parsed_outputs_parsed_at ON parsed_outputs (parsed_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.md")
+
+    @traced("storage", "parsed_output_store.get")
+    def get(self, digest: str, extractor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the index entry of a document.
+
+        Args:
+            digest: SHA-256 hex digest of the source file
+            extractor: If set, entries written by another extractor version count as missing
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry with `path`, `file_name`, `size`, `pages`,
+                `extractor` and `parsed_at`, or None if the document is not stored
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT path, file_name, size, pages, extractor, parsed_at FROM parsed_outputs WHERE digest = ?",
+                (digest,),
+            ).fetchone()
+        if row is None or (extractor is not None and row[4] != extractor):
+            return None
+        if not os.path.exists(row[0]):
+            return None
+        return {
+            "digest": digest,
+            "path": row[0],
+            "file_name": row[1],
+            "size": row[2],
+            "pages": row[3],
+            "extractor": row[4],
+            "parsed_at": row[5],
+        }
+
+    def read(self, digest: str, extractor: Optional[str] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Returns the stored output of a document and its index entry (see `get`), or None if it is not stored."""
+        entry = self.get(digest, extractor)
+        if entry is None:
+            return None
+        try:
+            with open(entry["path"], "r", encoding="utf-8") as f:
+                return f.read(), entry
+        except FileNotFoundError:
+            # Removed by retention in another process after the lookup
+            return None
+
+    @traced("storage", "parsed_output_store.put")
+    def put(
+        self,
+        digest: str,
+        markdown: Union[str, Iterable[str]],
+        file_name: str,
+        pages: int,
+        extractor: str,
+    ) -> str:
+        """
+        Stores the output of a document, replacing an earlier one of the same file.
+
+        Args:
+            digest: SHA-256 hex digest of the source file
+            markdown: Parsed output, without details of a particular upload, or its
+                parts in order; parts are written one by one without joining them
+            file_name: Name of the source file when it was parsed
+            pages: Number of pages of the source file
+            extractor: Extractor and version that produced the output
+
+        Returns:
+            str: Path of the stored output
+        """
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(markdown, str):
+            markdown = (markdown,)
+        # Write to a temp file first so readers never see a partial output
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.writelines(markdown)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO parsed_outputs "
+                "(digest, path, file_name, size, pages, extractor, parsed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, path, file_name, size, pages, extractor, time.time()),
+            )
+            expired = self._expired(conn, digest)
+            conn.executemany("DELETE FROM parsed_outputs WHERE digest = ?", [(old,) for old, _ in expired])
+        for _, old_path in expired:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+        if expired:
+            logger.info("Removed %d parsed outputs past the retention limits", len(expired))
+        return path
+
+    def _expired(self, conn: sqlite3.Connection, keep: str) -> List[Tuple[str, str]]:
+        """Returns (digest, path) of the outputs past the age, count or size limits, oldest first."""
+        count, total, oldest = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(parsed_at) FROM parsed_outputs"
+        ).fetchone()
+        cutoff = time.time() - self.retention_seconds if self.retention_seconds else None
+        if not (
+            (cutoff is not None and oldest < cutoff)
+            or (self.max_documents and count > self.max_documents)
+            or (self.max_bytes and total > self.max_bytes)
+        ):
+            return []
+        rows = conn.execute(
+            "SELECT digest, path, size, parsed_at FROM parsed_outputs WHERE digest != ? ORDER BY parsed_at",
+            (keep,),
+        )
+        expired = []
+        for digest, path, size, parsed_at in rows:
+            too_old = cutoff is not None and parsed_at < cutoff
+            too_many = self.max_documents and count > self.max_documents
+            too_large = self.max_bytes and total > self.max_bytes
+            if not (too_old or too_many or too_large):
+                break
+            expired.append((digest, path))
+            count -= 1
+            total -= size
+        return expired
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number and total size of the stored outputs."""
+        with closing(self._connect()) as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parsed_outputs"
+            ).fetchone()
+        return {"documents": count, "bytes": total}
+
+
+_store: Optional[ParsedOutputStore] = None
+_store_lock = threading.Lock()
+
+
+def get_parsed_output_store() -> ParsedOutputStore:
+    """Returns the process-wide parsed output store configured by `BA_PARSED_OUTPUT_*`."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ParsedOutputStore(
+                PARSED_OUTPUT_DIR,
+                max_documents=PARSED_OUTPUT_MAX_DOCUMENTS,
+                max_bytes=PARSED_OUTPUT_MAX_BYTES,
+                retention_seconds=PARSED_OUTPUT_RETENTION_DAYS * 24 * 3600,
+            )
+        return _store
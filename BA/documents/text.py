@@ -0,0 +1,154 @@
+"""
+Single-read ingestion of markdown and text files.
+
+The encoding is detected once from a bounded sample (byte order mark, then
+UTF-8, Windows-1252 or Latin-1) instead of decoding the whole file per
+candidate encoding. Large files are memory-mapped, section boundaries
+(markdown headings and `--- Page N ---` markers) are found on the raw bytes
+and only one section at a time is copied and decoded, so a multi-hundred-MB
+export is never held in memory as a whole unless the caller joins it.
+"""
+
+import codecs
+import contextlib
+import mmap
+import re
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+
+# Bytes inspected to detect the encoding
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Files of at least this size are memory-mapped instead of read into memory
+MMAP_MIN_BYTES = 1024 * 1024
+
+# Encodings whose line breaks, `#` and digits are single ASCII bytes, so sections can be found on bytes
+_ASCII_COMPATIBLE = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# A section starts at a page marker or a markdown heading; matching the line break
+# before it (instead of `^`) lets the regex engine skip ahead to each line break
+_SECTION_START = re.compile(r"\n(?=--- Page \d+ ---[ \t]*\r?$|#{1,6} )", re.MULTILINE)
+_SECTION_START_BYTES = re.compile(_SECTION_START.pattern.encode("ascii"), re.MULTILINE)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detects the encoding of a text file from its first bytes.
+
+    Args:
+        sample: Start of the file, e.g. `ENCODING_SAMPLE_BYTES` long
+
+    Returns:
+        str: "utf-8-sig" or "utf-16" for files with a byte order mark, else
+            "utf-8", then "cp1252", then "latin-1" (which decodes any bytes)
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            # Not final: the sample may end inside a multi-byte character
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def decode_text(data: bytes) -> str:
+    """Decodes file bytes with the encoding detected from their start; undecodable bytes are replaced."""
+    return data.decode(detect_encoding(data[:ENCODING_SAMPLE_BYTES]), errors="replace")
+
+
+@contextlib.contextmanager
+def open_text_buffer(path: Union[str, Path]) -> Iterator[Tuple[Union[bytes, mmap.mmap], str]]:
+    """
+    Opens a text file as a read-only byte buffer and detects its encoding.
+
+    Files of at least `MMAP_MIN_BYTES` are memory-mapped, smaller ones are read
+    in one call.
+
+    Yields:
+        Tuple[Union[bytes, mmap.mmap], str]: The file contents and their encoding
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size < MMAP_MIN_BYTES:
+            data = f.read()
+            yield data, detect_encoding(data[:ENCODING_SAMPLE_BYTES])
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer, detect_encoding(buffer[:ENCODING_SAMPLE_BYTES])
+
+
+def section_bounds(buffer: Union[bytes, mmap.mmap], max_section_bytes: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yields the byte ranges of the sections of a text buffer without copying it.
+
+    A section starts at a markdown heading or page marker, and ends with the
+    line that makes it `max_section_bytes` long.
+
+    Args:
+        buffer: Bytes of an ASCII-compatible text file
+        max_section_bytes: Length after which a section ends at the next line break
+
+    Yields:
+        Tuple[int, int]: Start and end offsets; the ranges cover the whole buffer
+    """
+    size = len(buffer)
+    starts = (match.end() for match in _SECTION_START_BYTES.finditer(buffer))
+    next_start = next(starts, size)
+    start = 0
+    while start < size:
+        while next_start <= start:
+            next_start = next(starts, size)
+        end = next_start
+        if end - start > max_section_bytes:
+            # The section ends with the line that reaches the limit
+            line_end = buffer.find(b"\n", start + max_section_bytes - 1)
+            end = size if line_end == -1 else min(line_end + 1, next_start)
+        yield start, end
+        start = end
+
+
+def iter_sections(path: Union[str, Path], max_section_bytes: int) -> Iterator[str]:
+    """
+    Yields the decoded sections of a markdown or text file, reading it once.
+
+    Args:
+        path: Path of the file
+        max_section_bytes: Length after which a section ends at the next line break
+
+    Yields:
+        str: Sections in order; concatenated they give back the file text
+    """
+    with open_text_buffer(path) as (buffer, encoding):
+        if encoding not in _ASCII_COMPATIBLE:
+            # UTF-16 line breaks are two bytes; split the decoded text instead
+            text = bytes(buffer).decode(encoding, errors="replace")
+            yield from _split_text(text, max_section_bytes)
+            return
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for start, end in section_bounds(buffer, max_section_bytes):
+            # The incremental decoder carries a character split at a section end over to the next section
+            yield decoder.decode(buffer[start:end], final=end == len(buffer))
+
+
+def _split_text(text: str, max_section_chars: int) -> Iterator[str]:
+    """Splits decoded text like `section_bounds` splits bytes."""
+    boundaries = [0] + [match.end() for match in _SECTION_START.finditer(text)] + [len(text)]
+    for start, end in zip(boundaries, boundaries[1:]):
+        while end - start > max_section_chars:
+            line_end = text.find("\n", start + max_section_chars - 1)
+            if line_end == -1 or line_end + 1 >= end:
+                break
+            yield text[start:line_end + 1]
+            start = line_end + 1
+        yield text[start:end]
@@ -0,0 +1,187 @@
+"""
+Content-addressed store of uploaded documents.
+
+`save_document_files_tool` stores each upload once under the SHA-256 of its
+bytes, `<root>/<digest[:2]>/<digest><suffix>`, and gives it its per-session
+name as a hard link to that file (a symlink, or as a last resort a copy,
+when the working directory is on another file system). Base64 uploads are
+decoded in chunks, so the decoded document is never held in memory as a
+whole. The digest is computed in a first pass over the decoded chunks; an
+upload whose digest is already stored is only linked, so a duplicate costs
+no disk space and no write. New uploads are decoded again and streamed to
+a temp file that is renamed into place.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from ..config import UPLOAD_STORE_DIR
+from ..telemetry import REGISTRY, traced
+
+logger = logging.getLogger(__name__)
+
+# Characters of base64 decoded per chunk (a multiple of 4, about 3 MiB decoded)
+BASE64_CHUNK_CHARS = 4 * 1024 * 1024
+
+# Bytes hashed or written per chunk of raw uploads
+CHUNK_BYTES = 1024 * 1024
+
+UPLOAD_STORE_WRITES = REGISTRY.counter(
+    "ba_upload_store_writes_total", "Uploads saved to the upload store, by outcome", ["outcome"]
+)
+
+_NOT_BASE64 = re.compile(r"[^A-Za-z0-9+/=]+")
+
+
+def iter_base64_chunks(data: str, chunk_chars: int = BASE64_CHUNK_CHARS) -> Iterator[bytes]:
+    """
+    Decodes base64 text one chunk at a time.
+
+    Like `base64.b64decode`, characters outside the base64 alphabet (line
+    breaks, spaces) are ignored.
+
+    Raises:
+        binascii.Error: If the text is not valid base64.
+    """
+    carry = ""
+    for start in range(0, len(data), chunk_chars):
+        chunk = carry + data[start:start + chunk_chars]
+        if len(chunk) % 4 == 0:
+            try:
+                # Fast path for payloads without line breaks
+                yield base64.b64decode(chunk, validate=True)
+                carry = ""
+                continue
+            except binascii.Error:
+                pass
+        chunk = _NOT_BASE64.sub("", chunk)
+        usable = len(chunk) - len(chunk) % 4
+        carry = chunk[usable:]
+        if usable:
+            yield base64.b64decode(chunk[:usable])
+    if carry:
+        # A valid encoding always ends on a 4-character boundary
+        raise binascii.Error("Incorrect padding")
+
+
+def iter_byte_chunks(data: bytes, chunk_bytes: int = CHUNK_BYTES) -> Iterator[memoryview]:
+    """Yields views of consecutive slices of `data` without copying it."""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_bytes):
+        yield view[start:start + chunk_bytes]
+
+
+class UploadStore:
+    """
+    Uploaded documents on local disk, stored once per content digest.
+
+    Attributes:
+        root: Directory holding the stored uploads
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.writes = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}")
+
+    @traced("storage", "upload_store.save")
+    def save(self, chunks: Callable[[], Iterator[Union[bytes, memoryview]]], suffix: str, target: str) -> Dict[str, object]:
+        """
+        Stores an upload unless the same bytes are stored, then links it to `target`.
+
+        Args:
+            chunks: Function returning an iterator over the file bytes; called
+                once to hash the upload and, for new uploads, once to write it
+            suffix: File extension of the upload, e.g. ".pdf"
+            target: Per-session path of the upload; an existing file there is replaced
+
+        Returns:
+            Dict[str, object]: `sha256`, `size`, `stored` (False for a duplicate)
+                and `link` ("hardlink", "symlink" or "copy")
+        """
+        sha = hashlib.sha256()
+        size = 0
+        for chunk in chunks():
+            sha.update(chunk)
+            size += len(chunk)
+        digest = sha.hexdigest()
+        path = self._path(digest, suffix)
+
+        stored = not os.path.exists(path)
+        if stored:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial upload
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in chunks():
+                        f.write(chunk)
+                # Read-only, since every per-session link shares the file
+                os.chmod(temp_path, 0o444)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            UPLOAD_STORE_WRITES.inc(outcome="stored")
+        else:
+            UPLOAD_STORE_WRITES.inc(outcome="duplicate")
+            logger.info("Upload %s is already stored; linking it as %s", digest, target)
+        with self._lock:
+            if stored:
+                self.writes += 1
+                self.bytes_written += size
+            else:
+                self.duplicates += 1
+
+        return {"sha256": digest, "size": size, "stored": stored, "link": self._link(path, target)}
+
+    @staticmethod
+    def _link(path: str, target: str) -> str:
+        """Gives the stored file the per-session name `target`; returns how it was linked."""
+        # Replace an earlier upload of the same name instead of writing through its link
+        if os.path.lexists(target):
+            os.remove(target)
+        try:
+            os.link(path, target)
+            return "hardlink"
+        except OSError:
+            # Another file system, or links not permitted
+            pass
+        try:
+            os.symlink(os.path.abspath(path), target)
+            return "symlink"
+        except OSError:
+            shutil.copyfile(path, target)
+            return "copy"
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of uploads written and deduplicated, and the bytes written."""
+        with self._lock:
+            return {"writes": self.writes, "duplicates": self.duplicates, "bytes_written": self.bytes_written}
+
+
+_store: Optional[UploadStore] = None
+_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    """Returns the process-wide upload store in `BA_UPLOAD_STORE_DIR`."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UploadStore(UPLOAD_STORE_DIR)
+        return _store
@@ -0,0 +1,26 @@
+"""Model wrappers shared by all agents."""
+
+from .governor import ModelGovernor, GovernedLlm, TokenBucket, get_governor, governor_stats, is_quota_error
+from .tiering import TieredLlm, check_response, escalation_stats
+from .replay import ModelRecording, RecordingLlm, ReplayLlm, request_key
+from .tracing import TracedLlm
+from .factory import build_model, model_recording
+
+__all__ = [
+    "ModelGovernor",
+    "GovernedLlm",
+    "TokenBucket",
+    "get_governor",
+    "governor_stats",
+    "is_quota_error",
+    "TieredLlm",
+    "check_response",
+    "escalation_stats",
+    "ModelRecording",
+    "RecordingLlm",
+    "ReplayLlm",
+    "request_key",
+    "TracedLlm",
+    "build_model",
+    "model_recording",
+]
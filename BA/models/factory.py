@@ -0,0 +1,92 @@
+"""
+Builds the model used by an agent from its model env var.
+"""
+
+import os
+from typing import Dict, Optional
+
+from google.adk.models import BaseLlm, LLMRegistry
+
+from ..config import (
+    MODEL_GOVERNOR_ENABLED,
+    MODEL_DEFAULT_LIMITS,
+    MODEL_LIMITS,
+    MODEL_RECORD_PATH,
+    MODEL_REPLAY_PATH,
+    MODEL_REPLAY_LATENCY,
+    MODEL_REPLAY_LATENCY_SCALE,
+)
+from ..utils.utils import get_env_var
+from .governor import GovernedLlm, get_governor
+from .replay import ModelRecording, RecordingLlm, ReplayLlm
+from .tiering import TieredLlm
+from .tracing import TracedLlm
+
+# One recording per file, shared by all agents
+_recordings: Dict[str, ModelRecording] = {}
+
+
+def _recording(path: str, load: bool) -> ModelRecording:
+    if path not in _recordings:
+        recording = ModelRecording(path)
+        _recordings[path] = recording.load() if load else recording
+    return _recordings[path]
+
+
+def model_recording(path: str) -> Optional[ModelRecording]:
+    """Returns the recording the agents use for `path`, if any."""
+    return _recordings.get(path)
+
+
+def _model(model: str) -> BaseLlm:
+    """Returns the named model with tracing, behind its governor when the governor is enabled."""
+    llm = TracedLlm(model=model, llm=LLMRegistry.new_llm(model))
+    if not MODEL_GOVERNOR_ENABLED:
+        return llm
+    return GovernedLlm(
+        model=model,
+        llm=llm,
+        governor=get_governor(model, **{**MODEL_DEFAULT_LIMITS, **MODEL_LIMITS.get(model, {})}),
+    )
+
+
+def build_model(var_name: str) -> BaseLlm:
+    """
+    Returns the model named by the env var `var_name`, wrapped for every enabled concern.
+
+    If the matching `*_FAST_MODEL` env var is set (e.g. `UR_AGENT_FAST_MODEL`
+    for `UR_AGENT_MODEL`), requests go to that model first and escalate to
+    the model in `var_name` when its answer fails the checks of `TieredLlm`.
+    `BA_MODEL_REPLAY_PATH` replaces the model with a `ReplayLlm` and
+    `BA_MODEL_RECORD_PATH` records every call the agent makes.
+
+    Args:
+        var_name: Name of the env var holding the model name, e.g. `UR_AGENT_MODEL`
+
+    Returns:
+        BaseLlm: The model for `LlmAgent.model`
+    """
+    model = get_env_var(var_name)
+    if MODEL_REPLAY_PATH:
+        return TracedLlm(model=model, llm=ReplayLlm(
+            model=model,
+            recording=_recording(MODEL_REPLAY_PATH, load=True),
+            latency=MODEL_REPLAY_LATENCY,
+            latency_scale=MODEL_REPLAY_LATENCY_SCALE,
+        ))
+
+    tier = var_name[:-len("_MODEL")] if var_name.endswith("_MODEL") else var_name
+    fast_model = os.environ.get(f"{tier}_FAST_MODEL")
+    if fast_model:
+        llm = TieredLlm(
+            model=model,
+            fast=_model(fast_model),
+            strong=_model(model),
+            tier=tier.lower(),
+        )
+    else:
+        llm = _model(model)
+
+    if MODEL_RECORD_PATH:
+        return RecordingLlm(model=model, llm=llm, recording=_recording(MODEL_RECORD_PATH, load=False))
+    return llm
@@ -0,0 +1,337 @@
+"""
+Process-wide rate limiting and concurrency control for model calls.
+
+Every model name gets one `ModelGovernor`, shared by all agents and sessions
+in the process. A governor enforces requests-per-minute and tokens-per-minute
+token buckets and a cap on requests in flight. When the model reports a quota
+error (HTTP 429), it pauses every caller of that model for a jittered,
+exponentially growing backoff. `GovernedLlm` wraps any `BaseLlm` so that its
+calls go through the governor of its model.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from pydantic import Field
+
+from ..telemetry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Rough token estimate for requests that have not been sent yet
+CHARS_PER_TOKEN = 4
+
+QUOTA_STATUSES = ("RESOURCE_EXHAUSTED", "TOO_MANY_REQUESTS")
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """Returns whether `error` reports an exhausted quota or rate limit (HTTP 429)."""
+    return getattr(error, "code", None) == 429 or getattr(error, "status", None) in QUOTA_STATUSES
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Estimates the input tokens of a request from its instruction and text parts."""
+    chars = 0
+    config = llm_request.config
+    if config and isinstance(config.system_instruction, str):
+        chars += len(config.system_instruction)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            chars += len(part.text or "")
+    return chars // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+
+    Callers reserve their amount immediately and sleep off any deficit, so
+    waiting callers are served in arrival order and no lock is held while
+    sleeping. A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_minute = rate_per_minute
+        self._available = float(rate_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` tokens from the bucket.
+
+        Args:
+            amount: Tokens to take; capped at the bucket capacity
+
+        Returns:
+            float: Seconds the caller has to wait before its reservation is covered
+        """
+        if self.rate_per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(
+                self.rate_per_minute,
+                self._available + (now - self._updated) * self.rate_per_minute / 60,
+            )
+            self._updated = now
+            self._available -= min(amount, self.rate_per_minute)
+            return max(0.0, -self._available * 60 / self.rate_per_minute)
+
+    def debit(self, amount: float) -> None:
+        """Takes tokens used beyond the reservation; later callers wait for them."""
+        if self.rate_per_minute <= 0 or amount <= 0:
+            return
+        with self._lock:
+            self._available -= amount
+
+
+class InFlightLimiter:
+    """
+    Counting semaphore shared by every thread and event loop in the process.
+
+    `asyncio.Semaphore` is bound to one event loop, while ADK runs tool calls
+    and some runners on loops of their own. Waiters are queued with the loop
+    they wait on and woken in arrival order through `call_soon_threadsafe`;
+    a released slot is handed to the next waiter directly. A limit of 0
+    disables the limiter.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._held = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a slot is free and takes it."""
+        if self.limit <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._held < self.limit and not self._waiters:
+                self._held += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in self._waiters
+                if not granted:
+                    self._waiters.remove(waiter)
+            # A slot handed over after the cancellation is released by `_grant`
+            if granted and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Frees a slot, handing it to the longest waiting caller if there is one."""
+        if self.limit <= 0:
+            return
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # The waiter's loop has been closed
+                    continue
+            self._held -= 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ModelGovernor:
+    """
+    Rate limits, concurrency cap and quota backoff for one model.
+
+    Attributes:
+        model: Model name the governor is keyed by
+        max_in_flight: Maximum concurrent requests in the process, across event loops (0 for no limit)
+        max_retries: Retries of a request that failed with a quota error
+        backoff_base: Backoff ceiling of the first retry, in seconds
+        backoff_max: Upper bound of the backoff ceiling, in seconds
+    """
+
+    def __init__(
+        self,
+        model: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_in_flight: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight = max_in_flight
+        self.in_flight = InFlightLimiter(max_in_flight)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "quota_errors": 0, "in_flight": 0, "wait_seconds": 0.0}
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    @contextlib.asynccontextmanager
+    async def slot(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """
+        Waits for a concurrency slot, quota backoff and both buckets, then holds the slot.
+
+        Args:
+            estimated_tokens: Tokens reserved from the tokens-per-minute bucket
+        """
+        started = time.monotonic()
+        await self.in_flight.acquire()
+        try:
+            wait = max(self._resume_at - time.monotonic(), 0.0)
+            wait = max(wait, self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            waited = time.monotonic() - started
+            self._count("wait_seconds", waited)
+            MODEL_WAIT_SECONDS.inc(waited, model=self.model)
+            self._count("requests")
+            self._count("in_flight")
+            try:
+                yield
+            finally:
+                self._count("in_flight", -1)
+        finally:
+            self.in_flight.release()
+
+    def record_usage(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        """Charges the tokens-per-minute bucket for tokens used beyond the estimate."""
+        if used_tokens:
+            self.tokens.debit(used_tokens - estimated_tokens)
+
+    def quota_exceeded(self, attempt: int) -> float:
+        """
+        Records a quota error and pauses all callers of the model.
+
+        Args:
+            attempt: Zero-based retry attempt of the failed request
+
+        Returns:
+            float: Jittered backoff in seconds before the model is called again
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        with self._lock:
+            self._stats["quota_errors"] += 1
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        MODEL_QUOTA_ERRORS.inc(model=self.model)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the request, quota error, in-flight and wait counters of the model."""
+        with self._lock:
+            return {"model": self.model, **self._stats}
+
+
+_governors: Dict[str, ModelGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(model: str, **limits: Any) -> ModelGovernor:
+    """
+    Returns the process-wide governor of `model`, creating it with `limits` on first use.
+
+    Args:
+        model: Model name
+        **limits: `ModelGovernor` settings used if the governor does not exist yet
+
+    Returns:
+        ModelGovernor: The shared governor
+    """
+    with _governors_lock:
+        governor = _governors.get(model)
+        if governor is None:
+            governor = _governors[model] = ModelGovernor(model, **limits)
+        return governor
+
+
+def governor_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns the counters of every governor in the process, keyed by model name."""
+    with _governors_lock:
+        governors = list(_governors.values())
+    return {governor.model: governor.stats() for governor in governors}
+
+
+class GovernedLlm(BaseLlm):
+    """
+    Model wrapper sending every request through the governor of its model.
+
+    Requests that fail with a quota error before any response was received
+    are retried up to `governor.max_retries` times, once the backoff set by
+    the governor has passed.
+    """
+
+    llm: BaseLlm = Field(description="Wrapped model")
+    governor: ModelGovernor = Field(description="Governor of the wrapped model")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated_tokens = estimate_request_tokens(llm_request)
+        attempt = 0
+        while True:
+            received = False
+            async with self.governor.slot(estimated_tokens):
+                try:
+                    async for response in self.llm.generate_content_async(llm_request, stream):
+                        received = True
+                        if response.usage_metadata and not response.partial:
+                            self.governor.record_usage(
+                                estimated_tokens, response.usage_metadata.total_token_count
+                            )
+                        yield response
+                    return
+                except Exception as error:
+                    if received or not is_quota_error(error):
+                        raise
+                    delay = self.governor.quota_exceeded(attempt)
+                    if attempt >= self.governor.max_retries:
+                        raise
+            attempt += 1
+            logger.warning(
+                "Quota exceeded for %s, retry %d/%d in %.1fs",
+                self.model, attempt, self.governor.max_retries, delay,
+            )
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
+
+
+MODEL_IN_FLIGHT = REGISTRY.gauge("ba_model_in_flight", "Model requests in flight", ["model"])
+MODEL_QUOTA_ERRORS = REGISTRY.counter("ba_model_quota_errors_total", "Quota errors (HTTP 429)", ["model"])
+MODEL_WAIT_SECONDS = REGISTRY.counter(
+    "ba_model_governor_wait_seconds_total", "Time spent waiting for rate limits and backoff", ["model"]
+)
+
+
+def _collect_metrics() -> None:
+    for model, stats in governor_stats().items():
+        MODEL_IN_FLIGHT.set(stats["in_flight"], model=model)
+
+
+REGISTRY.add_collector(_collect_metrics)
@@ -0,0 +1,181 @@
+"""
+Record and replay of model traffic for deterministic offline runs.
+
+`RecordingLlm` passes requests to the wrapped model and appends every
+request/response pair to a JSONL `ModelRecording`. `ReplayLlm` answers
+from such a recording without any network access, with the recorded or a
+fixed injected latency. Requests are matched on a key that ignores the model
+name and the random function call IDs, so a recording made with one model
+configuration replays under another.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import Field
+
+logger = logging.getLogger(__name__)
+
+
+def _part_material(part: types.Part) -> Dict[str, Any]:
+    material: Dict[str, Any] = {}
+    if part.text:
+        material["text"] = part.text
+    if part.inline_data and part.inline_data.data:
+        material["inline_data"] = hashlib.sha256(part.inline_data.data).hexdigest()
+    if part.function_call:
+        material["function_call"] = {"name": part.function_call.name, "args": part.function_call.args}
+    if part.function_response:
+        material["function_response"] = {
+            "name": part.function_response.name,
+            "response": part.function_response.response,
+        }
+    return material
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """
+    Computes the replay key of a request.
+
+    Covers the system instruction, the contents, the output schema and the
+    tool names; leaves out the model name and function call IDs.
+
+    Args:
+        llm_request: The request
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    config = llm_request.config
+    schema = config.response_schema if config else None
+    material = {
+        "instruction": config.system_instruction if config else None,
+        "contents": [
+            {"role": content.role, "parts": [_part_material(part) for part in content.parts or []]}
+            for content in llm_request.contents
+        ],
+        "schema": getattr(schema, "__name__", None),
+        "tools": sorted(llm_request.tools_dict),
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ModelRecording:
+    """
+    JSONL file of recorded model calls, one `{key, model, latency, responses}` object per line.
+
+    Several answers recorded for the same key are replayed in recorded order,
+    repeating the last one once they are used up.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.replayed = 0
+        self.replayed_latency = 0.0
+
+    def load(self) -> "ModelRecording":
+        """Reads all entries of the recording file."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logger.info("Loaded %d recorded model calls from %s", sum(map(len, self._entries.values())), self.path)
+        return self
+
+    def append(self, key: str, model: str, latency: float, responses: List[LlmResponse]) -> None:
+        """Appends one model call to the recording file."""
+        entry = {
+            "key": key,
+            "model": model,
+            "latency": round(latency, 4),
+            "responses": [json.loads(response.model_dump_json(exclude_none=True)) for response in responses],
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def next_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the next recorded answer for `key`, or None if nothing was recorded."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            entry = entries[min(self._served[key], len(entries) - 1)]
+            self._served[key] += 1
+            return entry
+
+    def record_replay(self, latency: float) -> None:
+        """Counts one replayed call and its injected latency."""
+        with self._lock:
+            self.replayed += 1
+            self.replayed_latency += latency
+
+
+class RecordingLlm(BaseLlm):
+    """Model wrapper appending every request/response pair to a recording."""
+
+    llm: BaseLlm = Field(description="Wrapped model")
+    recording: ModelRecording = Field(description="Recording the calls are appended to")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        responses: List[LlmResponse] = []
+        started = time.perf_counter()
+        async for response in self.llm.generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        self.recording.append(key, self.llm.model, time.perf_counter() - started, responses)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
+
+
+class ReplayLlm(BaseLlm):
+    """
+    Model answering from a recording, fully offline.
+
+    Attributes:
+        latency: Fixed delay per call in seconds; None replays the recorded latency
+        latency_scale: Factor applied to the recorded latency
+    """
+
+    recording: ModelRecording = Field(description="Recording to answer from")
+    latency: Optional[float] = None
+    latency_scale: float = 1.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        entry = self.recording.next_entry(key)
+        if entry is None:
+            raise LookupError(f"No recorded response for {self.model} request {key[:12]}")
+
+        delay = self.latency if self.latency is not None else entry["latency"] * self.latency_scale
+        self.recording.record_replay(delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        for raw in entry["responses"]:
+            response = LlmResponse.model_validate_json(json.dumps(raw))
+            if response.partial and not stream:
+                continue
+            yield response
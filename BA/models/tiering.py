@@ -0,0 +1,183 @@
+"""
+Tiered model escalation: a fast model first, the strong model on failure.
+
+`TieredLlm` sends each request to a fast model and checks the result. For
+schema-constrained requests the response must validate against the schema,
+every top-level list must be non-empty, IDs must be unique within a list and
+every actor a use case names must appear in the request. Other requests only
+need a non-empty answer. If a check fails or the fast model raises, the
+request is sent again to the strong model. Escalations are counted per tier
+so the split can be tuned.
+"""
+
+import logging
+import threading
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from ..telemetry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    texts: List[str] = []
+    config = llm_request.config
+    if config and isinstance(config.system_instruction, str):
+        texts.append(config.system_instruction)
+    for content in llm_request.contents:
+        texts.extend(part.text for part in content.parts or [] if part.text)
+    return "\n".join(texts)
+
+
+def check_output(output: Dict[str, Any], request_text: str) -> List[str]:
+    """
+    Checks a schema-valid extraction output for signs of a weak answer.
+
+    Args:
+        output: The validated output as a dict
+        request_text: Instruction and contents of the request
+
+    Returns:
+        List[str]: Problems found; empty if the output passes
+    """
+    problems: List[str] = []
+    known = request_text.lower()
+    for field, value in output.items():
+        if not isinstance(value, list):
+            continue
+        if not value:
+            problems.append(f"`{field}` is empty")
+            continue
+        ids = [item.get("id") for item in value if isinstance(item, dict) and item.get("id")]
+        duplicates = sorted({item_id for item_id in ids if ids.count(item_id) > 1})
+        if duplicates:
+            problems.append(f"duplicate IDs in `{field}`: {', '.join(duplicates)}")
+        for item in value:
+            if not isinstance(item, dict):
+                continue
+            unknown = [actor for actor in item.get("actors") or [] if str(actor).lower() not in known]
+            if unknown:
+                problems.append(f"{item.get('id', field)} references unknown actors: {', '.join(map(str, unknown))}")
+    return problems
+
+
+def check_response(response_text: str, has_function_call: bool, llm_request: LlmRequest) -> List[str]:
+    """
+    Checks the aggregated answer of the fast model.
+
+    Args:
+        response_text: Concatenated text of the final response
+        has_function_call: Whether the response calls a tool
+        llm_request: The request that was answered
+
+    Returns:
+        List[str]: Problems found; empty if the answer is accepted
+    """
+    schema = llm_request.config.response_schema if llm_request.config else None
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return [] if response_text.strip() or has_function_call else ["empty response"]
+    try:
+        output = schema.model_validate_json(response_text)
+    except ValidationError as error:
+        return [f"invalid {schema.__name__}: {error.error_count()} validation errors"]
+    return check_output(output.model_dump(), _request_text(llm_request))
+
+
+class EscalationStats:
+    """Process-wide request and escalation counters per tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tier: str, escalated: bool) -> None:
+        """Counts one request of `tier` and whether it was escalated."""
+        with self._lock:
+            counts = self._counts.setdefault(tier, {"requests": 0, "escalations": 0})
+            counts["requests"] += 1
+            counts["escalations"] += int(escalated)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns requests, escalations and escalation rate per tier."""
+        with self._lock:
+            return {
+                tier: {
+                    **counts,
+                    "escalation_rate": round(counts["escalations"] / counts["requests"], 3),
+                }
+                for tier, counts in self._counts.items()
+            }
+
+
+escalation_stats = EscalationStats()
+
+
+class TieredLlm(BaseLlm):
+    """
+    Model wrapper that answers with `fast` and escalates to `strong` when checks fail.
+
+    Responses of the fast model are held back until its final response has
+    passed the checks, so a rejected answer never reaches the agent.
+    """
+
+    fast: BaseLlm = Field(description="Model tried first")
+    strong: BaseLlm = Field(description="Model used when the fast model's answer is rejected")
+    tier: str = Field(description="Name the escalation counters are recorded under")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses: List[LlmResponse] = []
+        problems: List[str] = []
+        try:
+            # Models may add to the request; keep the original intact for the strong model
+            fast_request = llm_request.model_copy(update={
+                "model": self.fast.model,
+                "contents": list(llm_request.contents),
+                "config": llm_request.config.model_copy() if llm_request.config else None,
+            })
+            async for response in self.fast.generate_content_async(fast_request, stream):
+                responses.append(response)
+            problems = self._check(responses, llm_request)
+        except Exception as error:
+            problems = [f"{type(error).__name__}: {error}"]
+
+        escalated = bool(problems)
+        escalation_stats.record(self.tier, escalated)
+        TIER_REQUESTS.inc(tier=self.tier)
+        if escalated:
+            TIER_ESCALATIONS.inc(tier=self.tier)
+        if not escalated:
+            for response in responses:
+                yield response
+            return
+
+        logger.info(
+            "Escalating %s from %s to %s: %s",
+            self.tier, self.fast.model, self.strong.model, "; ".join(problems),
+        )
+        llm_request.model = self.strong.model
+        async for response in self.strong.generate_content_async(llm_request, stream):
+            yield response
+
+    def _check(self, responses: List[LlmResponse], llm_request: LlmRequest) -> List[str]:
+        final = [response for response in responses if not response.partial]
+        if not final:
+            return ["no response"]
+        if any(response.error_code for response in final):
+            return [f"error {final[-1].error_code}: {final[-1].error_message}"]
+        parts = [part for response in final if response.content for part in response.content.parts or []]
+        text = "".join(part.text or "" for part in parts if not part.thought)
+        return check_response(text, any(part.function_call for part in parts), llm_request)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.strong.connect(llm_request)
+
+
+TIER_REQUESTS = REGISTRY.counter("ba_model_tier_requests_total", "Requests to tiered models", ["tier"])
+TIER_ESCALATIONS = REGISTRY.counter(
+    "ba_model_tier_escalations_total", "Requests escalated from the fast to the strong model", ["tier"]
+)
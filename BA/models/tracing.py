@@ -0,0 +1,62 @@
+"""
+Tracing wrapper for model calls.
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from pydantic import Field
+
+from ..telemetry import span
+from ..telemetry.metrics import MODEL_PAYLOAD_BYTES, MODEL_TOKENS
+
+
+def _request_bytes(llm_request: LlmRequest) -> int:
+    size = 0
+    config = llm_request.config
+    if config and isinstance(config.system_instruction, str):
+        size += len(config.system_instruction.encode("utf-8"))
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            size += len((part.text or "").encode("utf-8"))
+    return size
+
+
+class TracedLlm(BaseLlm):
+    """
+    Model wrapper recording a span and latency, token and payload metrics per call.
+    """
+
+    llm: BaseLlm = Field(description="Wrapped model")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        model = self.llm.model
+        input_bytes = _request_bytes(llm_request)
+        output_bytes = 0
+        usage = None
+        # Not the current span: the consumer's context may change between yields
+        with span("model", model, {"ba.stream": stream, "ba.input_bytes": input_bytes}, current=False) as otel_span:
+            async for response in self.llm.generate_content_async(llm_request, stream):
+                if not response.partial:
+                    if response.content:
+                        output_bytes += sum(
+                            len((part.text or "").encode("utf-8")) for part in response.content.parts or []
+                        )
+                    usage = response.usage_metadata or usage
+                yield response
+
+            otel_span.set_attribute("ba.output_bytes", output_bytes)
+            MODEL_PAYLOAD_BYTES.inc(input_bytes, model=model, direction="input")
+            MODEL_PAYLOAD_BYTES.inc(output_bytes, model=model, direction="output")
+            if usage is not None:
+                input_tokens = usage.prompt_token_count or 0
+                output_tokens = usage.candidates_token_count or 0
+                otel_span.set_attribute("ba.input_tokens", input_tokens)
+                otel_span.set_attribute("ba.output_tokens", output_tokens)
+                MODEL_TOKENS.inc(input_tokens, model=model, direction="input")
+                MODEL_TOKENS.inc(output_tokens, model=model, direction="output")
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
@@ -0,0 +1,38 @@
+"""Business Analyst pipeline orchestration module."""
+
+from .scheduler import Stage, StageScheduler, STAGE_TIMINGS_KEY, STAGE_CACHE_KEY
+from .cache import StageCache, CacheBackend, SQLiteCacheBackend
+from .coalescing import SingleFlight
+from .chunking import ChunkedExtractionAgent, split_into_chunks, merge_requirements
+from .incremental import IncrementalAnalysisAgent, ProjectSnapshotStore, PROJECT_ID_KEY
+from .streaming import IncrementalItemParser, ExtractionItemStream
+from .retrieval import RequirementIndex, ActorScopedUseCaseAgent
+from .artifacts import ArtifactStore, ArtifactState, OffloadingSessionService, offloading_session_services
+from .normalization import DocumentNormalizationAgent, NORMALIZATION_KEY
+
+__all__ = [
+    "Stage",
+    "StageScheduler",
+    "STAGE_TIMINGS_KEY",
+    "STAGE_CACHE_KEY",
+    "StageCache",
+    "CacheBackend",
+    "SQLiteCacheBackend",
+    "SingleFlight",
+    "ChunkedExtractionAgent",
+    "split_into_chunks",
+    "merge_requirements",
+    "IncrementalAnalysisAgent",
+    "ProjectSnapshotStore",
+    "PROJECT_ID_KEY",
+    "IncrementalItemParser",
+    "ExtractionItemStream",
+    "RequirementIndex",
+    "ActorScopedUseCaseAgent",
+    "ArtifactStore",
+    "ArtifactState",
+    "OffloadingSessionService",
+    "offloading_session_services",
+    "DocumentNormalizationAgent",
+    "NORMALIZATION_KEY",
+]
@@ -0,0 +1,292 @@
+"""
+Offloading of large session state values to a content-addressed artifact store.
+
+The parsed document and the four stage outputs are the largest values in
+session state, and session services keep and persist every state delta of
+every event. `OffloadingSessionService` wraps a session service and replaces
+state values above a size threshold with a small handle before an event or a
+new session is stored. The value itself is written once to an
+`ArtifactStore` on local disk, keyed by the SHA-256 of its JSON encoding, so
+repeated writes of the same output share one file.
+
+Sessions returned by the wrapper hold an `ArtifactState`, which loads a
+handle's value only when the key is read. Agents, instruction templates and
+tools read state as before. `offloading_session_services` applies the
+wrapper to the session service ADK's `get_fast_api_app` builds for itself.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from ..telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+# Key marking a state value as a handle to an offloaded artifact
+ARTIFACT_KEY = "$artifact"
+
+# Session service classes `get_fast_api_app` picks from, depending on its `session_db_url`
+ADK_SESSION_SERVICES = ("InMemorySessionService", "DatabaseSessionService", "VertexAiSessionService")
+
+
+def is_artifact_handle(value: Any) -> bool:
+    """Returns whether a state value is a handle written by `ArtifactStore.put`."""
+    return isinstance(value, dict) and len(value) == 2 and ARTIFACT_KEY in value and "bytes" in value
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of JSON values on local disk.
+
+    Values are written to `<root>/<digest[:2]>/<digest>.json`. Recently loaded
+    values are kept decoded in a small LRU, so a value read by several agents
+    of one run is parsed once.
+    """
+
+    def __init__(self, root: str, max_cached: int = 4):
+        self.root = root
+        self.max_cached = max_cached
+        self._cached: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.loads = 0
+        self.bytes_written = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.json")
+
+    @traced("storage", "artifact_store.put")
+    def put(self, encoded: bytes) -> Dict[str, Any]:
+        """
+        Stores a JSON-encoded value unless a value with the same digest exists.
+
+        Args:
+            encoded: UTF-8 JSON encoding of the value
+
+        Returns:
+            Dict[str, Any]: Handle to keep in state in place of the value
+        """
+        digest = hashlib.sha256(encoded).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial artifact
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encoded)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            with self._lock:
+                self.writes += 1
+                self.bytes_written += len(encoded)
+        return {ARTIFACT_KEY: digest, "bytes": len(encoded)}
+
+    @traced("storage", "artifact_store.load")
+    def load(self, handle: Dict[str, Any]) -> Any:
+        """
+        Returns the value a handle points to.
+
+        Raises:
+            FileNotFoundError: If the artifact was removed from the store.
+        """
+        digest = handle[ARTIFACT_KEY]
+        with self._lock:
+            if digest in self._cached:
+                self._cached.move_to_end(digest)
+                return self._cached[digest]
+        with open(self._path(digest), "rb") as f:
+            value = json.loads(f.read())
+        with self._lock:
+            self.loads += 1
+            self._cached[digest] = value
+            while len(self._cached) > self.max_cached:
+                self._cached.popitem(last=False)
+        return value
+
+    def offload(self, value: Any, threshold: int) -> Any:
+        """Returns a handle for `value` if its JSON encoding has at least `threshold` bytes, else `value`."""
+        if is_artifact_handle(value) or isinstance(value, (bool, int, float)) or value is None:
+            return value
+        try:
+            encoded = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError):
+            return value
+        return self.put(encoded) if len(encoded) >= threshold else value
+
+    def resolve(self, value: Any) -> Any:
+        """Returns the stored value if `value` is a handle, else `value` itself."""
+        return self.load(value) if is_artifact_handle(value) else value
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of artifacts written and loaded from disk."""
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "loads": self.loads,
+                "bytes_written": self.bytes_written,
+                "cached": len(self._cached),
+            }
+
+
+class ArtifactState(dict):
+    """
+    Session state that loads offloaded values when a key is read.
+
+    Raw handles stay in the dict, so session services store and copy only
+    the handles.
+    """
+
+    def __init__(self, values: Dict[str, Any], store: ArtifactStore):
+        super().__init__(values)
+        self.store = store
+
+    def __getitem__(self, key: str) -> Any:
+        return self.store.resolve(super().__getitem__(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        # Overriding __iter__ makes `{**state}` and `dict(state)` read through
+        # __getitem__, so copies handed to other sessions (e.g. by AgentTool)
+        # carry the values rather than handles.
+        return super().__iter__()
+
+    def raw(self) -> Dict[str, Any]:
+        """Returns a plain dict with the handles as stored."""
+        return {key: dict.__getitem__(self, key) for key in dict.keys(self)}
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ArtifactState":
+        return ArtifactState(copy.deepcopy(self.raw(), memo), self.store)
+
+
+class OffloadingSessionService(BaseSessionService):
+    """
+    Session service wrapper that keeps large state values in an `ArtifactStore`.
+
+    Attributes:
+        service: Wrapped session service that stores sessions and events
+        store: Store the large values are written to
+        threshold: Minimum JSON size in bytes of an offloaded value
+    """
+
+    def __init__(self, service: BaseSessionService, store: ArtifactStore, threshold: int):
+        self.service = service
+        self.store = store
+        self.threshold = threshold
+
+    def _offload_values(self, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Returns `values` with large values replaced by handles, or None if nothing was offloaded."""
+        offloaded = {
+            key: value if key.startswith(State.TEMP_PREFIX) else self.store.offload(value, self.threshold)
+            for key, value in values.items()
+        }
+        if all(offloaded[key] is value for key, value in values.items()):
+            return None
+        return offloaded
+
+    def _wrap(self, session: Optional[Session]) -> Optional[Session]:
+        if session is not None and not isinstance(session.state, ArtifactState):
+            session.state = ArtifactState(session.state, self.store)
+        return session
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        if state:
+            state = await asyncio.to_thread(self._offload_values, state) or state
+        session = await self.service.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        return self._wrap(session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = await self.service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        return self._wrap(session)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self.service.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.service.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        """
+        Stores a copy of `event` whose large state delta values are handles.
+
+        The caller keeps the original event with the full values, e.g. to
+        stream them to a client.
+        """
+        delta = event.actions.state_delta if event.actions else None
+        if delta and not event.partial:
+            offloaded = await asyncio.to_thread(self._offload_values, delta)
+            if offloaded is not None:
+                event = event.model_copy(
+                    update={"actions": event.actions.model_copy(update={"state_delta": offloaded})}
+                )
+        return await self.service.append_event(session, event)
+
+
+@contextmanager
+def offloading_session_services(module: ModuleType, store: ArtifactStore, threshold: int) -> Iterator[None]:
+    """
+    Wraps every session service `module` creates in the block in an `OffloadingSessionService`.
+
+    ADK's `get_fast_api_app` builds its session service internally and takes
+    no instance, so its classes are swapped in the module for the call:
+
+        with offloading_session_services(google.adk.cli.fast_api, store, threshold):
+            app = get_fast_api_app(...)
+
+    Args:
+        module: Module that looks up the session service classes by name
+        store: Store the large values are written to
+        threshold: Minimum JSON size in bytes of an offloaded value
+    """
+    originals = {name: getattr(module, name) for name in ADK_SESSION_SERVICES if hasattr(module, name)}
+
+    def wrapping(service_class: type):
+        def create(*args: Any, **kwargs: Any) -> OffloadingSessionService:
+            return OffloadingSessionService(service_class(*args, **kwargs), store, threshold)
+        return create
+
+    for name, service_class in originals.items():
+        setattr(module, name, wrapping(service_class))
+    try:
+        yield
+    finally:
+        for name, service_class in originals.items():
+            setattr(module, name, service_class)
@@ -0,0 +1,233 @@
+"""
+Content-addressed result cache for the analysis pipeline stages.
+
+A stage result is keyed by the hash of the uploaded document bytes and of
+the extractor and normalization settings that turn them into text, the
+stage name, the model, the prompt text and the output schema of every agent
+taking part in the stage, so a repeat analysis of the same document is served from
+the cache instead of re-running the LLM stages.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.sessions import Session
+from google.adk.tools.agent_tool import AgentTool
+
+from ..telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+# `Event.custom_metadata` flag set by stages whose output is incomplete (e.g.
+# some chunks failed); such outputs are written to state but never cached
+PARTIAL_OUTPUT = "ba_partial_output"
+
+
+class CacheBackend(ABC):
+    """Interface for stage cache storage backends."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the stored value for `key`, or None if it is not cached."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Stores `value` under `key`, evicting old entries if needed."""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk SQLite backend with size-based LRU eviction, safe across processes.
+
+    Entries are written in one transaction, so concurrent readers in other
+    processes (e.g. uvicorn workers) never see a partial value.
+    """
+
+    def __init__(self, path: str, max_bytes: int, table: str = "stage_results"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.table = table
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_last_access "
+                f"ON {self.table} (last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evict: List[str] = []
+            for old_key, size in conn.execute(
+                f"SELECT key, size FROM {self.table} WHERE key != ? ORDER BY last_access", (key,)
+            ):
+                if total <= self.max_bytes:
+                    break
+                evict.append(old_key)
+                total -= size
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in evict])
+
+
+def document_digest(session: Session, fingerprint: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Hashes the bytes of the most recently uploaded document(s) in a session.
+
+    The bytes alone do not determine the text the stages see, so the
+    settings that turn them into text (extractor versions, normalization)
+    are hashed along with them.
+
+    Args:
+        session: The ADK session to inspect
+        fingerprint: Settings applied to the uploaded bytes before the stages read them
+
+    Returns:
+        Optional[str]: SHA-256 hex digest, or None if no document was uploaded
+    """
+    for event in reversed(session.events):
+        if event.author != "user" or not event.content or not event.content.parts:
+            continue
+        digest = hashlib.sha256(json.dumps(fingerprint or {}, sort_keys=True, default=str).encode("utf-8"))
+        found = False
+        for part in event.content.parts:
+            if part.inline_data and part.inline_data.data:
+                data = part.inline_data.data
+                digest.update(data if isinstance(data, bytes) else str(data).encode("utf-8"))
+                found = True
+        if found:
+            return digest.hexdigest()
+    return None
+
+
+def agent_fingerprint(agent: BaseAgent) -> Dict[str, Any]:
+    """
+    Describes everything about an agent that determines its output.
+
+    Covers the model, the prompt text and the output schema of the agent and of
+    any agent it calls through an `AgentTool`. Custom agents can contribute
+    their own settings by defining `cache_fingerprint()`.
+    """
+    fingerprint: Dict[str, Any] = {"name": agent.name}
+    if isinstance(agent, LlmAgent):
+        model = agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", "")
+        fingerprint["model"] = model
+        fast = getattr(agent.model, "fast", None)
+        if fast is not None:
+            fingerprint["fast_model"] = fast.model
+        fingerprint["instruction"] = agent.instruction if isinstance(agent.instruction, str) else agent.instruction.__qualname__
+        if agent.output_schema:
+            fingerprint["output_schema"] = agent.output_schema.model_json_schema()
+        fingerprint["tools"] = [
+            agent_fingerprint(tool.agent) for tool in agent.tools if isinstance(tool, AgentTool)
+        ]
+    if hasattr(agent, "cache_fingerprint"):
+        fingerprint.update(agent.cache_fingerprint())
+    fingerprint["sub_agents"] = [agent_fingerprint(sub_agent) for sub_agent in agent.sub_agents]
+    return fingerprint
+
+
+def stage_key(stage: Any, inputs: Dict[str, Any], document: Optional[str]) -> str:
+    """
+    Computes the identity of a stage run.
+
+    Args:
+        stage: The pipeline stage
+        inputs: State values the stage consumes
+        document: Digest of the uploaded document, replacing external inputs when known
+
+    Returns:
+        str: SHA-256 hex digest of the key material
+    """
+    material = {
+        "stage": stage.name,
+        "document": document,
+        "inputs": inputs,
+        "agent": agent_fingerprint(stage.agent),
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class StageCache:
+    """Deterministic cache placed in front of the pipeline stages."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key_for(self, stage: Any, inputs: Dict[str, Any], document: Optional[str]) -> str:
+        """Computes the cache key of a stage run, see `stage_key`."""
+        return stage_key(stage, inputs, document)
+
+    @traced("storage", "stage_cache.get")
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached stage output for `key` and updates the hit/miss counters."""
+        try:
+            raw = self.backend.get(key)
+        except Exception as error:
+            logger.error(f"Error reading stage cache: {error}")
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    @traced("storage", "stage_cache.set")
+    def set(self, key: str, value: Any) -> None:
+        """Stores a stage output under `key`."""
+        try:
+            self.backend.set(key, json.dumps(value).encode("utf-8"))
+        except Exception as error:
+            logger.error(f"Error writing stage cache: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,226 @@
+"""
+Chunked map-reduce user requirement extraction for large documents.
+
+The parsed document is split by page markers or markdown headings into
+token-bounded chunks. `ur_extraction` runs on the chunks concurrently with a
+bounded fan-out and the per-chunk `UserRequirementsOutput` results are merged,
+with duplicates removed and requirement IDs renumbered.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import LlmRequest
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from ..sub_agents.ur_agent.agent import UserRequirementsOutput
+from .cache import PARTIAL_OUTPUT, agent_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Rough token estimate used for chunk sizing (no tokenizer needed offline)
+CHARS_PER_TOKEN = 4
+
+# A section starts at a page marker written by the readers or at a markdown heading
+_SECTION_BOUNDARY = re.compile(r"^(?=--- Page \d+ ---\s*$|#{1,6} )", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of `text`."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """
+    Splits a section larger than `max_chars` on paragraphs, then lines, then characters.
+
+    Separators stay at the end of the part before them, so the parts concatenate to `section`.
+    """
+    for separator in ("\n\n", "\n"):
+        pieces = section.split(separator)
+        if len(pieces) > 1:
+            parts: List[str] = []
+            for index, piece in enumerate(pieces):
+                ending = separator if index < len(pieces) - 1 else ""
+                if len(piece) > max_chars:
+                    split = _split_oversized(piece, max_chars)
+                    split[-1] += ending
+                    parts.extend(split)
+                elif piece or ending:
+                    parts.append(piece + ending)
+            return parts
+    return [section[i:i + max_chars] for i in range(0, len(section), max_chars)]
+
+
+def split_sections(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits document text into pages or heading blocks of at most `max_tokens` estimated tokens.
+
+    Args:
+        text: Parsed document text
+        max_tokens: Upper bound of estimated tokens per section
+
+    Returns:
+        List[str]: Sections in document order; concatenated they give back `text`
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    sections: List[str] = []
+    for section in _SECTION_BOUNDARY.split(text):
+        if len(section) > max_chars:
+            sections.extend(_split_oversized(section, max_chars))
+        elif section:
+            sections.append(section)
+    return sections
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits document text into chunks of at most `max_tokens` estimated tokens.
+
+    Sections (pages or heading blocks) are packed greedily so that a chunk
+    boundary falls on a section boundary whenever possible.
+
+    Args:
+        text: Parsed document text
+        max_tokens: Upper bound of estimated tokens per chunk
+
+    Returns:
+        List[str]: Non-empty chunks in document order
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    chunks: List[str] = []
+    current = ""
+    for section in split_sections(text, max_tokens):
+        if current and len(current) + len(section) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += section
+    if current:
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+async def extract_structured(extraction: LlmAgent, content: str) -> BaseModel:
+    """
+    Calls a schema-constrained extraction agent's model on `content` in a single request.
+
+    Args:
+        extraction: Extraction agent providing model, prompt, config and output schema
+        content: Text to extract from
+
+    Returns:
+        BaseModel: The validated `extraction.output_schema` instance
+    """
+    llm = extraction.canonical_model
+    config = (
+        extraction.generate_content_config.model_copy(deep=True)
+        if extraction.generate_content_config
+        else types.GenerateContentConfig()
+    )
+    request = LlmRequest(model=llm.model, config=config)
+    request.append_instructions([extraction.instruction])
+    request.set_output_schema(extraction.output_schema)
+    request.contents.append(types.Content(role="user", parts=[types.Part(text=content)]))
+
+    text = ""
+    async for response in llm.generate_content_async(request, stream=False):
+        if response.content and response.content.parts and not response.partial:
+            text += "".join(part.text or "" for part in response.content.parts)
+    return extraction.output_schema.model_validate_json(text)
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def merge_requirements(outputs: List[UserRequirementsOutput], id_prefix: str = "UR") -> UserRequirementsOutput:
+    """
+    Merges per-chunk extraction results into one output.
+
+    Requirements with the same normalized name and detail are kept once, in
+    order of first appearance, and IDs are renumbered sequentially.
+
+    Args:
+        outputs: Per-chunk results in document order
+        id_prefix: Prefix for the renumbered requirement IDs
+
+    Returns:
+        UserRequirementsOutput: The merged result
+    """
+    seen = set()
+    merged = []
+    for output in outputs:
+        for requirement in output.requirements:
+            key = (_normalize(requirement.name), _normalize(requirement.detail))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(requirement.model_copy(update={"id": f"{id_prefix}-{len(merged) + 1:03d}"}))
+    return UserRequirementsOutput(requirements=merged)
+
+
+class ChunkedExtractionAgent(BaseAgent):
+    """
+    Runs a schema-constrained extraction agent over document chunks concurrently.
+
+    Latency grows with the number of chunks divided by `max_concurrency`
+    rather than with document length, and no single call has to fit the whole
+    document in its context window.
+    """
+
+    extraction: LlmAgent = Field(description="Extraction agent providing model, prompt and schema")
+    input_key: str = Field(description="State key holding the document text")
+    output_key: str = Field(description="State key the merged result is written to")
+    max_chunk_tokens: int = 8000
+    max_concurrency: int = 4
+
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """Settings that change the output, used by the stage cache key."""
+        return {
+            "extraction": agent_fingerprint(self.extraction),
+            "max_chunk_tokens": self.max_chunk_tokens,
+        }
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        text = ctx.session.state.get(self.input_key) or ""
+        chunks = split_into_chunks(str(text), self.max_chunk_tokens)
+        if not chunks:
+            logger.warning("No content in `%s` to extract requirements from", self.input_key)
+            return
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def extract(index: int, chunk: str) -> Optional[UserRequirementsOutput]:
+            async with semaphore:
+                try:
+                    return await extract_structured(self.extraction, chunk)
+                except Exception as error:
+                    logger.error(f"Error extracting requirements from chunk {index + 1}/{len(chunks)}: {error}")
+                    return None
+
+        results = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks)))
+        outputs = [result for result in results if result is not None]
+        if not outputs:
+            logger.error("Requirement extraction failed for all %d chunks", len(chunks))
+            return
+
+        merged = merge_requirements(outputs)
+        logger.info(
+            "Extracted %d requirements from %d/%d chunks",
+            len(merged.requirements), len(outputs), len(chunks),
+        )
+        # Requirements of failed chunks are missing, so the result must not be cached
+        partial = len(outputs) < len(chunks)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: merged.model_dump(exclude_none=True)}),
+            custom_metadata={PARTIAL_OUTPUT: True} if partial else None,
+        )
@@ -0,0 +1,90 @@
+"""
+Single-flight coalescing of identical concurrent stage runs.
+
+When several sessions analyse the same document with the same pipeline
+configuration at the same time, only the first one runs each stage. The
+others attach to that run and receive its output when it finishes, without
+calling a model. Runs are keyed like the stage cache: stage, document digest,
+stage inputs and agent fingerprint.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Shares the result of an in-flight call with concurrent callers using the same key.
+
+    Calls must run on one event loop, as they do in the API server and the
+    batch job workers.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Runs `call`, or waits for the run already in flight under `key`.
+
+        If the leading run is cancelled (e.g. its client disconnected), a
+        waiting caller starts over and may become the new leader.
+
+        Args:
+            key: Identity of the call
+            call: Coroutine factory executed by the leading caller only
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it came from another caller's run
+
+        Raises:
+            Exception: Whatever the leading run raised.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = asyncio.get_running_loop().create_future()
+                    self.leaders += 1
+                    leader = True
+                else:
+                    self.followers += 1
+                    leader = False
+
+            if not leader:
+                try:
+                    return await asyncio.shield(flight), True
+                except asyncio.CancelledError:
+                    if not flight.cancelled():
+                        raise
+                    logger.info("Coalesced run %s was cancelled, retrying", key[:12])
+                    continue
+
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                flight.cancel()
+                raise
+            except Exception as error:
+                flight.set_exception(error)
+                # Mark the exception as retrieved when nobody attached to the run
+                flight.exception()
+                raise
+            else:
+                flight.set_result(result)
+                return result, False
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of leading and coalesced calls."""
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._flights)}
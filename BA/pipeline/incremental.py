@@ -0,0 +1,404 @@
+"""
+Incremental re-analysis of revised documents.
+
+Every analysed document with a `project_id` leaves a per-project snapshot:
+section-level fingerprints of the parsed text, the section each requirement
+came from, the four stage outputs and the lineage of each actor, data object
+and use case (the requirements it was derived from, see `derive_lineage`).
+When a revised document arrives in the same project, only changed sections
+are re-extracted. Entities derived solely from removed requirements are
+dropped, entities that lost some of their requirements are re-extracted from
+the remaining ones, and only the new requirements are sent through
+`ac`/`do`/`uc`; the stored outputs are patched in place.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import Field
+
+from ..telemetry import traced
+from .chunking import extract_structured, split_sections
+
+logger = logging.getLogger(__name__)
+
+# State key holding the project an analysis belongs to; without it the full pipeline runs
+PROJECT_ID_KEY = "project_id"
+
+DOCUMENT_KEY = "business_analyst_output"
+REQUIREMENTS_KEY = "user_requirements_extraction"
+
+# Output key -> (list field holding the entities, default ID prefix)
+ENTITY_OUTPUTS: Dict[str, Tuple[str, str]] = {
+    "ac_agent_output": ("actors", "AC"),
+    "do_agent_output": ("data_objects", "DO"),
+    "uc_agent_output": ("use_cases", "UC"),
+}
+
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_ID = re.compile(r"[A-Za-z]+-?\d+")
+
+
+def section_fingerprint(section: str) -> str:
+    """Hashes a section's text, ignoring whitespace differences."""
+    return hashlib.sha256(" ".join(section.split()).encode("utf-8")).hexdigest()
+
+
+def assign_sections(requirements: List[Dict[str, Any]], sections: Dict[str, str]) -> Dict[str, str]:
+    """
+    Maps each requirement to the section whose words overlap its text the most.
+
+    Args:
+        requirements: Requirement dicts from `user_requirements_extraction`
+        sections: Section fingerprint -> section text
+
+    Returns:
+        Dict[str, str]: Requirement ID -> section fingerprint
+    """
+    section_words = {digest: set(_WORD.findall(text.lower())) for digest, text in sections.items()}
+    mapping: Dict[str, str] = {}
+    for requirement in requirements:
+        words = set(_WORD.findall(f"{requirement.get('name', '')} {requirement.get('detail', '')}".lower()))
+        best = max(section_words, key=lambda digest: len(words & section_words[digest]), default=None)
+        if best is not None:
+            mapping[requirement["id"]] = best
+    return mapping
+
+
+def _texts(value: Any) -> List[str]:
+    """Collects the strings nested in an entity."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _texts(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _texts(item)]
+    return []
+
+
+def derive_lineage(key: str, entity: Dict[str, Any], requirements: List[Dict[str, Any]]) -> List[str]:
+    """
+    Returns the IDs of the requirements an entity was derived from.
+
+    A use case is derived from the requirements whose IDs it references. Any
+    entity is derived from the requirements whose text names it; failing
+    that, from the requirements sharing the most words with it.
+
+    Args:
+        key: Output key of the entity, see `ENTITY_OUTPUTS`
+        entity: Actor, data object or use case
+        requirements: Requirement dicts from `user_requirements_extraction`
+
+    Returns:
+        List[str]: Requirement IDs, empty if no requirement relates to the entity
+    """
+    texts = {
+        requirement["id"]: _normalize(" ".join(_texts({k: v for k, v in requirement.items() if k != "id"})))
+        for requirement in requirements
+    }
+    entity_fields = {k: v for k, v in entity.items() if k != "id"}
+    if key == "uc_agent_output":
+        referenced = {match.upper() for match in _ID.findall(" ".join(_texts(entity_fields)))}
+        sources = [rid for rid in texts if rid.upper() in referenced]
+        if sources:
+            return sources
+    name = _normalize(entity.get("name", ""))
+    if name:
+        sources = [rid for rid, text in texts.items() if re.search(rf"\b{re.escape(name)}", text)]
+        if sources:
+            return sources
+    words = set(_WORD.findall(_normalize(" ".join(_texts(entity_fields)))))
+    overlap = {rid: len(words & set(_WORD.findall(text))) for rid, text in texts.items()}
+    best = max(overlap.values(), default=0)
+    return [rid for rid, count in overlap.items() if count == best] if best else []
+
+
+def _next_id(existing: List[str], default_prefix: str) -> str:
+    """Returns the next sequential ID after `existing`, keeping their prefix style."""
+    prefix, width, highest = f"{default_prefix}-", 3, 0
+    for value in existing:
+        match = re.match(r"^(.*?)(\d+)$", value)
+        if match:
+            prefix, width = match.group(1), len(match.group(2))
+            highest = max(highest, int(match.group(2)))
+    return f"{prefix}{highest + 1:0{width}d}"
+
+
+def _normalize(value: str) -> str:
+    return " ".join(str(value).lower().split())
+
+
+class ProjectSnapshotStore:
+    """Stores one JSON analysis snapshot per project, written atomically."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, project: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(project.encode('utf-8')).hexdigest()}.json")
+
+    @traced("storage", "project_snapshot.load")
+    def load(self, project: str) -> Optional[Dict[str, Any]]:
+        """Returns the latest snapshot of `project`, or None."""
+        try:
+            with open(self._path(project), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            logger.error(f"Error loading analysis snapshot for {project}: {error}")
+            return None
+
+    @traced("storage", "project_snapshot.save")
+    def save(self, project: str, snapshot: Dict[str, Any]) -> None:
+        """Replaces the snapshot of `project`."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self._path(project))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class IncrementalAnalysisAgent(BaseAgent):
+    """
+    Runs the analysis pipeline, re-using the previous version of a document where possible.
+
+    The single sub-agent is the full pipeline. It runs when the session has
+    no `project_id`, when there is no snapshot for the project, when the
+    stage outputs are already in state, or when more than `max_changed_ratio`
+    of the sections changed. Otherwise the stage outputs are patched from the
+    section diff.
+    """
+
+    store: Optional[ProjectSnapshotStore] = None
+    extractors: Dict[str, LlmAgent] = Field(
+        default_factory=dict,
+        description="Output key -> schema-constrained extraction agent used for partial re-runs",
+    )
+    section_max_tokens: int = 2000
+    max_changed_ratio: float = 0.5
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        pipeline = self.sub_agents[0]
+        state = ctx.session.state
+        # Without an explicit project, an upload cannot be told apart from a revision
+        if self.store is None or not state.get(DOCUMENT_KEY) or not state.get(PROJECT_ID_KEY):
+            async for event in pipeline.run_async(ctx):
+                yield event
+            return
+
+        project = str(state[PROJECT_ID_KEY])
+        sections = {
+            section_fingerprint(text): text
+            for text in split_sections(str(state[DOCUMENT_KEY]), self.section_max_tokens)
+            if text.strip()
+        }
+        previous = self.store.load(project)
+        outputs_present = any(key in state for key in [REQUIREMENTS_KEY, *ENTITY_OUTPUTS])
+
+        if previous is not None and not outputs_present:
+            try:
+                patched, snapshot = await self._patch(previous, sections)
+            except Exception as error:
+                logger.info(f"Running full analysis instead of incremental re-analysis: {error}")
+            else:
+                yield Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    actions=EventActions(state_delta=patched),
+                )
+                self.store.save(project, snapshot)
+                return
+
+        async for event in pipeline.run_async(ctx):
+            yield event
+        if all(key in state for key in [REQUIREMENTS_KEY, *ENTITY_OUTPUTS]):
+            self.store.save(project, self._full_snapshot(state, sections))
+
+    def _full_snapshot(self, state: Any, sections: Dict[str, str]) -> Dict[str, Any]:
+        """Builds a snapshot after a full pipeline run."""
+        outputs = {key: state[key] for key in [REQUIREMENTS_KEY, *ENTITY_OUTPUTS]}
+        requirements = outputs[REQUIREMENTS_KEY].get("requirements", [])
+        lineage: Dict[str, Dict[str, List[str]]] = {}
+        for key, (field, _) in ENTITY_OUTPUTS.items():
+            lineage[key] = {}
+            for entity in outputs[key].get(field, []):
+                sources = derive_lineage(key, entity, requirements)
+                # Entities no requirement relates to have no lineage and are never pruned
+                if sources:
+                    lineage[key][entity["id"]] = sources
+        return {
+            "sections": list(sections),
+            "requirement_sections": assign_sections(requirements, sections),
+            "outputs": outputs,
+            "lineage": lineage,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    async def _patch(
+        self, previous: Dict[str, Any], sections: Dict[str, str]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Patches the previous outputs for the changed sections of a revised document.
+
+        Returns:
+            Tuple of the state delta with all four outputs and the new snapshot.
+        """
+        outputs = json.loads(json.dumps(previous["outputs"]))
+        lineage = previous.get("lineage", {})
+        requirement_sections = dict(previous.get("requirement_sections", {}))
+        previous_sections: Set[str] = set(previous.get("sections", []))
+        changed = [digest for digest in sections if digest not in previous_sections]
+        if len(changed) > self.max_changed_ratio * len(sections):
+            raise ValueError(f"{len(changed)}/{len(sections)} sections changed")
+
+        # Keep requirements whose section is unchanged; re-extract changed sections
+        requirements = [
+            requirement for requirement in outputs[REQUIREMENTS_KEY].get("requirements", [])
+            if requirement_sections.get(requirement["id"]) in sections
+        ]
+        kept_ids = {requirement["id"] for requirement in requirements}
+        removed_ids = {
+            requirement["id"] for requirement in outputs[REQUIREMENTS_KEY].get("requirements", [])
+        } - kept_ids
+
+        extracted = await asyncio.gather(
+            *(extract_structured(self.extractors[REQUIREMENTS_KEY], sections[digest]) for digest in changed)
+        )
+        added: List[Dict[str, Any]] = []
+        known = {(_normalize(r["name"]), _normalize(r["detail"])) for r in requirements}
+        for digest, result in zip(changed, extracted):
+            for requirement in result.model_dump(exclude_none=True).get("requirements", []):
+                key = (_normalize(requirement["name"]), _normalize(requirement["detail"]))
+                if key in known:
+                    continue
+                known.add(key)
+                # Never reuse the ID of a removed requirement, which lineage may still name
+                requirement["id"] = _next_id([r["id"] for r in requirements] + sorted(removed_ids), "UR")
+                requirements.append(requirement)
+                added.append(requirement)
+                requirement_sections[requirement["id"]] = digest
+        outputs[REQUIREMENTS_KEY]["requirements"] = requirements
+        current_ids = {requirement["id"] for requirement in requirements}
+        requirement_sections = {
+            rid: digest for rid, digest in requirement_sections.items() if rid in current_ids
+        }
+        logger.info(
+            "Incremental analysis: %d/%d sections changed, %d requirements added, %d removed",
+            len(changed), len(sections), len(added), len(removed_ids),
+        )
+
+        # Drop entities derived only from removed requirements; entities that
+        # lost some of their requirements are re-extracted from the others
+        affected: Dict[str, Set[str]] = {}
+        dropped: Dict[str, List[str]] = {}
+        for key, (field, _) in ENTITY_OUTPUTS.items():
+            entity_lineage = lineage.setdefault(key, {})
+            affected[key] = set()
+            dropped[key] = []
+            entities = []
+            for entity in outputs[key].get(field, []):
+                if entity["id"] not in entity_lineage:
+                    entities.append(entity)
+                    continue
+                sources = [rid for rid in entity_lineage[entity["id"]] if rid not in removed_ids]
+                if not sources:
+                    entity_lineage.pop(entity["id"])
+                    dropped[key].append(entity["id"])
+                    continue
+                if len(sources) < len(entity_lineage[entity["id"]]):
+                    affected[key].add(entity["id"])
+                entity_lineage[entity["id"]] = sources
+                entities.append(entity)
+            outputs[key][field] = entities
+
+        # Run ac/do, then uc, only for new requirements and the requirements of affected entities
+        by_id = {requirement["id"]: requirement for requirement in requirements}
+
+        def inputs(key: str) -> List[Dict[str, Any]]:
+            ids = {rid for entity_id in affected[key] for rid in lineage[key][entity_id]}
+            return [requirement for requirement in requirements if requirement["id"] in ids] + [
+                requirement for requirement in added if requirement["id"] not in ids
+            ]
+
+        ac_input, do_input = inputs("ac_agent_output"), inputs("do_agent_output")
+        await asyncio.gather(
+            self._merge(outputs, lineage, "ac_agent_output", {"requirements": ac_input}, ac_input, affected, dropped),
+            self._merge(outputs, lineage, "do_agent_output", {"requirements": do_input}, do_input, affected, dropped),
+        )
+        uc_requirements = inputs("uc_agent_output")
+        uc_input = {
+            "requirements": uc_requirements,
+            "actors": outputs["ac_agent_output"].get("actors", []),
+            "data_objects": outputs["do_agent_output"].get("data_objects", []),
+        }
+        await self._merge(outputs, lineage, "uc_agent_output", uc_input, uc_requirements, affected, dropped)
+        lineage = {
+            key: {entity_id: [rid for rid in sources if rid in by_id] for entity_id, sources in entity_lineage.items()}
+            for key, entity_lineage in lineage.items()
+        }
+
+        snapshot = {
+            "sections": list(sections),
+            "requirement_sections": requirement_sections,
+            "outputs": outputs,
+            "lineage": lineage,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return outputs, snapshot
+
+    async def _merge(
+        self,
+        outputs: Dict[str, Any],
+        lineage: Dict[str, Dict[str, List[str]]],
+        key: str,
+        content: Dict[str, Any],
+        sources: List[Dict[str, Any]],
+        affected: Dict[str, Set[str]],
+        dropped: Dict[str, List[str]],
+    ) -> None:
+        """
+        Extracts entities from `sources` and merges them into `outputs[key]`.
+
+        New entities are appended. An affected entity (one that lost some of
+        its requirements) is replaced by its re-extracted version, keeping its
+        ID; other existing entities only gain lineage. IDs of `dropped`
+        entities are not given to new ones.
+        """
+        if not sources:
+            return
+        field, prefix = ENTITY_OUTPUTS[key]
+        result = (await extract_structured(self.extractors[key], json.dumps(content))).model_dump(exclude_none=True)
+        entities = outputs[key].setdefault(field, [])
+        by_name = {_normalize(entity["name"]): entity for entity in entities}
+        for entity in result.get(field, []):
+            derived = derive_lineage(key, entity, sources) or [requirement["id"] for requirement in sources]
+            existing = by_name.get(_normalize(entity["name"]))
+            if existing is None:
+                entity["id"] = _next_id([e["id"] for e in entities] + dropped[key], prefix)
+                entities.append(entity)
+                by_name[_normalize(entity["name"])] = entity
+                lineage[key][entity["id"]] = derived
+                continue
+            if existing["id"] in affected[key]:
+                existing.update({field_name: value for field_name, value in entity.items() if field_name != "id"})
+            lineage[key][existing["id"]] = sorted(set(lineage[key].get(existing["id"], [])) | set(derived))
+        for summary_field, value in result.items():
+            if summary_field != field and not outputs[key].get(summary_field):
+                outputs[key][summary_field] = value
@@ -0,0 +1,225 @@
+"""
+Local lexical retrieval over extracted requirements.
+
+`RequirementIndex` is an in-process BM25 index built from a
+`UserRequirementsOutput`; it needs no embedding service and indexes a few
+thousand requirements in milliseconds. `ActorScopedUseCaseAgent` uses it to
+run use case generation once per actor against only the top-k requirements
+relevant to that actor instead of the whole requirement list.
+"""
+
+import asyncio
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import Field
+
+from ..sub_agents.uc_agent.agent import UseCasesOutput
+from ..sub_agents.uc_agent.context import build_use_case_context
+from .cache import PARTIAL_OUTPUT, agent_fingerprint
+from .chunking import extract_structured
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words that carry no signal in requirement text
+STOP_WORDS = frozenset(
+    "a an and are as at be by can for from has have in is it its must of on or shall should "
+    "that the their this to was when which will with".split()
+)
+
+# Requirement fields that are indexed
+INDEXED_FIELDS = ("name", "type", "detail", "covered_usr")
+
+# Output format instructions sent ahead of every use case context
+USE_CASE_PREAMBLE = (
+    "Refer to requirements and data objects by their IDs, "
+    "and list the actors of each use case by name.\n\n"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases `text` and splits it into alphanumeric terms without stop words."""
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOP_WORDS]
+
+
+class RequirementIndex:
+    """
+    BM25 index over a list of requirements.
+
+    Attributes:
+        requirements: Indexed requirements, as dicts, in input order
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, requirements: Iterable[Mapping[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.requirements: List[Mapping[str, Any]] = list(requirements)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+        for position, requirement in enumerate(self.requirements):
+            terms = tokenize(" ".join(str(requirement.get(name) or "") for name in INDEXED_FIELDS))
+            self._lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self._postings[term].append((position, frequency))
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    @classmethod
+    def from_output(cls, output: Optional[Mapping[str, Any]], **kwargs: Any) -> "RequirementIndex":
+        """Builds the index from a `user_requirements_extraction` state value."""
+        return cls((output or {}).get("requirements", []), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.requirements)
+
+    def _idf(self, term: str) -> float:
+        matches = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.requirements) - matches + 0.5) / (matches + 0.5))
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[Mapping[str, Any], float]]:
+        """
+        Ranks requirements against a free-text query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+
+        Returns:
+            List[Tuple[Mapping, float]]: Matching requirements and their scores, best first
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf(term)
+            for position, frequency in self._postings.get(term, ()):
+                norm = 1 - self.b + self.b * self._lengths[position] / (self._average_length or 1)
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(self.requirements[position], score) for position, score in ranked]
+
+
+def actor_query(actor: Mapping[str, Any]) -> str:
+    """Builds a retrieval query from an actor's name, role, responsibilities and permissions."""
+    parts = [str(actor.get("name") or ""), str(actor.get("role") or "")]
+    for name in ("responsibilities", "permissions"):
+        parts.extend(str(item) for item in actor.get(name) or [])
+    return " ".join(parts)
+
+
+def merge_use_cases(outputs: List[UseCasesOutput], id_prefix: str = "UC") -> UseCasesOutput:
+    """
+    Merges per-actor use cases into one output.
+
+    Use cases with the same normalized name are kept once with their actors
+    combined, and IDs are renumbered sequentially.
+
+    Args:
+        outputs: Per-actor results
+        id_prefix: Prefix for the renumbered use case IDs
+
+    Returns:
+        UseCasesOutput: The merged result
+    """
+    merged: Dict[str, Any] = {}
+    for output in outputs:
+        for use_case in output.use_cases:
+            key = " ".join(use_case.name.lower().split())
+            if key in merged:
+                existing = merged[key]
+                existing.actors.extend(actor for actor in use_case.actors if actor not in existing.actors)
+                continue
+            merged[key] = use_case.model_copy(
+                update={"id": f"{id_prefix}-{len(merged) + 1:03d}", "actors": list(use_case.actors)}
+            )
+    return UseCasesOutput(use_cases=list(merged.values()))
+
+
+class ActorScopedUseCaseAgent(BaseAgent):
+    """
+    Generates use cases per actor from the requirements most relevant to that actor.
+
+    Below `min_requirements` requirements a single call with the full compact
+    context is made instead, since retrieval would not shrink the prompt.
+    """
+
+    extraction: LlmAgent = Field(description="Use case extraction agent providing model and schema")
+    output_key: str = "uc_agent_output"
+    top_k: int = 20
+    min_requirements: int = 50
+    max_concurrency: int = 4
+
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """Settings that change the output, used by the stage cache key."""
+        return {
+            "extraction": agent_fingerprint(self.extraction),
+            "top_k": self.top_k,
+            "min_requirements": self.min_requirements,
+            "preamble": USE_CASE_PREAMBLE,
+        }
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        index = RequirementIndex.from_output(state.get("user_requirements_extraction"))
+        actors = (state.get("ac_agent_output") or {}).get("actors", [])
+
+        if len(index) <= self.min_requirements or not actors:
+            contexts = [
+                "Define the use cases of the system based on the requirements below. "
+                + USE_CASE_PREAMBLE
+                + build_use_case_context(state)
+            ]
+        else:
+            contexts = [self._actor_context(state, index, actor) for actor in actors]
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def generate(position: int, content: str) -> Optional[UseCasesOutput]:
+            async with semaphore:
+                try:
+                    return await extract_structured(self.extraction, content)
+                except Exception as error:
+                    logger.error(f"Error generating use cases for context {position + 1}/{len(contexts)}: {error}")
+                    return None
+
+        results = await asyncio.gather(*(generate(i, content) for i, content in enumerate(contexts)))
+        outputs = [result for result in results if result is not None]
+        if not outputs:
+            logger.error("Use case generation failed for all %d contexts", len(contexts))
+            return
+
+        merged = merge_use_cases(outputs)
+        logger.info(
+            "Generated %d use cases from %d/%d contexts over %d requirements",
+            len(merged.use_cases), len(outputs), len(contexts), len(index),
+        )
+        # Use cases of failed contexts are missing, so the result must not be cached
+        partial = len(outputs) < len(contexts)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: merged.model_dump(exclude_none=True)}),
+            custom_metadata={PARTIAL_OUTPUT: True} if partial else None,
+        )
+
+    def _actor_context(self, state: Mapping[str, Any], index: RequirementIndex, actor: Mapping[str, Any]) -> str:
+        relevant = [requirement for requirement, _ in index.search(actor_query(actor), self.top_k)]
+        scoped = {
+            "user_requirements_extraction": {"requirements": relevant},
+            "ac_agent_output": {"actors": [actor]},
+            "do_agent_output": state.get("do_agent_output") or {},
+        }
+        return (
+            f"Define the use cases in which actor {actor.get('id', '')} ({actor.get('name', '')}) takes part, "
+            "based on the requirements below. "
+            + USE_CASE_PREAMBLE
+            + build_use_case_context(scoped)
+        )
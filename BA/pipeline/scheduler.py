@@ -0,0 +1,299 @@
+"""
+Dependency-driven scheduler for the analysis pipeline stages.
+
+Each stage declares the state keys it consumes and the `output_key` it
+produces. The scheduler derives the execution order from those declarations,
+starts every stage as soon as its inputs exist, runs independent stages
+concurrently and skips stages whose outputs are already in session state.
+Identical stage runs in concurrent sessions can be coalesced into one.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from .cache import PARTIAL_OUTPUT, StageCache, document_digest, stage_key
+from .coalescing import SingleFlight
+from ..telemetry import span
+from ..telemetry.metrics import STAGE_RUNS
+
+logger = logging.getLogger(__name__)
+
+# Session state key holding the wall time (seconds) of every executed stage
+STAGE_TIMINGS_KEY = "stage_timings"
+# Session state key holding the outcome of every stage: "hit" or "miss" in the
+# cache, or "shared" when it was taken from an identical run in another session
+STAGE_CACHE_KEY = "stage_cache"
+
+
+class Stage(BaseModel):
+    """Structure for a pipeline stage."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str = Field(description="Stage name used for scheduling and timings")
+    agent: BaseAgent = Field(description="Agent that produces the stage output")
+    inputs: List[str] = Field(default_factory=list, description="State keys the stage consumes")
+    output_key: str = Field(description="State key the stage writes its result to")
+
+
+def resolve_stage_order(stages: List[Stage]) -> List[Stage]:
+    """
+    Orders stages so that every stage comes after the stages producing its inputs.
+
+    Inputs that no stage produces are treated as external (e.g. the parsed
+    document in `business_analyst_output`) and impose no ordering.
+
+    Args:
+        stages: Stages in declaration order
+
+    Returns:
+        List[Stage]: Stages in a valid topological order
+
+    Raises:
+        ValueError: If two stages write the same key or the dependencies form a cycle.
+    """
+    producers: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.output_key in producers:
+            raise ValueError(
+                f"Stages `{producers[stage.output_key].name}` and `{stage.name}` "
+                f"both write `{stage.output_key}`"
+            )
+        producers[stage.output_key] = stage
+
+    ordered: List[Stage] = []
+    placed: Set[str] = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [
+            stage for stage in remaining
+            if all(producers[key].name in placed for key in stage.inputs if key in producers)
+        ]
+        if not ready:
+            names = ", ".join(stage.name for stage in remaining)
+            raise ValueError(f"Stage dependencies form a cycle between: {names}")
+        for stage in ready:
+            ordered.append(stage)
+            placed.add(stage.name)
+            remaining.remove(stage)
+    return ordered
+
+
+class StageScheduler(BaseAgent):
+    """
+    Runs pipeline stages as a dependency graph keyed on state reads and writes.
+
+    Stages start as soon as all of their inputs are present in state, so
+    independent stages overlap without anyone hand-tuning the order. The wall
+    time of every executed stage is recorded under `stage_timings`. When a
+    `cache` is configured, stage results are served from it before any model
+    is called. `document_fingerprint` describes how uploaded bytes become the
+    document text and is hashed into every key along with the upload. With a `coalescer`, a stage whose identical run is already in
+    flight in another session waits for that run's output instead of
+    starting its own.
+    """
+
+    stages: List[Stage] = Field(default_factory=list)
+    cache: Optional[StageCache] = None
+    coalescer: Optional[SingleFlight] = None
+    document_fingerprint: Dict[str, Any] = Field(default_factory=dict)
+
+    def __init__(self, **data):
+        stages = data.get("stages", [])
+        data.setdefault("sub_agents", [stage.agent for stage in stages])
+        super().__init__(**data)
+
+    @model_validator(mode="after")
+    def _validate_stages(self) -> "StageScheduler":
+        resolve_stage_order(self.stages)
+        return self
+
+    @property
+    def execution_order(self) -> List[Stage]:
+        """Stages in a valid topological order."""
+        return resolve_stage_order(self.stages)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        # Isolate the conversation history of concurrently running stages
+        ctx.branch = f"{ctx.branch}.{self.name}" if ctx.branch else self.name
+
+        producers = {stage.output_key: stage.name for stage in self.stages}
+        pending: Dict[str, Stage] = {stage.name: stage for stage in self.execution_order}
+        finished: Set[str] = set()
+        running: Dict[str, asyncio.Task] = {}
+        started_at: Dict[str, float] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        timings = dict(ctx.session.state.get(STAGE_TIMINGS_KEY) or {})
+        cache_outcomes = dict(ctx.session.state.get(STAGE_CACHE_KEY) or {})
+        keyed = self.cache is not None or self.coalescer is not None
+        document = document_digest(ctx.session, self.document_fingerprint) if keyed else None
+
+        def launch_ready_stages() -> None:
+            progressed = True
+            while progressed:
+                progressed = False
+                for stage in list(pending.values()):
+                    if not all(producers[key] in finished for key in stage.inputs if key in producers):
+                        continue
+                    del pending[stage.name]
+                    progressed = True
+                    if stage.output_key in ctx.session.state:
+                        logger.info("Skipping stage %s: `%s` already in state", stage.name, stage.output_key)
+                        finished.add(stage.name)
+                        continue
+                    started_at[stage.name] = time.perf_counter()
+                    running[stage.name] = asyncio.create_task(
+                        self._run_stage(stage, ctx, queue, document)
+                    )
+
+        try:
+            launch_ready_stages()
+            while running:
+                stage, event, signal = await queue.get()
+                if isinstance(event, Event):
+                    yield event
+                    signal.set()
+                    continue
+
+                del running[stage.name]
+                if isinstance(event, BaseException):
+                    raise event
+
+                timings[stage.name] = round(time.perf_counter() - started_at[stage.name], 3)
+                state_delta: Dict[str, Any] = {STAGE_TIMINGS_KEY: dict(timings)}
+                if signal is not None:
+                    cache_outcomes[stage.name] = signal
+                    state_delta[STAGE_CACHE_KEY] = dict(cache_outcomes)
+                yield self._state_event(ctx, state_delta)
+
+                if stage.output_key in ctx.session.state:
+                    finished.add(stage.name)
+                else:
+                    logger.warning("Stage %s finished without writing `%s`", stage.name, stage.output_key)
+                if ctx.end_invocation:
+                    break
+                launch_ready_stages()
+        finally:
+            for task in running.values():
+                task.cancel()
+
+        if pending:
+            logger.warning(
+                "Stages not run because their inputs are missing: %s",
+                ", ".join(pending),
+            )
+        if self.cache is not None:
+            logger.info("Stage cache stats: %s", self.cache.stats())
+        if self.coalescer is not None:
+            logger.info("Stage coalescing stats: %s", self.coalescer.stats())
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        ctx: InvocationContext,
+        queue: asyncio.Queue,
+        document: Optional[str],
+    ) -> None:
+        """
+        Runs one stage and forwards its events, waiting until each is processed upstream.
+
+        Finishes by queueing `(stage, None, outcome)` where outcome is "hit",
+        "miss" or "shared" (None without cache or coalescer), or `(stage, error, None)`.
+        """
+        try:
+            with span("stage", stage.name, {"ba.output_key": stage.output_key}) as otel_span:
+                outcome = await self._resolve_stage(stage, ctx, queue, document)
+                otel_span.set_attribute("ba.outcome", outcome or "run")
+            STAGE_RUNS.inc(stage=stage.name, outcome=outcome or "run")
+            await queue.put((stage, None, outcome))
+        except Exception as error:
+            STAGE_RUNS.inc(stage=stage.name, outcome="error")
+            await queue.put((stage, error, None))
+
+    async def _resolve_stage(
+        self,
+        stage: Stage,
+        ctx: InvocationContext,
+        queue: asyncio.Queue,
+        document: Optional[str],
+    ) -> Optional[str]:
+        """Produces the stage output from the cache, a coalesced run or the stage agent."""
+        key = None
+        if self.cache is not None or self.coalescer is not None:
+            key = stage_key(stage, self._cache_inputs(stage, ctx, document), document)
+
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                await self._forward(stage, self._state_event(ctx, {stage.output_key: cached}), queue)
+                return "hit"
+
+        if self.coalescer is None:
+            await self._execute(stage, ctx, queue, key)
+            return "miss" if key is not None else None
+
+        output, shared = await self.coalescer.run(key, lambda: self._execute(stage, ctx, queue, key))
+        if shared and output is not None:
+            await self._forward(stage, self._state_event(ctx, {stage.output_key: output}), queue)
+        return "shared" if shared else "miss"
+
+    async def _execute(
+        self,
+        stage: Stage,
+        ctx: InvocationContext,
+        queue: asyncio.Queue,
+        key: Optional[str],
+    ) -> Any:
+        """
+        Runs the stage agent, forwards its events and caches and returns its output.
+
+        Outputs flagged as partial by the stage (see `PARTIAL_OUTPUT`) are not cached.
+        """
+        partial = False
+        async for event in stage.agent.run_async(ctx):
+            partial = partial or bool((event.custom_metadata or {}).get(PARTIAL_OUTPUT))
+            await self._forward(stage, event, queue)
+
+        output = ctx.session.state.get(stage.output_key)
+        if partial:
+            logger.warning("Not caching the partial output of stage %s", stage.name)
+        elif self.cache is not None and output is not None:
+            await asyncio.to_thread(self.cache.set, key, output)
+        return output
+
+    async def _forward(self, stage: Stage, event: Event, queue: asyncio.Queue) -> None:
+        """Hands an event to the scheduler loop and waits until it has been processed."""
+        processed = asyncio.Event()
+        await queue.put((stage, event, processed))
+        await processed.wait()
+
+    def _cache_inputs(self, stage: Stage, ctx: InvocationContext, document: Optional[str]) -> Dict[str, Any]:
+        """
+        Collects the state values that go into a stage's cache key.
+
+        External inputs (keys no stage produces, i.e. the parsed document) are
+        represented by the document digest when one is known, so a re-upload of
+        the same file hits the cache even if the coordinator worded its preview
+        differently.
+        """
+        produced = {other.output_key for other in self.stages}
+        return {
+            key: ctx.session.state.get(key)
+            for key in stage.inputs
+            if key in produced or document is None
+        }
+
+    def _state_event(self, ctx: InvocationContext, state_delta: Dict) -> Event:
+        """Builds an event that only carries a state delta."""
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
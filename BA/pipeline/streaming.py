@@ -0,0 +1,155 @@
+"""
+Incremental extraction of validated items from streamed stage output.
+
+The extraction agents answer with one JSON object whose lists hold the
+extracted items. `IncrementalItemParser` scans the streamed text and returns
+each list element as soon as its closing brace arrives, so items can be
+validated and pushed to the client long before the whole object is complete.
+"""
+
+import json
+import logging
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple, Type
+
+from google.adk.events import Event
+from pydantic import BaseModel, ValidationError
+
+from ..sub_agents.ur_agent.agent import UserRequirement
+from ..sub_agents.ac_agent.agent import Actor
+from ..sub_agents.do_agent.agent import DataObject
+from ..sub_agents.uc_agent.agent import UseCase
+
+logger = logging.getLogger(__name__)
+
+# List field in a stage output -> (item type reported to clients, item model)
+ITEM_MODELS: Dict[str, Tuple[str, Type[BaseModel]]] = {
+    "requirements": ("requirement", UserRequirement),
+    "actors": ("actor", Actor),
+    "data_objects": ("data_object", DataObject),
+    "use_cases": ("use_case", UseCase),
+}
+
+
+def _item_key(item: Any) -> str:
+    """Returns the canonical JSON of an item, equal for a streamed item and its final copy."""
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class IncrementalItemParser:
+    """Returns each element object of the top-level JSON object's lists once it is complete."""
+
+    def __init__(self):
+        self._text = ""
+        self._stack: List[Tuple[str, str, int]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Consumes the next piece of streamed text.
+
+        Args:
+            chunk: Newly streamed text
+
+        Returns:
+            List[Tuple[str, str]]: (list field name, raw JSON of the element) for every element completed by `chunk`
+        """
+        completed: List[Tuple[str, str]] = []
+        offset = len(self._text)
+        self._text += chunk
+        for index in range(offset, len(self._text)):
+            char = self._text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = self._text[self._string_start + 1:index]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == "{":
+                self._stack.append(("{", "", index))
+            elif char == "[":
+                # Inside an object, an array is always the value of the last key read
+                key = self._last_string if self._stack and self._stack[-1][0] == "{" else ""
+                self._stack.append(("[", key, index))
+            elif char in "}]" and self._stack:
+                opener, _, start = self._stack.pop()
+                if (
+                    opener == "{"
+                    and len(self._stack) == 2
+                    and self._stack[0][0] == "{"
+                    and self._stack[1][0] == "["
+                ):
+                    completed.append((self._stack[1][1], self._text[start:index + 1]))
+        return completed
+
+
+class ExtractionItemStream:
+    """
+    Turns pipeline events into validated items, each reported exactly once.
+
+    Items are taken from partial (streamed) model output as soon as they
+    close. Items of stages that did not stream, for example with the
+    `agent_tool` wrapper or chunked extraction, are taken from the stage
+    output when it is written to state. Items already reported are matched
+    by content, so streamed items that failed validation do not hide final
+    ones.
+    """
+
+    def __init__(self):
+        self._parsers: Dict[str, IncrementalItemParser] = {}
+        # List field -> times each item, by canonical JSON, was reported
+        self._emitted: Dict[str, Counter] = defaultdict(Counter)
+
+    def process(self, event: Event) -> List[Dict[str, Any]]:
+        """
+        Returns the new validated items carried by `event`.
+
+        Args:
+            event: An event yielded by the runner
+
+        Returns:
+            List[Dict[str, Any]]: Items as `{"type": ..., "item": {...}}`
+        """
+        items: List[Dict[str, Any]] = []
+        if event.partial and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+            parser = self._parsers.setdefault(event.author, IncrementalItemParser())
+            for field, raw in parser.feed(text):
+                if field not in ITEM_MODELS:
+                    continue
+                kind, model = ITEM_MODELS[field]
+                try:
+                    item = model.model_validate_json(raw).model_dump(exclude_none=True)
+                except ValidationError as error:
+                    logger.warning(f"Skipping invalid streamed {kind}: {error}")
+                    continue
+                self._emitted[field][_item_key(item)] += 1
+                items.append({"type": kind, "item": item})
+
+        if event.actions and event.actions.state_delta:
+            for value in event.actions.state_delta.values():
+                if not isinstance(value, dict):
+                    continue
+                for field, (kind, _) in ITEM_MODELS.items():
+                    entries = value.get(field)
+                    if not isinstance(entries, list):
+                        continue
+                    # Report each entry not yet reported as often as it occurs in the output
+                    occurrences: Counter = Counter()
+                    for entry in entries:
+                        key = _item_key(entry)
+                        occurrences[key] += 1
+                        if occurrences[key] > self._emitted[field][key]:
+                            self._emitted[field][key] += 1
+                            items.append({"type": kind, "item": entry})
+        return items
@@ -1,26 +1,30 @@
 """Business Analyst Sub-Agents module."""
 
-from .ur_agent import ur_agent, ur_extraction, UserRequirementsOutput, UserRequirement
-from .ac_agent import ac_agent, ac_extraction, ActorsOutput, Actor, ActorInteraction
-from .do_agent import do_agent, do_extraction, DataObjectsOutput, DataObject
-from .uc_agent import uc_agent, uc_extraction, UseCasesOutput, UseCase
+from .ur_agent import ur_agent, ur_extraction, ur_direct_extraction, UserRequirementsOutput, UserRequirement
+from .ac_agent import ac_agent, ac_extraction, ac_direct_extraction, ActorsOutput, Actor, ActorInteraction
+from .do_agent import do_agent, do_extraction, do_direct_extraction, DataObjectsOutput, DataObject
+from .uc_agent import uc_agent, uc_extraction, uc_direct_extraction, UseCasesOutput, UseCase
 
 __all__ = [
     "ur_agent",
     "ur_extraction",
+    "ur_direct_extraction",
     "UserRequirementsOutput", 
     "UserRequirement",
     "ac_agent",
     "ac_extraction",
+    "ac_direct_extraction",
     "ActorsOutput",
     "Actor", 
     "ActorInteraction",
     "do_agent",
     "do_extraction",
+    "do_direct_extraction",
     "DataObjectsOutput",
     "DataObject",
     "uc_agent",
     "uc_extraction",
+    "uc_direct_extraction",
     "UseCasesOutput",
     "UseCase",
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 """AC (Actors) Agent module."""
 
-from .agent import ac_agent, ac_extraction, ActorsOutput, Actor, ActorInteraction
+from .agent import ac_agent, ac_extraction, ac_direct_extraction, ActorsOutput, Actor, ActorInteraction
 
-__all__ = ["ac_agent", "ac_extraction", "ActorsOutput", "Actor", "ActorInteraction"]
+__all__ = ["ac_agent", "ac_extraction", "ac_direct_extraction", "ActorsOutput", "Actor", "ActorInteraction"]
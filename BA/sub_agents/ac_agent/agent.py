@@ -8,8 +8,8 @@ from pydantic import BaseModel, Field
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 
-from .prompt import ACTORS_PROMPT, ACTORS_EXTRACTION_PROMPT
-from ...utils.utils import get_env_var
+from .prompt import ACTORS_PROMPT, ACTORS_EXTRACTION_PROMPT, ACTORS_DIRECT_PROMPT
+from ...models import build_model
 
 
 class ActorInteraction(BaseModel):
@@ -38,7 +38,7 @@ class ActorsOutput(BaseModel):
 
 # Create the Actors extraction Agent with LLM reasoning-based tools
 ac_extraction = LlmAgent(
-    model=get_env_var("AC_AGENT_MODEL"),
+    model=build_model("AC_AGENT_MODEL"),
     name="actors_extraction",
     instruction=ACTORS_EXTRACTION_PROMPT,
     output_schema=ActorsOutput,
@@ -46,7 +46,7 @@ ac_extraction = LlmAgent(
 )
 
 ac_agent = LlmAgent(
-    model=get_env_var("AC_AGENT_MODEL"),
+    model=build_model("AC_AGENT_MODEL"),
     name="ac_agent",
     # description="Identifies actors and stakeholders from requirements analysis",
     instruction=ACTORS_PROMPT,
@@ -58,3 +58,18 @@ ac_agent = LlmAgent(
         top_p=0.5
     )
 )
+
+# Single-call variant used by the pipeline in "direct" mode: reads its input
+# from state and produces the schema-constrained output without the wrapper hop.
+ac_direct_extraction = LlmAgent(
+    model=build_model("AC_AGENT_MODEL"),
+    name="ac_direct_extraction",
+    instruction=ACTORS_DIRECT_PROMPT,
+    output_schema=ActorsOutput,
+    output_key="ac_agent_output",
+    include_contents="none",
+    generate_content_config=GenerateContentConfig(
+        temperature=0.0,
+        top_p=0.5
+    )
+)
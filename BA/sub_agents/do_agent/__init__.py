@@ -1,5 +1,5 @@
 """DO (Data Objects) Agent module."""
 
-from .agent import do_agent, do_extraction, DataObjectsOutput, DataObject
+from .agent import do_agent, do_extraction, do_direct_extraction, DataObjectsOutput, DataObject
 
-__all__ = ["do_agent", "do_extraction", "DataObjectsOutput", "DataObject"]
+__all__ = ["do_agent", "do_extraction", "do_direct_extraction", "DataObjectsOutput", "DataObject"]
@@ -8,8 +8,8 @@ from pydantic import BaseModel, Field
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 
-from .prompt import DATA_OBJECTS_PROMPT, DATA_OBJECTS_EXTRACTION_PROMPT
-from ...utils.utils import get_env_var
+from .prompt import DATA_OBJECTS_PROMPT, DATA_OBJECTS_EXTRACTION_PROMPT, DATA_OBJECTS_DIRECT_PROMPT
+from ...models import build_model
 
 
 # class DataProperty(BaseModel):
@@ -39,7 +39,7 @@ class DataObjectsOutput(BaseModel):
 
 # Create the Data Objects extraction Agent with LLM reasoning-based tools
 do_extraction = LlmAgent(
-    model=get_env_var("DO_AGENT_MODEL"),
+    model=build_model("DO_AGENT_MODEL"),
     name="data_objects_extraction", 
     instruction=DATA_OBJECTS_EXTRACTION_PROMPT,
     output_schema=DataObjectsOutput,
@@ -47,7 +47,7 @@ do_extraction = LlmAgent(
 )
 
 do_agent = LlmAgent(
-    model=get_env_var("DO_AGENT_MODEL"),
+    model=build_model("DO_AGENT_MODEL"),
     name="do_agent",
     instruction=DATA_OBJECTS_PROMPT,
     tools=[
@@ -58,3 +58,18 @@ do_agent = LlmAgent(
         top_p=0.5
     )
 )
+
+# Single-call variant used by the pipeline in "direct" mode: reads its input
+# from state and produces the schema-constrained output without the wrapper hop.
+do_direct_extraction = LlmAgent(
+    model=build_model("DO_AGENT_MODEL"),
+    name="do_direct_extraction",
+    instruction=DATA_OBJECTS_DIRECT_PROMPT,
+    output_schema=DataObjectsOutput,
+    output_key="do_agent_output",
+    include_contents="none",
+    generate_content_config=GenerateContentConfig(
+        temperature=0.0,
+        top_p=0.5
+    )
+)
@@ -1,5 +1,5 @@
 """UC (Use Cases) Agent module."""
 
-from .agent import uc_agent, uc_extraction, UseCasesOutput, UseCase
+from .agent import uc_agent, uc_extraction, uc_direct_extraction, UseCasesOutput, UseCase
 
-__all__ = ["uc_agent", "uc_extraction", "UseCasesOutput", "UseCase"]
+__all__ = ["uc_agent", "uc_extraction", "uc_direct_extraction", "UseCasesOutput", "UseCase"]
@@ -8,8 +8,16 @@ from pydantic import BaseModel, Field
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 
-from .prompt import USE_CASES_PROMPT, USE_CASES_EXTRACTION_PROMPT
-from ...utils.utils import get_env_var
+from .prompt import (
+    USE_CASES_PROMPT,
+    USE_CASES_EXTRACTION_PROMPT,
+    USE_CASES_DIRECT_PROMPT,
+    USE_CASES_COMPACT_PROMPT,
+    USE_CASES_COMPACT_DIRECT_PROMPT,
+)
+from .context import compact_instruction
+from ...config import UC_COMPACT_CONTEXT
+from ...models import build_model
 
 
 # class UseCaseStep(BaseModel):
@@ -48,7 +56,7 @@ class UseCasesOutput(BaseModel):
 
 # Create the Use Cases extraction Agent with LLM reasoning-based tools
 uc_extraction = LlmAgent(
-    model=get_env_var("UC_AGENT_MODEL"),
+    model=build_model("UC_AGENT_MODEL"),
     name="use_cases_extraction",
     instruction=USE_CASES_EXTRACTION_PROMPT,
     output_schema=UseCasesOutput,
@@ -56,9 +64,9 @@ uc_extraction = LlmAgent(
 )
 
 uc_agent = LlmAgent(
-    model=get_env_var("UC_AGENT_MODEL"),
+    model=build_model("UC_AGENT_MODEL"),
     name="uc_agent",
-    instruction=USE_CASES_PROMPT,
+    instruction=compact_instruction(USE_CASES_COMPACT_PROMPT) if UC_COMPACT_CONTEXT else USE_CASES_PROMPT,
     tools=[
         AgentTool(agent=uc_extraction),
     ],
@@ -67,3 +75,20 @@ uc_agent = LlmAgent(
         top_p=0.5
     )
 )
+
+# Single-call variant used by the pipeline in "direct" mode: reads its input
+# from state and produces the schema-constrained output without the wrapper hop.
+uc_direct_extraction = LlmAgent(
+    model=build_model("UC_AGENT_MODEL"),
+    name="uc_direct_extraction",
+    instruction=(
+        compact_instruction(USE_CASES_COMPACT_DIRECT_PROMPT) if UC_COMPACT_CONTEXT else USE_CASES_DIRECT_PROMPT
+    ),
+    output_schema=UseCasesOutput,
+    output_key="uc_agent_output",
+    include_contents="none",
+    generate_content_config=GenerateContentConfig(
+        temperature=0.0,
+        top_p=0.5
+    )
+)
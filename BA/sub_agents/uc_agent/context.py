@@ -0,0 +1,66 @@
+"""
+Compact, ID-referenced context for the Use Cases agent.
+
+Instead of injecting the full `user_requirements_extraction`, `ac_agent_output`
+and `do_agent_output` blobs, each upstream entity is written as one line of
+selected fields with whitespace collapsed, under a header naming the fields.
+Use cases then refer to requirements and data objects by ID, and keep
+naming their actors, as `UseCase.actors` holds actor names.
+"""
+
+import hashlib
+from typing import Any, Callable, List, Mapping, Tuple
+
+# Section title, state key, list field and the entity fields kept for use case generation
+CONTEXT_SECTIONS: List[Tuple[str, str, str, List[str]]] = [
+    ("REQUIREMENTS", "user_requirements_extraction", "requirements", ["id", "name", "type"]),
+    ("ACTORS", "ac_agent_output", "actors", ["id", "name", "role"]),
+    ("DATA_OBJECTS", "do_agent_output", "data_objects", ["id", "name", "description"]),
+]
+
+
+def _field(value: Any) -> str:
+    if isinstance(value, list):
+        value = "; ".join(str(item) for item in value)
+    return " ".join(str(value).replace("|", "/").split())
+
+
+def build_use_case_context(
+    state: Mapping[str, Any],
+    sections: List[Tuple[str, str, str, List[str]]] = CONTEXT_SECTIONS,
+) -> str:
+    """
+    Serializes the upstream stage outputs into the compact context.
+
+    Args:
+        state: Session state holding the upstream outputs
+        sections: Section title, state key, list field and kept fields per entity type
+
+    Returns:
+        str: One `TITLE(field|field|...)` header per section followed by one line per entity
+    """
+    lines: List[str] = []
+    for title, key, list_field, fields in sections:
+        output = state.get(key) or {}
+        lines.append(f"{title}({'|'.join(fields)})")
+        for entity in output.get(list_field, []) if isinstance(output, dict) else []:
+            lines.append("|".join(_field(entity.get(name, "")) for name in fields))
+    return "\n".join(lines)
+
+
+def compact_instruction(template: str) -> Callable[[Any], str]:
+    """
+    Returns an instruction provider filling `{use_case_context}` in `template`.
+
+    Args:
+        template: Prompt containing a `{use_case_context}` placeholder
+
+    Returns:
+        Callable: Instruction provider for `LlmAgent.instruction`
+    """
+    def provider(context: Any) -> str:
+        return template.replace("{use_case_context}", build_use_case_context(context.state))
+
+    # Stable name so the stage cache key changes whenever the template does
+    provider.__qualname__ = f"compact_instruction[{hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]}]"
+    return provider
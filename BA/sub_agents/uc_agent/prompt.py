@@ -18,3 +18,39 @@ Data Objects Analysis:
 USE_CASES_EXTRACTION_PROMPT = """Extract and structure the use cases analysis from the following content.
 
 Extract and return only the structured use cases information in clean JSON format."""
+
+USE_CASES_DIRECT_PROMPT = """Create comprehensive use cases integrating all business analysis components.
+
+Define use cases with actors, flows, and data object interactions.
+
+User Requirements:
+{user_requirements_extraction}
+
+Actors Analysis:
+{ac_agent_output}
+
+Data Objects Analysis:
+{do_agent_output}
+
+Extract and return only the structured use cases information in clean JSON format."""
+
+# Compact variants: `{use_case_context}` is filled by `context.build_use_case_context`
+USE_CASES_COMPACT_PROMPT = """Create comprehensive use cases integrating all business analysis components.
+
+Define use cases with actors, flows, and data object interactions.
+
+The analysis components below list one entity per line, with `|`-separated fields in the order named in each section header. Refer to requirements and data objects by their IDs. List the `actors` of each use case by actor name, exactly as written in ACTORS, not by ID.
+
+{use_case_context}
+
+"""
+
+USE_CASES_COMPACT_DIRECT_PROMPT = """Create comprehensive use cases integrating all business analysis components.
+
+Define use cases with actors, flows, and data object interactions.
+
+The analysis components below list one entity per line, with `|`-separated fields in the order named in each section header. Refer to requirements and data objects by their IDs. List the `actors` of each use case by actor name, exactly as written in ACTORS, not by ID.
+
+{use_case_context}
+
+Extract and return only the structured use cases information in clean JSON format."""
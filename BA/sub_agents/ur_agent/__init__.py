@@ -1,5 +1,5 @@
 """UR (User Requirements) Agent module."""
 
-from .agent import ur_agent, ur_extraction, UserRequirementsOutput, UserRequirement
+from .agent import ur_agent, ur_extraction, ur_direct_extraction, UserRequirementsOutput, UserRequirement
 
-__all__ = ["ur_agent", "ur_extraction", "UserRequirementsOutput", "UserRequirement"]
\ No newline at end of file
+__all__ = ["ur_agent", "ur_extraction", "ur_direct_extraction", "UserRequirementsOutput", "UserRequirement"]
\ No newline at end of file
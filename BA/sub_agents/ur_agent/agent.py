@@ -8,8 +8,8 @@ from pydantic import BaseModel, Field
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 
-from .prompt import USER_REQUIREMENTS_PROMPT, USER_REQUIREMENTS_EXTRACTION_PROMPT
-from ...utils.utils import get_env_var
+from .prompt import USER_REQUIREMENTS_PROMPT, USER_REQUIREMENTS_EXTRACTION_PROMPT, USER_REQUIREMENTS_DIRECT_PROMPT
+from ...models import build_model
 
 
 class UserRequirement(BaseModel):
@@ -27,7 +27,7 @@ class UserRequirementsOutput(BaseModel):
 
 # Create the User Requirements Agent with LLM reasoning-based tools
 ur_extraction = LlmAgent(
-    model=get_env_var("UR_AGENT_MODEL"),
+    model=build_model("UR_AGENT_MODEL"),
     name="user_requirements_extraction",
     instruction=USER_REQUIREMENTS_EXTRACTION_PROMPT,
     output_schema=UserRequirementsOutput, 
@@ -35,7 +35,7 @@ ur_extraction = LlmAgent(
 )
 
 ur_agent = LlmAgent(
-    model=get_env_var("UR_AGENT_MODEL"),
+    model=build_model("UR_AGENT_MODEL"),
     name="ur_agent",
     instruction=USER_REQUIREMENTS_PROMPT,
     tools=[
@@ -46,3 +46,18 @@ ur_agent = LlmAgent(
         top_p=0.5
     )
 )
+
+# Single-call variant used by the pipeline in "direct" mode: reads its input
+# from state and produces the schema-constrained output without the wrapper hop.
+ur_direct_extraction = LlmAgent(
+    model=build_model("UR_AGENT_MODEL"),
+    name="ur_direct_extraction",
+    instruction=USER_REQUIREMENTS_DIRECT_PROMPT,
+    output_schema=UserRequirementsOutput,
+    output_key="user_requirements_extraction",
+    include_contents="none",
+    generate_content_config=GenerateContentConfig(
+        temperature=0.0,
+        top_p=0.5
+    )
+)
@@ -8,4 +8,13 @@ Analyze documents and identify all functional and non-functional requirements fr
 
 USER_REQUIREMENTS_EXTRACTION_PROMPT = """Extract and structure the user requirements analysis from the following content.
 
-Extract and return only the structured user requirements information in clean JSON format."""
\ No newline at end of file
+Extract and return only the structured user requirements information in clean JSON format."""
+
+USER_REQUIREMENTS_DIRECT_PROMPT = """Extract structured user requirements from business documents.
+
+Analyze the document below and identify all functional and non-functional requirements.
+
+Document:
+{business_analyst_output}
+
+Extract and return only the structured user requirements information in clean JSON format."""
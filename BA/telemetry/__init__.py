@@ -0,0 +1,15 @@
+"""Tracing and Prometheus metrics for the Business Analyst agents."""
+
+from .metrics import REGISTRY, MetricsRegistry, Counter, Gauge, Histogram
+from .tracing import span, traced, configure_trace_sampling
+
+__all__ = [
+    "REGISTRY",
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "span",
+    "traced",
+    "configure_trace_sampling",
+]
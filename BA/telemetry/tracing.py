@@ -0,0 +1,147 @@
+"""
+Spans and latency metrics around agents, model calls, tools, parsing and storage.
+
+`span()` opens an OpenTelemetry span and records the duration in the
+matching histogram of `metrics`. Histograms are recorded for every call;
+whether the span itself is kept is decided by the tracer provider's sampler,
+configured through the standard `OTEL_TRACES_SAMPLER` env vars (see
+`configure_trace_sampling`). Unsampled spans are no-op objects, so tracing
+can stay on in production. Storage calls are frequent and cheap, so they get
+no span at all unless storage spans are enabled there.
+"""
+
+import contextlib
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from opentelemetry import trace
+from opentelemetry.trace import Span, Status, StatusCode
+
+from .metrics import ERRORS, MODEL_DURATION, OPERATION_DURATION, STAGE_DURATION
+
+tracer = trace.get_tracer("BA")
+
+# Operation kinds whose calls only record metrics, without a span
+_untraced_kinds = {"storage"}
+
+
+def configure_trace_sampling(rate: float, storage_spans: bool = False) -> None:
+    """
+    Samples `rate` of all traces, following the parent's decision in nested spans.
+
+    Must run before the tracer provider is created (i.e. before
+    `get_fast_api_app`). Explicit `OTEL_TRACES_SAMPLER` settings take precedence.
+
+    Args:
+        rate: Fraction of traces to keep, between 0 and 1
+        storage_spans: Also open spans around storage calls (cache, store and index reads and writes)
+    """
+    os.environ.setdefault("OTEL_TRACES_SAMPLER", "parentbased_traceidratio")
+    os.environ.setdefault("OTEL_TRACES_SAMPLER_ARG", str(min(max(rate, 0.0), 1.0)))
+    if storage_spans:
+        _untraced_kinds.discard("storage")
+    else:
+        _untraced_kinds.add("storage")
+
+
+def _observe(kind: str, name: str, seconds: float) -> None:
+    if kind == "stage":
+        STAGE_DURATION.observe(seconds, stage=name)
+    elif kind == "model":
+        MODEL_DURATION.observe(seconds, model=name)
+    else:
+        OPERATION_DURATION.observe(seconds, kind=kind, name=name)
+
+
+@contextlib.contextmanager
+def span(
+    kind: str,
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    current: bool = True,
+) -> Iterator[Span]:
+    """
+    Traces one operation and records its duration.
+
+    Operations of an untraced kind (storage calls, unless enabled in
+    `configure_trace_sampling`) yield a non-recording span.
+
+    Args:
+        kind: Operation kind, e.g. "stage", "model", "tool", "parse" or "storage"
+        name: Stage, model, tool or function name
+        attributes: Initial span attributes
+        current: Make the span the current one; use False around async generators,
+            whose context may change between yields
+
+    Yields:
+        Span: The span, to add attributes such as token counts or payload sizes
+    """
+    attributes = {"ba.kind": kind, "ba.name": name, **(attributes or {})}
+    started = time.perf_counter()
+    if kind in _untraced_kinds:
+        manager = None
+        otel_span = trace.INVALID_SPAN
+    elif current:
+        manager = tracer.start_as_current_span(f"{kind} [{name}]", attributes=attributes, end_on_exit=True)
+        otel_span = manager.__enter__()
+    else:
+        manager = None
+        otel_span = tracer.start_span(f"{kind} [{name}]", attributes=attributes)
+    try:
+        yield otel_span
+    except Exception as error:
+        ERRORS.inc(kind=kind, name=name)
+        otel_span.record_exception(error)
+        otel_span.set_status(Status(StatusCode.ERROR, str(error)))
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _observe(kind, name, seconds)
+        otel_span.set_attribute("ba.duration_seconds", seconds)
+        if manager is not None:
+            manager.__exit__(None, None, None)
+        else:
+            otel_span.end()
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return len(str(value)) if value is not None else 0
+
+
+def traced(kind: str, name: Optional[str] = None) -> Callable:
+    """
+    Decorator tracing every call of a function with `span()`.
+
+    The span records the size of the result as `ba.output_size`. The wrapper
+    keeps the function's signature, so it can still be passed to `FunctionTool`.
+
+    Args:
+        kind: Operation kind, e.g. "tool", "parse" or "storage"
+        name: Span name; defaults to the function name
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(kind, span_name) as otel_span:
+                    result = await func(*args, **kwargs)
+                    otel_span.set_attribute("ba.output_size", _size(result))
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(kind, span_name) as otel_span:
+                result = func(*args, **kwargs)
+                otel_span.set_attribute("ba.output_size", _size(result))
+                return result
+        return wrapper
+
+    return decorator
@@ -1,13 +1,24 @@
-from pypdf import PdfReader
 from google.adk.tools import ToolContext
 from google.adk.tools import FunctionTool
+import asyncio
 import os
 import tempfile
 from typing_extensions import Any, Dict
-import base64
+import binascii
 from datetime import datetime
 from pathlib import Path
 
+from ..documents import (
+    format_pages,
+    get_directory_index,
+    get_page_extractor,
+    get_upload_store,
+    iter_base64_chunks,
+    iter_byte_chunks,
+    read_document_parts,
+)
+from ..telemetry import traced
+
 def get_working_directory(tool_context: ToolContext) -> str:
     """Get a suitable working directory, reusing existing one from context if available"""
     if "working_directory" in tool_context.state:
@@ -29,18 +40,53 @@ def get_working_directory(tool_context: ToolContext) -> str:
             tool_context.state["working_directory"] = current_dir
             return current_dir
 
-def find_document_files_tool(tool_context: ToolContext, directory: str = "") -> dict:
+# Session state key holding the position of the last listing of find_document_files_tool
+DOCUMENT_FILES_CURSOR_KEY = "document_files_cursor"
+
+# Session state key holding the position read_document_content_tool stopped at in the current file
+DOCUMENT_NEXT_PAGE_KEY = "document_next_page"
+
+@traced("tool")
+async def find_document_files_tool(
+    tool_context: ToolContext,
+    directory: str = "",
+    name_filter: str = "",
+    file_type: str = "",
+    limit: int = 50,
+    page_token: str = "",
+) -> dict:
     """
-    Tool to find all .md, .pdf, and .txt files in the specified directory.
+    Tool to find .md, .pdf, and .txt files in the specified directory, one page at a time.
+    
+    Files are listed by name from a persistent index that only re-reads
+    files changed since the last call.
     
     Args:
         tool_context: The ADK tool context
         directory: Directory to search for files (default: auto-determined working directory)
+        name_filter: Only list files whose name contains this text (case-insensitive)
+        file_type: Only list files of this type: ".pdf", ".md" or ".txt"
+        limit: Maximum number of files to return
+        page_token: `next_page_token` of the previous result to get the next page, or "next"
+            to continue the last listing of this session
     
     Returns:
-        dict: List of document files found or error
+        dict: Page of document files found, with `total` and `next_page_token`, or error
     """
     try:
+        if page_token == "next":
+            cursor = tool_context.state.get(DOCUMENT_FILES_CURSOR_KEY) or {}
+            if not cursor.get("next"):
+                return {
+                    "status": "warning",
+                    "message": "There is no further page of the last listing.",
+                    "suggestion": "Call find_document_files_tool without page_token to start a new listing."
+                }
+            directory = cursor["directory"]
+            name_filter = cursor.get("name_filter", "")
+            file_type = cursor.get("file_type", "")
+            page_token = cursor["next"]
+
         # Use working directory if none specified
         if not directory or directory.strip() == "":
             directory = get_working_directory(tool_context)
@@ -61,53 +107,28 @@ def find_document_files_tool(tool_context: ToolContext, directory: str = "") ->
                     "error": str(mkdir_error)
                 }
     
-        # Find document files
-        doc_files = []
-        file_details = []
-        
+        # Find document files through the index; only changed entries are re-read
+        directory = os.path.abspath(directory)
+        index = get_directory_index()
         try:
-            path_obj = Path(directory)
-            # Use pathlib for more robust file handling
-            for file_path in path_obj.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in {'.pdf', '.md', '.txt'}:
-                    doc_files.append(str(file_path))
-                    
-                    # Get file details
-                    try:
-                        file_size = file_path.stat().st_size
-                        file_size_str = f"{file_size / 1024:.1f} KB" if file_size < 1024*1024 else f"{file_size / (1024*1024):.1f} MB"
-                        mod_time = datetime.fromtimestamp(file_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        file_details.append({
-                            "name": file_path.name,
-                            "path": str(file_path),
-                            "size": file_size_str,
-                            "modified": mod_time,
-                            "type": file_path.suffix.lower()
-                        })
-                    except Exception as detail_error:
-                        file_details.append({
-                            "name": file_path.name,
-                            "path": str(file_path),
-                            "error": str(detail_error)
-                        })
-                        
+            await asyncio.to_thread(index.refresh, directory)
+            listing = await asyncio.to_thread(
+                index.list, directory, name_filter, file_type, page_token, max(1, min(limit, 500))
+            )
         except Exception as list_error:
             return {
                 "status": "error",
                 "message": f"Error listing directory contents: {str(list_error)}"
             }
         
-        if not doc_files:
+        if not listing["files"]:
             # Check if directory is empty or just doesn't have relevant files
-            try:
-                all_files = list(Path(directory).iterdir())
-                if not all_files:
-                    message = f"Directory {directory} is empty."
-                else:
-                    message = f"No PDF, MD, or TXT files found in {directory}. Directory contains {len(all_files)} other files."
-            except:
-                message = f"No PDF, MD, or TXT files found in {directory}."
+            if name_filter or file_type or page_token:
+                message = f"No document files matching the filters found in {directory}."
+            elif not listing["other_files"]:
+                message = f"Directory {directory} is empty."
+            else:
+                message = f"No PDF, MD, or TXT files found in {directory}. Directory contains {listing['other_files']} other files."
                 
             return {
                 "status": "warning",
@@ -116,16 +137,35 @@ def find_document_files_tool(tool_context: ToolContext, directory: str = "") ->
                 "suggestion": "Please upload document files or check another directory."
             }
         
-        # Store in state for future reference
-        tool_context.state["available_doc_files"] = doc_files
-        tool_context.state["file_details"] = file_details
+        doc_files = [entry["path"] for entry in listing["files"]]
+        file_details = [
+            {
+                "name": entry["name"],
+                "path": entry["path"],
+                "size": f"{entry['size'] / 1024:.1f} KB" if entry["size"] < 1024*1024 else f"{entry['size'] / (1024*1024):.1f} MB",
+                "modified": datetime.fromtimestamp(entry["mtime_ns"] / 1e9).strftime("%Y-%m-%d %H:%M:%S"),
+                "type": entry["type"]
+            }
+            for entry in listing["files"]
+        ]
+
+        # Only the position of the listing is kept in state, not the files
+        tool_context.state[DOCUMENT_FILES_CURSOR_KEY] = {
+            "directory": directory,
+            "name_filter": name_filter,
+            "file_type": file_type,
+            "next": listing["next"],
+            "total": listing["total"],
+        }
         tool_context.state["working_directory"] = directory
         
         return {
             "status": "success",
-            "message": f"Found {len(doc_files)} document file(s) in {directory}",
+            "message": f"Found {listing['total']} document file(s) in {directory}, showing {len(doc_files)}",
             "doc_files": doc_files,
             "file_details": file_details,
+            "total": listing["total"],
+            "next_page_token": listing["next"] or None,
             "directory": directory
         }
         
@@ -136,6 +176,7 @@ def find_document_files_tool(tool_context: ToolContext, directory: str = "") ->
             "suggestion": "Please check if the directory exists and is accessible."
         }
 
+@traced("tool")
 def save_document_files_tool(tool_context: ToolContext, directory: str = "") -> Dict[str, Any]:
     """
     Tool to save uploaded files to the working directory.
@@ -197,25 +238,29 @@ def save_document_files_tool(tool_context: ToolContext, directory: str = "") ->
                 file_path = Path(directory) / filename
 
                 try:
+                    # Stored once per content hash and linked under the per-session name
+                    upload_store = get_upload_store()
                     if isinstance(file_data, str):
                         try:
-                            # Try to decode as base64 first
-                            decoded_data = base64.b64decode(file_data)
-                            file_path.write_bytes(decoded_data)
-                        except Exception:
+                            # Try to decode as base64 first, in chunks
+                            saved = upload_store.save(lambda: iter_base64_chunks(file_data), extension, str(file_path))
+                        except binascii.Error:
                             # If base64 fails, treat as text
-                            file_path.write_text(file_data, encoding='utf-8')
+                            text_data = file_data.encode('utf-8')
+                            saved = upload_store.save(lambda: iter_byte_chunks(text_data), extension, str(file_path))
                     else:
-                        file_path.write_bytes(file_data)
+                        saved = upload_store.save(lambda: iter_byte_chunks(file_data), extension, str(file_path))
 
-                    file_size = file_path.stat().st_size
+                    file_size = saved["size"]
                     size_str = f"{file_size / 1024:.1f} KB" if file_size < 1024 * 1024 else f"{file_size / (1024 * 1024):.1f} MB"
 
                     saved_files.append({
                         "name": filename,
                         "path": str(file_path),
                         "size": size_str,
-                        "mime_type": mime
+                        "mime_type": mime,
+                        "sha256": saved["sha256"],
+                        "duplicate": not saved["stored"]
                     })
 
                 except Exception as save_error:
@@ -250,17 +295,33 @@ def save_document_files_tool(tool_context: ToolContext, directory: str = "") ->
             "message": f"Unexpected error: {str(e)}"
         }
 
-def read_document_content_tool(tool_context: ToolContext, file_path: str, max_preview_length: int = 500) -> dict:
+@traced("tool")
+async def read_document_content_tool(
+    tool_context: ToolContext,
+    file_path: str,
+    max_preview_length: int = 500,
+    first_page: int = 1,
+    max_pages: int = 0,
+    page_offset: int = 0
+) -> dict:
     """
     Tool to read and extract content from .md, .pdf, or .txt files.
     
+    Only the pages needed for the preview are read, so previews of large
+    documents stay fast. A preview that ends inside a page is continued by
+    passing the returned `first_page` and `page_offset`.
+    
     Args:
         tool_context: The ADK tool context
         file_path: Path to the document file
-        max_preview_length: Maximum length for content preview
+        max_preview_length: Maximum length for content preview, 0 to read the whole page range
+        first_page: First page (PDF) or section (.md/.txt) to read, starting at 1
+        max_pages: Maximum number of pages or sections to read, 0 for the rest of the document
+        page_offset: Characters of the first page or section to skip, to continue a preview
     
     Returns:
-        dict: Extracted content or error
+        dict: Extracted content and the `next` position (`first_page`, `page_offset`) to read on from,
+            None at the end, or error
     """
     try:
         file_path_obj = Path(file_path)
@@ -280,32 +341,29 @@ def read_document_content_tool(tool_context: ToolContext, file_path: str, max_pr
                 "message": f"Path is not a file: {file_path}"
             }
             
-        # Read content based on file type
-        content = ""
+        # Read content based on file type; reading stops after the last page of the
+        # range, or as soon as the preview is full
+        start = max(first_page, 1) - 1
+        stop = start + max_pages if max_pages > 0 else None
         
         if file_path_obj.suffix.lower() == '.pdf':
             try:
-                with file_path_obj.open('rb') as pdf_file:
-                    pdf_reader = PdfReader(pdf_file)
-                    content_parts = []
-                    
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        content_parts.append(f"\n--- Page {page_num + 1} ---\n")
-                        page_text = page.extract_text()
-                        if page_text:
-                            content_parts.append(page_text)
-                        else:
-                            content_parts.append("[No extractable text on this page]")
+                if start == 0 and stop is None and page_offset <= 0 and max_preview_length <= 0:
+                    # The whole document is needed: extract it in parallel worker processes, off the event loop
+                    page_texts = await get_page_extractor().extract_async(file_path_obj.read_bytes(), "pypdf")
+                    content, cursor = format_pages(page_texts), None
+                else:
+                    content, cursor = await asyncio.to_thread(
+                        read_document_parts, file_path_obj, start, stop, max_preview_length, max(page_offset, 0)
+                    )
                     
-                    content = "".join(content_parts)
-                        
-                    if not content.strip():
-                        return {
-                            "status": "warning",
-                            "message": f"PDF file {file_path} appears to be empty or contains no extractable text.",
-                            "content": "[No extractable text found in PDF]",
-                            "file_path": file_path
-                        }
+                if not content.strip():
+                    return {
+                        "status": "warning",
+                        "message": f"PDF file {file_path} appears to be empty or contains no extractable text.",
+                        "content": "[No extractable text found in PDF]",
+                        "file_path": file_path
+                    }
                         
             except Exception as pdf_error:
                 return {
@@ -316,21 +374,10 @@ def read_document_content_tool(tool_context: ToolContext, file_path: str, max_pr
                 
         elif file_path_obj.suffix.lower() in {'.md', '.txt'}:
             try:
-                # Try different encodings if UTF-8 fails
-                encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-                
-                for encoding in encodings:
-                    try:
-                        content = file_path_obj.read_text(encoding=encoding)
-                        break  # If successful, exit the loop
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    return {
-                        "status": "error",
-                        "message": f"Could not decode file with any of the attempted encodings: {encodings}",
-                        "suggestion": "The file may be binary or use an unsupported encoding."
-                    }
+                # The file is read once (memory-mapped when large); the encoding is detected from the start of the file
+                content, cursor = await asyncio.to_thread(
+                    read_document_parts, file_path_obj, start, stop, max_preview_length, max(page_offset, 0)
+                )
                     
                 if not content.strip():
                     return {
@@ -352,22 +399,23 @@ def read_document_content_tool(tool_context: ToolContext, file_path: str, max_pr
                 "suggestion": "Only .pdf, .md, and .txt files are supported."
             }
         
-        # Store in context state
-        tool_context.state["extracted_content"] = content
+        # Only the reading position is kept in state, not the document text
         tool_context.state["document_processed"] = True
         tool_context.state["current_file"] = file_path
+        next_position = {"first_page": cursor[0], "page_offset": cursor[1]} if cursor is not None else None
+        tool_context.state[DOCUMENT_NEXT_PAGE_KEY] = next_position
         
-        content_length = len(content)
-        if content_length > max_preview_length:
-            preview_half = max_preview_length // 2
-            content_preview = content[:preview_half] + f"\n\n[... {content_length - max_preview_length} characters omitted ...]\n\n" + content[-preview_half:]
-        else:
-            content_preview = content
+        content_preview = content
+        if next_position is not None:
+            content_preview += (
+                f"\n\n[... preview ends here; read on with first_page={cursor[0]}, page_offset={cursor[1]} ...]"
+            )
         
         return {
             "status": "success",
             "message": f"Successfully extracted content from {file_path_obj.name}",
             "content_preview": content_preview,  # Truncated for display
+            "next": next_position
         }
         
     except Exception as e:
@@ -1,15 +1,16 @@
-import os
-import tempfile
+import asyncio
+import hashlib
 import logging
 from datetime import datetime
 from google.adk.tools import ToolContext, FunctionTool
-from langchain_community.document_loaders import PDFPlumberLoader
-from typing import Optional
+from typing import List, Optional
 
 from ..config import (
     LOG_LEVEL,
     LOG_FORMAT
 )
+from ..documents import extractor_version, get_page_extractor, get_parsed_output_store, iter_page_parts
+from ..telemetry import traced
 
 # Configure logging
 logging.basicConfig(
@@ -17,19 +18,50 @@ logging.basicConfig(
     format=LOG_FORMAT
 )
 
-def parse_file(
+def _file_header(file_name: str, size: int, pages: int, parsed_at: str) -> str:
+    """Returns the markdown header of a parse result for the uploaded file."""
+    return f"""## File Analysis: {file_name}
+- **Processing time:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+- **Size:** {size / 1024:.2f} KB
+- **Number of pages:** {pages}
+- **Parsed at:** {parsed_at}
+
+"""
+
+def _body_parts(page_texts: List[str]) -> List[str]:
+    """Returns the extracted content section of a parse result as parts that concatenate to it."""
+    parts = ["""### Extracted Content
+```text
+"""]
+    if not page_texts:
+        parts.append("[Unable to extract content. File may not contain text or may be an image file.]")
+    else:
+        parts.extend(iter_page_parts(page_texts))
+        if len(parts) == 1:
+            # No content was extracted from any page
+            parts.append("[No text content found in PDF file.]")
+    parts.append("""
+```
+
+---
+
+""")
+    return parts
+
+@traced("tool")
+async def parse_file(
     tool_context: ToolContext,
-    file_name: str = "uploaded_document.pdf",
-    local_markdown_path: str = "../assets/output/parsed_documents.md"
+    file_name: str = "uploaded_document.pdf"
 ) -> str:
     """
-    Find attached PDF file, use LangChain's PDFPlumberLoader to extract
-    content and return result as Markdown. Also saves to local file.
+    Find attached PDF file, extract its content with pdfplumber straight from
+    memory, in parallel worker processes for long documents, and return
+    result as Markdown. The result is saved to the parsed output store, and a
+    PDF parsed before is returned from there without parsing it again.
     
     Parameters:
         tool_context: Tool context for ADK
         file_name: Name of the file being processed (for display only)
-        local_markdown_path: Path to save the markdown content locally
         
     Returns:
         str: PDF file content formatted as Markdown
@@ -54,95 +86,44 @@ def parse_file(
         if not pdf_data:
             return "## Error\nNo PDF file found in attached content."
 
-        # --- STEP 2: USE LANGCHAIN LOADER WITH TEMPORARY FILE ---
-        # Create a temporary file that will be automatically deleted after use
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".pdf", mode="wb") as temp_file:
-            temp_file.write(pdf_data)
-            temp_file.flush()
-            temp_file_path = temp_file.name
+        # Earlier parses of the same file are looked up by its hash
+        digest = hashlib.sha256(pdf_data).hexdigest()
+        # Stored outputs hold only the extracted body; older outputs that include a header are parsed again
+        extractor = f"{extractor_version('pdfplumber')}/body"
+        store = get_parsed_output_store()
+        stored = await asyncio.to_thread(store.read, digest, extractor)
+        if stored is not None:
+            # The store holds the extracted body; the header describes this upload
+            body, entry = stored
+            parsed_at = datetime.fromtimestamp(entry["parsed_at"]).strftime("%Y-%m-%d %H:%M:%S")
+            return (_file_header(file_name, len(pdf_data), entry["pages"], parsed_at) + body).strip()
 
-            # Now use LangChain Loader with the temporary file path
-            loader = PDFPlumberLoader(temp_file_path)
-            documents = loader.load() 
-            os.remove(temp_file_path)
+        # --- STEP 2: EXTRACT PAGES FROM THE IN-MEMORY PDF ---
+        # Page ranges are extracted off the event loop, without a temporary file
+        page_texts = await get_page_extractor().extract_async(pdf_data, "pdfplumber")
+        num_pages = len(page_texts)
 
-        # --- STEP 3: PROCESS RESULTS AND FORMAT AS MARKDOWN ---
-        # `loader.load()` returns a list of Documents, each Document is a page
-        # We need to concatenate their content together
-        if not documents:
-            content = "[Unable to extract content. File may not contain text or may be an image file.]"
-        else:
-            # Join page_content from each document (page) together
-            content = "\n\n".join([doc.page_content for doc in documents if doc.page_content])
-            
-            # If no content was extracted from any page
-            if not content.strip():
-                content = "[No text content found in PDF file.]"
-
-        # Format result as markdown
+        # --- STEP 3: FORMAT RESULTS AS MARKDOWN ---
+        # The body is kept as the page texts and the markup around them, not as one string
+        body_parts = _body_parts(page_texts)
+        del page_texts
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        file_size_kb = len(pdf_data) / 1024
-        num_pages = len(documents) if documents else 0
-
-        markdown_output = f"""## File Analysis: {file_name}
-- **Processing time:** {timestamp}
-- **Size:** {file_size_kb:.2f} KB
-- **Number of pages:** {num_pages}
-- **Parsed at:** {timestamp}
-
-### Extracted Content
-```text
-{content.strip()}
-```
-
----
-
-"""
+        parts = [_file_header(file_name, len(pdf_data), num_pages, timestamp), *body_parts]
 
-        # --- STEP 4: SAVE TO LOCAL MARKDOWN FILE ---
+        # --- STEP 4: SAVE TO THE PARSED OUTPUT STORE ---
+        # The parts are written to the store's file one by one; only the returned result joins them
         try:
-            # Validate the path and ensure it's not empty
-            if not local_markdown_path or local_markdown_path.strip() == "":
-                local_markdown_path = "/home/juhan/Downloads/parsed_documents.md"
-            
-            # Get the directory path
-            directory = os.path.dirname(local_markdown_path)
-            
-            # If directory is empty, use Downloads folder
-            if not directory:
-                local_markdown_path = "/home/juhan/Downloads/parsed_documents.md"
-                directory = "/home/juhan/Downloads"
-            
-            # Ensure the Downloads directory exists
-            os.makedirs(directory, exist_ok=True)
-            
-            # Append to markdown file in Downloads folder
-            with open(local_markdown_path, 'a', encoding='utf-8') as f:
-                f.write(markdown_output)
-            
-            # Add success message to output
-            save_message = f"\n**✅ Content saved to:** `{local_markdown_path}`"
-            markdown_output += save_message
-            
+            saved_path = await asyncio.to_thread(store.put, digest, body_parts, file_name, num_pages, extractor)
+            parts.append(f"\n**✅ Content saved to:** `{saved_path}`")
         except Exception as save_error:
-            logging.error(f"Error saving markdown file: {save_error}")
-            # Fallback to a guaranteed path
-            fallback_path = "/home/juhan/Downloads/parsed_documents.md"
-            try:
-                os.makedirs("/home/juhan/Downloads", exist_ok=True)
-                with open(fallback_path, 'a', encoding='utf-8') as f:
-                    f.write(markdown_output)
-                save_message = f"\n**✅ Content saved to fallback location:** `{fallback_path}`"
-                markdown_output += save_message
-            except Exception as fallback_error:
-                save_message = f"\n**⚠️ Warning:** Could not save to file: {str(save_error)}"
-                markdown_output += save_message
+            logging.error(f"Error saving parsed output: {save_error}")
+            parts.append(f"\n**⚠️ Warning:** Could not save to file: {str(save_error)}")
 
-        return markdown_output.strip()
+        return "".join(parts).strip()
           
     except Exception as e:
         # Log detailed error for debugging if needed
-        logging.error(f"Error parsing file with LangChain: {e}", exc_info=True)
+        logging.error(f"Error parsing file with pdfplumber: {e}", exc_info=True)
         return f"## Error Occurred\n**Details:** {str(e)}"
 
 # Create function tool
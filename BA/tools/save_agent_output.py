@@ -3,6 +3,9 @@ from google.adk.tools import ToolContext
 from google.adk.tools import FunctionTool
 import os
 
+from ..telemetry import traced
+
+@traced("tool")
 def save_ur_output(tool_context: ToolContext, output_path: str = "assets/output/agent") -> dict:
     """
     Tool to export all relevant ur state content to a markdown file.
@@ -63,6 +66,7 @@ def save_ur_output(tool_context: ToolContext, output_path: str = "assets/output/
             "message": f"Error exporting UR state: {str(e)}"
         }
 
+@traced("tool")
 def save_ac_output(tool_context: ToolContext, output_path: str = "assets/output/agent") -> dict:
     """
     Tool to export all relevant ac state content to a markdown file.
@@ -146,6 +150,7 @@ def save_ac_output(tool_context: ToolContext, output_path: str = "assets/output/
             "message": f"Error exporting AC state: {str(e)}"
         }
         
+@traced("tool")
 def save_do_output(tool_context: ToolContext, output_path: str = "assets/output/agent") -> dict:
     """
     Tool to export all relevant do state content to a markdown file.
@@ -200,6 +205,7 @@ def save_do_output(tool_context: ToolContext, output_path: str = "assets/output/
             "message": f"Error exporting DO state: {str(e)}"
         }
 
+@traced("tool")
 def save_uc_output(tool_context: ToolContext, output_path: str = "assets/output/agent") -> dict:
     """
     Tool to export all relevant uc state content to a markdown file.
@@ -6,6 +6,8 @@ from typing import Dict, Any, Optional
 import os
 
 from ..utils.utils import get_env_var
+from ..telemetry import traced
+
 from ..config import (
     PROJECT_ID,
     GCS_DEFAULT_STORAGE_CLASS,
@@ -36,6 +38,7 @@ except ValueError:
 # Initialize the GCS client
 client = storage.Client(project=PROJECT_ID)
 
+@traced("storage")
 def create_gcs_bucket(
     tool_context: ToolContext,
     bucket_name: str,
@@ -106,6 +109,7 @@ def create_gcs_bucket(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+@traced("storage")
 def list_gcs_buckets(
     prefix: Optional[str] = None,
     max_results: Optional[int] = None
@@ -158,6 +162,7 @@ def list_gcs_buckets(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+@traced("storage")
 def get_bucket_details(
     bucket_name: str
 ) -> Dict[str, Any]:
@@ -225,6 +230,7 @@ def get_bucket_details(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+@traced("storage")
 def list_blobs_in_bucket(
     bucket_name: str,
     prefix: Optional[str] = None,
@@ -302,6 +308,7 @@ def list_blobs_in_bucket(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+@traced("storage")
 def upload_file_to_gcs(
     tool_context: ToolContext,
     bucket_name: str,
@@ -391,6 +398,7 @@ def upload_file_to_gcs(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
+@traced("storage")
 def download_file_from_gcs(bucket_name: str, file_path: str) -> str:
     """
     Downloads a file from Google Cloud Storage and returns its content as a string.
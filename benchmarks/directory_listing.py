@@ -0,0 +1,93 @@
+"""
+Times document listings of a large upload directory with the directory index.
+
+Creates `--files` document files in a temp directory, then compares the
+former `find_document_files_tool` walk (`iterdir` plus a stat of every
+file, all details kept in session state) with `DirectoryIndex`: the first
+scan, a refresh of the unchanged directory, a refresh after a few uploads
+and the first page of a listing. Also prints the size of the session state
+each approach leaves behind.
+
+Usage:
+    python benchmarks/directory_listing.py [--files N] [--uploads N] [--page-size N]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from stub_llm import configure_environment
+
+
+def former_walk(directory: str) -> Dict[str, Any]:
+    """The former tool body: every entry stat-ed, every document in the state."""
+    doc_files: List[str] = []
+    file_details: List[Dict[str, Any]] = []
+    for file_path in Path(directory).iterdir():
+        if file_path.is_file() and file_path.suffix.lower() in {".pdf", ".md", ".txt"}:
+            doc_files.append(str(file_path))
+            file_size = file_path.stat().st_size
+            file_details.append({
+                "name": file_path.name,
+                "path": str(file_path),
+                "size": f"{file_size / 1024:.1f} KB",
+                "modified": datetime.fromtimestamp(file_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                "type": file_path.suffix.lower(),
+            })
+    return {"available_doc_files": doc_files, "file_details": file_details, "working_directory": directory}
+
+
+def _timed(run: Callable[[], Any]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--uploads", type=int, default=10, help="Files added before the incremental refresh")
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.documents import DirectoryIndex
+
+    workdir = tempfile.mkdtemp(prefix="ba-listing-")
+    uploads = os.path.join(workdir, "uploads")
+    os.makedirs(uploads)
+    try:
+        for number in range(args.files):
+            with open(os.path.join(uploads, f"document_{number:06d}{('.pdf', '.md', '.txt')[number % 3]}"), "wb") as f:
+                f.write(b"x" * (number % 4096))
+        index = DirectoryIndex(os.path.join(workdir, "index.sqlite3"), max_age=30)
+
+        state, walk_seconds = _timed(lambda: former_walk(uploads))
+        scan, scan_seconds = _timed(lambda: index.refresh(uploads))
+        _, unchanged_seconds = _timed(lambda: index.refresh(uploads))
+        for number in range(args.uploads):
+            with open(os.path.join(uploads, f"upload_{number:03d}.pdf"), "wb") as f:
+                f.write(b"%PDF")
+        incremental, incremental_seconds = _timed(lambda: index.refresh(uploads))
+        listing, list_seconds = _timed(lambda: index.list(uploads, limit=args.page_size))
+        cursor = {"directory": uploads, "name_filter": "", "file_type": "", "next": listing["next"], "total": listing["total"]}
+
+        print(f"{'operation':<34}{'seconds':>9}")
+        print(f"{'former walk':<34}{walk_seconds:>9.4f}")
+        print(f"{'index: first scan':<34}{scan_seconds:>9.4f}  {scan}")
+        print(f"{'index: unchanged directory':<34}{unchanged_seconds:>9.4f}")
+        print(f"{'index: after ' + str(args.uploads) + ' uploads':<34}{incremental_seconds:>9.4f}  {incremental}")
+        print(f"{'index: first page':<34}{list_seconds:>9.4f}  {len(listing['files'])} of {listing['total']}")
+        print(f"session state: former {len(json.dumps(state))} bytes, cursor {len(json.dumps(cursor))} bytes")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
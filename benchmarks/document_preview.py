@@ -0,0 +1,71 @@
+"""
+Times previews and page ranges of large documents with the lazy reader.
+
+Writes a synthetic 500-page PDF and a text file of similar length, then
+times a full read, a `read_preview` and the first 10 pages/sections of each
+with the parsed document cache disabled. Exits with an error if the PDF
+preview takes longer than `--max-seconds`.
+
+Usage:
+    python benchmarks/document_preview.py [--pages N] [--preview-chars N] [--max-seconds S]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Tuple
+
+from sample_pdf import LINE_TEMPLATE, synthetic_pdf
+from stub_llm import configure_environment
+
+
+def _timed(read: Callable[[], int]) -> Tuple[int, float]:
+    started = time.perf_counter()
+    characters = read()
+    return characters, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--preview-chars", type=int, default=500)
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="Allowed time of the PDF preview")
+    args = parser.parse_args()
+
+    os.environ["BA_PARSED_CACHE_ENABLED"] = "false"
+    configure_environment()
+    from BA.documents import iter_document, read_preview
+
+    workdir = tempfile.mkdtemp(prefix="ba-preview-")
+    pdf_path = os.path.join(workdir, "spec.pdf")
+    txt_path = os.path.join(workdir, "spec.txt")
+    with open(pdf_path, "wb") as f:
+        f.write(synthetic_pdf(args.pages))
+    with open(txt_path, "w", encoding="utf-8") as f:
+        for page in range(1, args.pages + 1):
+            f.write(f"--- Page {page} ---\n")
+            f.writelines(LINE_TEMPLATE.format(page=page, line=line) + "\n" for line in range(60))
+
+    print(f"{'file':<6}{'read':<16}{'characters':>12}{'seconds':>9}")
+    pdf_preview = 0.0
+    for name, path in (("pdf", pdf_path), ("txt", txt_path)):
+        reads = [
+            ("preview", lambda: len(read_preview(path, args.preview_chars))),
+            ("first 10 parts", lambda: sum(len(part) for part in iter_document(path, 0, 10))),
+            ("full", lambda: sum(len(part) for part in iter_document(path))),
+        ]
+        for label, read in reads:
+            characters, seconds = _timed(read)
+            print(f"{name:<6}{label:<16}{characters:>12}{seconds:>9.3f}")
+            if name == "pdf" and label == "preview":
+                pdf_preview = seconds
+
+    if pdf_preview > args.max_seconds:
+        sys.exit(f"PDF preview took {pdf_preview:.3f} s, above the limit of {args.max_seconds:g} s")
+    print(f"OK: preview of a {args.pages}-page PDF took {pdf_preview:.3f} s (limit {args.max_seconds:g} s)")
+
+
+if __name__ == "__main__":
+    main()
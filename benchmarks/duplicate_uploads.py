@@ -0,0 +1,84 @@
+"""
+Measures model calls when several sessions analyse the same document at once.
+
+Starts `--sessions` concurrent pipeline runs on the same uploaded document,
+once with single-flight coalescing enabled and once without (each in its
+own process, because the setting is read at import time). The stage cache
+is disabled so that only coalescing is measured.
+
+Usage:
+    python benchmarks/duplicate_uploads.py [--sessions N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from stub_llm import StubLlm, configure_environment
+
+SAMPLE_DOCUMENT = b"""Customers must be able to log in with their email and password.
+Administrators manage customer accounts."""
+
+
+async def _analyse(sessions: int) -> dict:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+    from BA.agent import analysis_pipeline
+
+    runner = InMemoryRunner(agent=analysis_pipeline, app_name="benchmark")
+
+    async def analyse(index: int) -> None:
+        session = await runner.session_service.create_session(
+            app_name="benchmark",
+            user_id=f"user-{index}",
+            state={"business_analyst_output": SAMPLE_DOCUMENT.decode("utf-8")},
+        )
+        message = types.Content(role="user", parts=[
+            types.Part(text="Analyse the document."),
+            types.Part(inline_data=types.Blob(mime_type="text/plain", data=SAMPLE_DOCUMENT)),
+        ])
+        async for _ in runner.run_async(user_id=f"user-{index}", session_id=session.id, new_message=message):
+            pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(analyse(index) for index in range(sessions)))
+    return {"model_calls": len(StubLlm.calls), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def _run(coalesce: bool, sessions: int, latency: float) -> dict:
+    env = dict(os.environ, BA_COALESCE_ENABLED=str(coalesce).lower(), BA_PIPELINE_MODE="direct")
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "--sessions", str(sessions), "--latency", str(latency)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub model latency in seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        configure_environment()
+        StubLlm.latency = args.latency
+        print(json.dumps(asyncio.run(_analyse(args.sessions))))
+        return
+
+    print(f"{'coalescing':<12}{'model calls':>12}{'seconds':>10}")
+    for coalesce in (False, True):
+        result = _run(coalesce, args.sessions, args.latency)
+        print(f"{'on' if coalesce else 'off':<12}{result['model_calls']:>12}{result['seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
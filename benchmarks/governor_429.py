@@ -0,0 +1,138 @@
+"""
+Exercises the model governor against a local stub server that returns 429s.
+
+A local HTTP server answers the Gemini `generateContent` endpoint. It rejects
+the first `--quota-errors` requests with HTTP 429 RESOURCE_EXHAUSTED and then
+returns a fixed response. `--requests` concurrent calls are sent through a
+`GovernedLlm` wrapping a real `Gemini` model pointed at the server. The
+script checks that all of them succeed and that the server never sees more
+than `--max-in-flight` concurrent requests.
+
+Usage:
+    python benchmarks/governor_429.py --requests 20 --quota-errors 5 --max-in-flight 4
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from stub_llm import configure_environment
+
+configure_environment()
+
+from google.adk.models import Gemini, LlmRequest  # noqa: E402
+from google.genai import Client, types  # noqa: E402
+
+from BA.models import GovernedLlm, ModelGovernor  # noqa: E402
+
+MODEL = "gemini-2.0-flash"
+
+RESPONSE = {
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}],
+    "usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": 1, "totalTokenCount": 6},
+}
+QUOTA_ERROR = {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+
+
+class StubServer(ThreadingHTTPServer):
+    """Gemini API stub that rejects the first `quota_errors` requests."""
+
+    daemon_threads = True
+
+    def __init__(self, quota_errors: int, latency: float):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.quota_errors = quota_errors
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.received = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        server: StubServer = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.received += 1
+            rejected = server.received <= server.quota_errors
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+        body = json.dumps(QUOTA_ERROR if rejected else RESPONSE).encode("utf-8")
+        self.send_response(429 if rejected else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def governed_model(base_url: str, max_in_flight: int) -> GovernedLlm:
+    gemini = Gemini(model=MODEL)
+    # Point the cached API client at the stub server
+    gemini.__dict__["api_client"] = Client(
+        vertexai=False, api_key="stub", http_options=types.HttpOptions(base_url=base_url)
+    )
+    governor = ModelGovernor(MODEL, max_in_flight=max_in_flight, backoff_base=0.05, backoff_max=0.5)
+    return GovernedLlm(model=MODEL, llm=gemini, governor=governor)
+
+
+async def call(llm: GovernedLlm) -> str:
+    request = LlmRequest(
+        model=MODEL,
+        contents=[types.Content(role="user", parts=[types.Part(text="Hello")])],
+        config=types.GenerateContentConfig(),
+    )
+    async for response in llm.generate_content_async(request):
+        return response.content.parts[0].text
+
+
+async def run(args: argparse.Namespace, server: StubServer) -> None:
+    llm = governed_model(f"http://127.0.0.1:{server.server_port}", args.max_in_flight)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(llm) for _ in range(args.requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    failures = [result for result in results if result != "ok"]
+    print(f"requests sent:        {args.requests}")
+    print(f"server received:      {server.received} ({args.quota_errors} rejected with 429)")
+    print(f"max in flight:        {server.max_in_flight} (limit {args.max_in_flight})")
+    print(f"governor stats:       {llm.governor.stats()}")
+    print(f"elapsed:              {elapsed:.2f}s")
+    if failures:
+        print(f"FAILED: {len(failures)} requests did not succeed: {failures[0]!r}")
+        sys.exit(1)
+    if server.max_in_flight > args.max_in_flight:
+        print("FAILED: in-flight limit exceeded")
+        sys.exit(1)
+    print("OK")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--quota-errors", type=int, default=5)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server latency in seconds")
+    args = parser.parse_args()
+
+    server = StubServer(args.quota_errors, args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        asyncio.run(run(args, server))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Counts model invocations per document in each pipeline mode.
+
+Runs the analysis pipeline against the stubbed model once in `agent_tool`
+mode and once in `direct` mode (each in its own process, because the mode is
+read at import time) and reports the model calls one document costs.
+
+Usage:
+    python benchmarks/model_calls.py [--documents N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from stub_llm import StubLlm, configure_environment
+
+SAMPLE_DOCUMENT = """## File Analysis: sample.pdf
+### Extracted Content
+Customers must be able to log in with their email and password.
+Administrators manage customer accounts."""
+
+
+async def _analyse(documents: int) -> dict:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+    from BA.agent import analysis_pipeline
+
+    runner = InMemoryRunner(agent=analysis_pipeline, app_name="benchmark")
+    started = time.perf_counter()
+    for index in range(documents):
+        session = await runner.session_service.create_session(
+            app_name="benchmark",
+            user_id="benchmark",
+            state={"business_analyst_output": f"{SAMPLE_DOCUMENT}\n(document {index})"},
+        )
+        message = types.Content(role="user", parts=[types.Part(text="Analyse the document.")])
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+    return {
+        "documents": documents,
+        "model_calls": len(StubLlm.calls),
+        "calls_per_document": len(StubLlm.calls) / documents,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _run_mode(mode: str, documents: int) -> dict:
+    env = dict(os.environ, BA_PIPELINE_MODE=mode)
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "--documents", str(documents)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        configure_environment()
+        print(json.dumps(asyncio.run(_analyse(args.documents))))
+        return
+
+    print(f"{'mode':<12}{'calls/doc':>10}{'total calls':>13}{'seconds':>10}")
+    for mode in ("agent_tool", "direct"):
+        result = _run_mode(mode, args.documents)
+        print(
+            f"{mode:<12}{result['calls_per_document']:>10.1f}"
+            f"{result['model_calls']:>13}{result['seconds']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
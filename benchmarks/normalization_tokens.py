@@ -0,0 +1,153 @@
+"""
+Reports the input tokens saved by document normalization.
+
+Normalizes each document the way `DocumentNormalizationAgent` does before
+the extraction stages and prints estimated tokens before and after, the
+share saved and what was removed or repaired. PDFs are read with the same
+pypdf extraction as the API endpoints. Without arguments, a synthetic
+corpus is used: specifications laid out like a typical PDF text layer, with
+running headers and footers, page numbers, justified lines padded with
+spaces and words hyphenated at line ends.
+
+Also checks that content which only differs by a number from page to page
+(numbered requirement headings and statements) and hyphenated compounds
+split at a line end survive normalization, and exits with an error if not.
+
+Usage:
+    python benchmarks/normalization_tokens.py [DOCUMENT ...] [--pages N]
+"""
+
+import argparse
+import os
+import random
+import textwrap
+from typing import List, Tuple
+
+from stub_llm import configure_environment
+
+SENTENCES = (
+    "The system shall allow registered customers to create, modify and cancel purchase orders.",
+    "Supervisors must approve every order whose total exceeds the configured approval threshold.",
+    "Invoices are generated automatically once an order has been delivered and confirmed.",
+    "The application shall notify the accounting department about overdue invoices every morning.",
+    "Administrators can manage user accounts, assign roles and reset forgotten passwords.",
+    "All changes to customer master data shall be recorded in an audit trail for seven years.",
+    "The reporting module provides monthly revenue summaries grouped by region and product line.",
+    "Warehouse operators confirm shipments and update the inventory level of every article.",
+)
+
+
+def _justify(line: str, width: int) -> str:
+    """Pads the gaps of a line with extra spaces, as justified PDF text extracts."""
+    words = line.split(" ")
+    gaps = len(words) - 1
+    missing = width - len(line)
+    if gaps <= 0 or missing <= 0:
+        return line
+    return "".join(word + " " * (1 + (missing // gaps + (index < missing % gaps)) * (index < gaps)) for index, word in enumerate(words)).rstrip()
+
+
+def _hyphenate(lines: List[str], rng: random.Random) -> List[str]:
+    """Moves the start of a long word to the end of the previous line with a hyphen."""
+    result = lines[:1]
+    for line in lines[1:]:
+        first, _, rest = line.partition(" ")
+        if len(first) >= 8 and first.isalpha() and rng.random() < 0.4:
+            cut = len(first) // 2
+            result[-1] += " " + first[:cut] + "-"
+            line = first[cut:] + " " + rest
+        result.append(line)
+    return result
+
+
+def synthetic_document(pages: int, seed: int = 0) -> str:
+    """Returns a document of `pages` pages in the `--- Page N ---` format of the API endpoints."""
+    rng = random.Random(seed)
+    parts = []
+    for page in range(1, pages + 1):
+        paragraphs = []
+        for section in range(3):
+            text = " ".join(rng.choice(SENTENCES) for _ in range(5))
+            lines = _hyphenate(textwrap.wrap(text, 88), rng)
+            paragraphs.append(f"{page}.{section + 1} Requirements group {rng.randint(1, 99)}")
+            paragraphs.extend(_justify(line, 92) for line in lines[:-1])
+            paragraphs.extend([lines[-1], ""])
+        parts.append(f"\n--- Page {page} ---\n")
+        parts.append("\n".join([
+            "Acme Order Platform    Software Requirements Specification    v2.3",
+            "Document ID: ACME-SRS-0042        Classification: Confidential",
+            "",
+            *paragraphs,
+            "",
+            "(c) 2025 Acme Corp. All rights reserved.",
+            f"Page {page} of {pages}",
+        ]))
+    return "".join(parts)
+
+
+def numbered_requirements(pages: int = 6) -> str:
+    """Returns pages that start with a numbered requirement and end with its acceptance criterion."""
+    return "".join(
+        f"\n--- Page {page} ---\n## FR-{page:03d} User login\nThe system shall allow login case {page}.\n"
+        f"Users enter their credentials on the self-\nservice portal.\nThe session starts.\n"
+        f"Acceptance: verified by test {page}.\n"
+        for page in range(1, pages + 1)
+    )
+
+
+def check_content_kept() -> List[str]:
+    """Returns the problems found normalizing `numbered_requirements`, if any."""
+    from BA.documents.normalization import normalize_document
+
+    text = numbered_requirements()
+    normalized, stats = normalize_document(text)
+    problems = []
+    if stats["repeated_lines_removed"]:
+        problems.append(f"{stats['repeated_lines_removed']} content lines removed as repeated")
+    if "self-\nservice" not in normalized:
+        problems.append("hyphen of 'self-service' removed")
+    return problems
+
+
+def _load(path: str) -> str:
+    from BA.api.jobs import document_text
+
+    with open(path, "rb") as f:
+        return document_text(os.path.basename(path), f.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("documents", nargs="*", help=".pdf, .md or .txt files; default: synthetic corpus")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per synthetic document")
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.pipeline.normalization import normalization_stats
+
+    corpus: List[Tuple[str, str]] = (
+        [(os.path.basename(path), _load(path)) for path in args.documents]
+        if args.documents
+        else [(f"synthetic-{seed}", synthetic_document(args.pages, seed)) for seed in range(3)]
+    )
+
+    print(f"{'document':<24}{'tokens before':>14}{'after':>9}{'saved':>8}{'repeated':>10}{'hyphens':>9}")
+    total_before = total_after = 0
+    for name, text in corpus:
+        _, stats = normalization_stats(text)
+        total_before += stats["tokens_before"]
+        total_after += stats["tokens_after"]
+        print(
+            f"{name[:23]:<24}{stats['tokens_before']:>14}{stats['tokens_after']:>9}{stats['saved_ratio']:>8.1%}"
+            f"{stats['repeated_lines_removed']:>10}{stats['hyphenations_repaired']:>9}"
+        )
+    print(f"{'total':<24}{total_before:>14}{total_after:>9}{1 - total_after / total_before:>8.1%}")
+
+    problems = check_content_kept()
+    if problems:
+        raise SystemExit("Normalization removed content: " + "; ".join(problems))
+    print("OK: numbered requirements and hyphenated compounds are kept")
+
+
+if __name__ == "__main__":
+    main()
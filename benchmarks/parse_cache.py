@@ -0,0 +1,79 @@
+"""
+Measures PDF re-opening with the persistent parsed-document cache.
+
+Parses a synthetic PDF with an empty cache, then opens it again in the same
+process and in a second process sharing the cache file, as another uvicorn
+worker would. Warm opens cost a SHA-256 of the file and one cache read. The
+outputs of all three opens must be identical.
+
+Usage:
+    python benchmarks/parse_cache.py [--pages N] [--extractor pypdf|pdfplumber]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sample_pdf import synthetic_pdf
+from stub_llm import configure_environment
+
+
+def _open(pdf_path: str, extractor: str) -> dict:
+    from BA.documents import get_page_extractor
+
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    extractor_ = get_page_extractor()
+    started = time.perf_counter()
+    texts = extractor_.extract(data, extractor)
+    seconds = time.perf_counter() - started
+    return {"seconds": seconds, "characters": sum(len(text) for text in texts), **extractor_.cache.stats()}
+
+
+def _child(pdf_path: str, extractor: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", pdf_path, "--extractor", extractor],
+        env=os.environ, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--extractor", choices=("pypdf", "pdfplumber"), default="pypdf")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        configure_environment()
+        print(json.dumps(_open(args.child, args.extractor)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="ba-parse-cache-")
+    os.environ["BA_PARSED_CACHE_PATH"] = os.path.join(workdir, "parsed_documents.sqlite3")
+    os.environ["BA_PDF_WORKERS"] = "1"
+    pdf_path = os.path.join(workdir, "spec.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(synthetic_pdf(args.pages))
+    configure_environment()
+
+    cold = _open(pdf_path, args.extractor)
+    warm = _open(pdf_path, args.extractor)
+    other = _child(pdf_path, args.extractor)
+    assert cold["characters"] == warm["characters"] == other["characters"], "Cached text differs"
+
+    print(f"PDF: {args.pages} pages, {os.path.getsize(pdf_path) / 2**10:.0f} KB, extractor: {args.extractor}")
+    print(f"{'open':<22}{'seconds':>9}{'hits':>6}")
+    print(f"{'cold':<22}{cold['seconds']:>9.3f}{cold['hits']:>6}")
+    print(f"{'warm, same process':<22}{warm['seconds']:>9.3f}{warm['hits']:>6}")
+    print(f"{'warm, other process':<22}{other['seconds']:>9.3f}{other['hits']:>6}")
+    print(f"Speedup: {cold['seconds'] / max(other['seconds'], 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Checks the peak memory of in-memory PDF parsing against the input size.
+
+Parses a synthetic PDF the way `parse_file` does: `PageExtractor.extract`
+with pdfplumber on the in-memory bytes, then the page texts written to a
+`ParsedOutputStore` and joined into the markdown result. The checked path
+uses a `PageExtractor` with one worker, which extracts in the calling
+process, so tracemalloc sees every allocation; it exits with an error if the peak
+exceeds `--max-ratio` times the PDF size. Peak memory is the input, the
+page texts and the layout objects of a single page, so the ratio falls as
+documents get longer.
+
+With `--workers N` (N > 1) the same document is also parsed by a process
+pool, as `parse_file` does for long documents. tracemalloc only sees the
+calling process there, so that row adds the peak resident memory of the
+largest worker process (from `getrusage`, whole-process, so it includes the
+interpreter and imports). `--compare-loader` also measures the previous
+temp file + `PDFPlumberLoader` path, which keeps the layout objects of
+every page.
+
+The formatting and store steps are also measured on their own against the
+size of the extracted text, and must stay under `--max-format-ratio`: the
+page texts are written to the store's file part by part and joined only
+once, for the returned result.
+
+Usage:
+    python benchmarks/parse_memory.py [--pages N] [--max-ratio R] [--max-format-ratio R]
+        [--workers N] [--compare-loader]
+"""
+
+import argparse
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Callable, List, Tuple
+
+from sample_pdf import synthetic_pdf
+from stub_llm import configure_environment
+
+if TYPE_CHECKING:
+    from BA.documents import PageExtractor, ParsedOutputStore
+
+
+def _format(page_texts: List[str], store: "ParsedOutputStore") -> int:
+    """The formatting and store steps of `parse_file`: parts written to the store, then joined once."""
+    from BA.documents import iter_page_parts
+
+    body_parts = ["### Extracted Content\n```text\n", *iter_page_parts(page_texts), "\n```\n\n---\n\n"]
+    path = store.put("0" * 64, body_parts, "benchmark.pdf", len(page_texts), "benchmark")
+    result = "".join(["## File Analysis: benchmark.pdf\n\n", *body_parts, f"\n**Content saved to:** `{path}`"])
+    return len(result.strip())
+
+
+def _parse_file(extractor: "PageExtractor", data: bytes, store: "ParsedOutputStore") -> int:
+    """The extraction, formatting and store steps of `parse_file`."""
+    return _format(extractor.extract(data, "pdfplumber"), store)
+
+
+def _loader(data: bytes) -> int:
+    from langchain_community.document_loaders import PDFPlumberLoader
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        documents = PDFPlumberLoader(temp_file.name).load()
+    return len("\n\n".join(doc.page_content for doc in documents if doc.page_content))
+
+
+def _measure(parse: Callable[[bytes], int], data: bytes) -> Tuple[int, int, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    characters = parse(data)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return characters, peak, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--max-ratio", type=float, default=64, help="Allowed peak memory / PDF size")
+    parser.add_argument(
+        "--max-format-ratio", type=float, default=2, help="Allowed formatting peak memory / text size"
+    )
+    parser.add_argument("--workers", type=int, default=0, help="Also parse with a pool of this many processes")
+    parser.add_argument("--compare-loader", action="store_true", help="Also measure PDFPlumberLoader (slow)")
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.documents import PageExtractor, ParsedOutputStore
+
+    store = ParsedOutputStore(tempfile.mkdtemp(prefix="parse_memory_"))
+    in_process = PageExtractor(workers=1)
+    paths = [("in-process", lambda data: _parse_file(in_process, data, store))]
+    pool = None
+    if args.workers > 1:
+        pool = PageExtractor(workers=args.workers, min_pages_per_worker=1)
+        paths.append(("pool", lambda data: _parse_file(pool, data, store)))
+    if args.compare_loader:
+        paths.append(("loader", _loader))
+    # Warm up imports and font metrics so that only per-document memory is measured
+    for _, parse in paths:
+        parse(synthetic_pdf(1))
+
+    data = synthetic_pdf(args.pages)
+    print(f"PDF: {args.pages} pages, {len(data) / 2**10:.0f} KB")
+    print(f"{'path':<10}{'characters':>12}{'peak MB':>10}{'peak/input':>12}{'seconds':>9}")
+
+    ratio = 0.0
+    for name, parse in paths:
+        characters, peak, seconds = _measure(parse, data)
+        print(f"{name:<10}{characters:>12}{peak / 2**20:>10.1f}{peak / len(data):>12.1f}{seconds:>9.2f}")
+        if name == "in-process":
+            ratio = peak / len(data)
+    if pool is not None:
+        # Worker memory is only reported once the workers have exited
+        pool.close()
+        worker_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        print(f"pool: largest worker peak RSS {worker_peak / 2**20:.1f} MB (not traced by tracemalloc)")
+
+    # The formatting and store steps alone, against the size of the extracted text
+    page_texts = in_process.extract(data, "pdfplumber")
+    text_size = sum(len(text) for text in page_texts)
+    _, format_peak, _ = _measure(lambda _: _format(page_texts, store), data)
+    format_ratio = format_peak / text_size
+    print(f"format and store: peak {format_peak / 2**20:.1f} MB, {format_ratio:.1f}x the text size")
+
+    if ratio > args.max_ratio:
+        sys.exit(f"Peak memory is {ratio:.1f}x the input size, above the limit of {args.max_ratio:g}x")
+    if format_ratio > args.max_format_ratio:
+        sys.exit(
+            f"Formatting peak memory is {format_ratio:.1f}x the text size, "
+            f"above the limit of {args.max_format_ratio:g}x"
+        )
+    print(
+        f"OK: peak memory is {ratio:.1f}x the input size (limit {args.max_ratio:g}x), "
+        f"formatting {format_ratio:.1f}x the text size (limit {args.max_format_ratio:g}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
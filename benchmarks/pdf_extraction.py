@@ -0,0 +1,66 @@
+"""
+Compares sequential and process-pool PDF page extraction.
+
+Extracts synthetic PDFs of 10, 100 and 500 pages once in the calling process
+(`workers=1`) and once with `PageExtractor` split across `--workers`
+processes, checks that both return the same page texts in the same order and
+reports the wall time and speedup. The pool is started and warmed up before
+timing, as it is in a long-running server. Speedup is bounded by the number
+of cores this process may run on, which is printed first; on a single core
+the pool can only add overhead.
+
+Usage:
+    python benchmarks/pdf_extraction.py [--pages 10 100 500] [--workers N] [--extractor pypdf|pdfplumber]
+"""
+
+import argparse
+import time
+
+from sample_pdf import synthetic_pdf
+from stub_llm import configure_environment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--workers", type=int, default=0, help="Pool size, 0 for one per available core")
+    parser.add_argument("--extractor", choices=("pypdf", "pdfplumber"), default="pypdf")
+    parser.add_argument("--min-pages-per-worker", type=int, default=16)
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.documents import PageExtractor
+    from BA.documents.extraction import available_cores
+
+    sequential = PageExtractor(workers=1)
+    pool = PageExtractor(workers=args.workers, min_pages_per_worker=args.min_pages_per_worker)
+    print(f"Available cores: {available_cores()}, pool workers: {pool.workers}, extractor: {args.extractor}")
+
+    # Start the worker processes and import the extractor in each of them
+    warmup = synthetic_pdf(pool.workers * pool.min_pages_per_worker, lines=1)
+    sequential.extract(warmup, args.extractor)
+    pool.extract(warmup, args.extractor)
+
+    print(f"{'pages':>6}{'ranges':>8}{'sequential s':>14}{'pool s':>9}{'speedup':>9}")
+    try:
+        for pages in args.pages:
+            data = synthetic_pdf(pages)
+            started = time.perf_counter()
+            expected = sequential.extract(data, args.extractor)
+            sequential_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            texts = pool.extract(data, args.extractor)
+            pool_seconds = time.perf_counter() - started
+
+            assert texts == expected, "Pool extraction differs from sequential extraction"
+            print(
+                f"{pages:>6}{len(pool.ranges(pages)):>8}{sequential_seconds:>14.2f}{pool_seconds:>9.2f}"
+                f"{sequential_seconds / pool_seconds:>8.2f}x"
+            )
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Records the pipeline's model traffic once, then replays it offline for timing.
+
+`record` runs the pipeline on a document with the configured models (or the
+stub with `--stub`) and saves every model call to a JSONL recording.
+`replay` runs the same pipeline from the recording without network access,
+with the recorded latency, a scaled one or a fixed injected latency, and
+reports per-stage and end-to-end timings. Replaying with `--latency 0`
+leaves only the orchestration overhead.
+
+By default the analysis pipeline is run directly on the document text;
+`--root` goes through the coordinator (upload, preview, confirmation).
+
+Usage:
+    python benchmarks/replay_pipeline.py record --document spec.pdf --recording .cache/spec.jsonl
+    python benchmarks/replay_pipeline.py replay --document spec.pdf --recording .cache/spec.jsonl --runs 5
+    python benchmarks/replay_pipeline.py replay ... --latency 0.5
+"""
+
+import argparse
+import asyncio
+import mimetypes
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from stub_llm import REPO_ROOT, configure_environment
+
+CONFIRMATION = "Yes, please proceed with the analysis."
+
+
+def _configure(args: argparse.Namespace) -> None:
+    """Sets the env vars read by `BA` at import time."""
+    if args.stub or args.command == "replay":
+        # Replay never calls a model, the stub only provides the model env vars
+        configure_environment()
+    elif REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.environ["BA_STAGE_CACHE_ENABLED"] = "false"
+    os.environ["BA_COALESCE_ENABLED"] = "false"
+    if args.command == "record":
+        if os.path.exists(args.recording):
+            os.remove(args.recording)
+        os.environ["BA_MODEL_RECORD_PATH"] = args.recording
+    else:
+        os.environ["BA_MODEL_REPLAY_PATH"] = args.recording
+        if args.latency is not None:
+            os.environ["BA_MODEL_REPLAY_LATENCY"] = str(args.latency)
+        os.environ["BA_MODEL_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+
+
+async def _run_once(args: argparse.Namespace, data: bytes) -> Dict[str, float]:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+    from BA.agent import analysis_pipeline, root_agent
+    from BA.api.jobs import document_text
+    from BA.pipeline import STAGE_TIMINGS_KEY
+
+    name = os.path.basename(args.document)
+    mime_type = mimetypes.guess_type(name)[0] or "text/plain"
+    agent = root_agent if args.root else analysis_pipeline
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+    state = {} if args.root else {"business_analyst_output": document_text(name, data)}
+    session = await runner.session_service.create_session(app_name="benchmark", user_id="benchmark", state=state)
+
+    messages = [types.Content(role="user", parts=[
+        types.Part(text=f"Please analyse {name}."),
+        types.Part(inline_data=types.Blob(mime_type=mime_type, data=data)),
+    ])]
+    if args.root:
+        messages.append(types.Content(role="user", parts=[types.Part(text=CONFIRMATION)]))
+
+    started = time.perf_counter()
+    for message in messages:
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+    elapsed = time.perf_counter() - started
+
+    session = await runner.session_service.get_session(
+        app_name="benchmark", user_id="benchmark", session_id=session.id
+    )
+    missing = [key for key in ("user_requirements_extraction", "ac_agent_output", "do_agent_output", "uc_agent_output")
+               if key not in session.state]
+    if missing:
+        print(f"warning: run finished without {', '.join(missing)}", file=sys.stderr)
+    return {**session.state.get(STAGE_TIMINGS_KEY, {}), "end_to_end": elapsed}
+
+
+async def _run(args: argparse.Namespace) -> None:
+    with open(args.document, "rb") as f:
+        data = f.read()
+
+    runs: List[Dict[str, float]] = []
+    for _ in range(args.runs if args.command == "replay" else 1):
+        runs.append(await _run_once(args, data))
+
+    from BA.models import model_recording
+    recording = model_recording(args.recording)
+
+    names = sorted({name for run in runs for name in run if name != "end_to_end"}) + ["end_to_end"]
+    print(f"{'stage':<20}{'median s':>10}{'min s':>10}{'max s':>10}")
+    for name in names:
+        values = [run[name] for run in runs if name in run]
+        print(f"{name:<20}{statistics.median(values):>10.3f}{min(values):>10.3f}{max(values):>10.3f}")
+    if args.command == "replay" and recording is not None:
+        print(
+            f"\n{recording.replayed} model calls replayed over {len(runs)} runs, "
+            f"{recording.replayed_latency:.3f}s injected model latency"
+        )
+    else:
+        print(f"\nRecording written to {args.recording}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record", "replay"])
+    parser.add_argument("--document", required=True, help="Document to analyse (.pdf, .md, .txt)")
+    parser.add_argument("--recording", required=True, help="JSONL recording file")
+    parser.add_argument("--root", action="store_true", help="Run through the coordinator agent")
+    parser.add_argument("--stub", action="store_true", help="Record the stub model instead of the configured models")
+    parser.add_argument("--runs", type=int, default=3, help="Replay runs")
+    parser.add_argument("--latency", type=float, help="Fixed injected latency per model call in seconds")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to the recorded latency")
+    args = parser.parse_args()
+
+    _configure(args)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures build and query time of the local BM25 requirement index.
+
+Usage:
+    python benchmarks/requirement_index.py
+"""
+
+import random
+import time
+
+from stub_llm import configure_environment
+
+configure_environment()
+
+from BA.pipeline.retrieval import RequirementIndex  # noqa: E402
+
+VOCABULARY = (
+    "order invoice payment customer account login report export approve reject refund shipment "
+    "inventory warehouse supplier notification email audit permission role dashboard search "
+    "schedule calendar contract document upload review status history price discount tax"
+).split()
+
+
+def synthetic_requirements(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"UR-{i:04d}",
+            "name": " ".join(rng.choices(VOCABULARY, k=4)),
+            "type": rng.choice(["functional", "non-functional"]),
+            "detail": "The system shall " + " ".join(rng.choices(VOCABULARY, k=30)),
+            "covered_usr": f"US-{i:04d}",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def main() -> None:
+    print(f"{'requirements':>12}{'build ms':>10}{'query ms':>10}")
+    for count in (500, 2000, 5000):
+        requirements = synthetic_requirements(count)
+        started = time.perf_counter()
+        index = RequirementIndex(requirements)
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(20):
+            index.search("customer approves refund for order payment", top_k=20)
+        query = (time.perf_counter() - started) / 20
+        print(f"{count:>12}{build * 1000:>10.1f}{query * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
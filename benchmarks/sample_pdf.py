@@ -0,0 +1,92 @@
+"""
+Synthetic text PDFs for the parsing benchmarks.
+
+Writes a minimal PDF by hand (Helvetica text and ruled tables, one content
+stream per page), so the benchmarks need no PDF authoring library.
+"""
+
+from typing import List
+
+LINE_TEMPLATE = (
+    "REQ-{page:03d}-{line:02d} The system shall let registered customers manage order {page}-{line} "
+    "with approval, invoicing and archiving."
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+TABLE_COLUMNS = (("ID", 40), ("Actor", 140), ("Permission", 300), (None, 560))
+
+
+def _table_commands(page: int, rows: int, top: int) -> list:
+    """Draws a ruled table of `rows` data rows below `top`."""
+    height = 14
+    bottom = top - (rows + 1) * height
+    commands = ["0.5 w"]
+    for row in range(rows + 2):
+        commands.append(f"40 {top - row * height} m 560 {top - row * height} l S")
+    for _, x in TABLE_COLUMNS:
+        commands.append(f"{x} {top} m {x} {bottom} l S")
+    cells = [[name for name, _ in TABLE_COLUMNS[:-1]]]
+    cells += [[f"P-{page:03d}-{row}", f"Role {row}", f"May approve orders up to {row * 100} EUR"] for row in range(rows)]
+    for row, values in enumerate(cells):
+        for (_, x), value in zip(TABLE_COLUMNS, values):
+            commands.append(f"BT /F1 8 Tf {x + 4} {top - row * height - 10} Td ({_escape(value)}) Tj ET")
+    return commands
+
+
+def _page_stream(page: int, lines: int, table_rows: int) -> bytes:
+    commands = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+    commands.append("(Acme Order Platform - Specification) Tj T* T*")
+    for line in range(lines):
+        commands.append(f"({_escape(LINE_TEMPLATE.format(page=page, line=line))}) Tj T*")
+    commands.append("ET")
+    if table_rows:
+        commands.extend(_table_commands(page, table_rows, 800 - (lines + 2) * 11 - 10))
+    commands.append(f"BT /F1 9 Tf 40 30 Td (Page {page}) Tj ET")
+    return "\n".join(commands).encode("latin-1")
+
+
+def synthetic_pdf(pages: int, lines: int = 60, table_rows: int = 0) -> bytes:
+    """
+    Builds a text PDF of `pages` pages.
+
+    Args:
+        pages: Number of pages
+        lines: Text lines per page, each about 110 characters
+        table_rows: Data rows of a ruled permissions table below the text, 0 for none
+
+    Returns:
+        bytes: The PDF file
+    """
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and its content per page
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(1, pages + 1):
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        stream = _page_stream(page, lines, table_rows)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /CropBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode("latin-1")
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("latin-1")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(output)
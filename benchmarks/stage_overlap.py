@@ -0,0 +1,89 @@
+"""
+Checks that the actor and data object stages of the pipeline run concurrently.
+
+Runs the analysis pipeline once against the stubbed model, which answers
+every request after `--latency` seconds, and records the `stage [...]` spans
+the scheduler opens around each stage. Prints the start and end of every
+stage relative to the run start and exits with an error unless the
+`ac_extraction` and `do_extraction` intervals overlap. The pipeline mode is
+read from `BA_PIPELINE_MODE` as in the server.
+
+Usage:
+    python benchmarks/stage_overlap.py [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Dict, Tuple
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from stub_llm import StubLlm, configure_environment
+
+SAMPLE_DOCUMENT = """## File Analysis: sample.pdf
+### Extracted Content
+Customers must be able to log in with their email and password.
+Administrators manage customer accounts."""
+
+
+async def _analyse() -> None:
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+    from BA.agent import analysis_pipeline
+
+    runner = InMemoryRunner(agent=analysis_pipeline, app_name="benchmark")
+    session = await runner.session_service.create_session(
+        app_name="benchmark", user_id="benchmark", state={"business_analyst_output": SAMPLE_DOCUMENT}
+    )
+    message = types.Content(role="user", parts=[types.Part(text="Analyse the document.")])
+    async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+        pass
+
+
+def _stage_intervals(exporter: InMemorySpanExporter) -> Dict[str, Tuple[float, float]]:
+    """Returns (start, end) in seconds since the first stage started, per stage name."""
+    spans = [span for span in exporter.get_finished_spans() if span.name.startswith("stage [")]
+    if not spans:
+        return {}
+    origin = min(span.start_time for span in spans)
+    return {
+        span.name[len("stage ["):-1]: ((span.start_time - origin) / 1e9, (span.end_time - origin) / 1e9)
+        for span in spans
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the stub model takes per request")
+    args = parser.parse_args()
+
+    # Installed before BA is imported, so the pipeline's spans are recorded here
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    configure_environment()
+    StubLlm.latency = args.latency
+    asyncio.run(_analyse())
+
+    intervals = _stage_intervals(exporter)
+    print(f"{'stage':<16}{'start':>8}{'end':>8}")
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: item[1]):
+        print(f"{name:<16}{start:>8.3f}{end:>8.3f}")
+
+    if "ac_extraction" not in intervals or "do_extraction" not in intervals:
+        sys.exit("The run did not record both the ac_extraction and do_extraction stages")
+    (ac_start, ac_end), (do_start, do_end) = intervals["ac_extraction"], intervals["do_extraction"]
+    overlap = min(ac_end, do_end) - max(ac_start, do_start)
+    if overlap <= 0:
+        sys.exit("ac_extraction and do_extraction ran one after the other")
+    print(f"OK: ac_extraction and do_extraction overlap for {overlap:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
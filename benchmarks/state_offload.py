@@ -0,0 +1,170 @@
+"""
+Measures session memory and persistence with and without artifact offloading.
+
+Analyses a synthetic 100-page document with the stub model, whose outputs are
+scaled up to the size of a real 100-page analysis. Every session gets its
+own revision of the document. Each configuration runs
+in its own process: an in-memory or SQLite session service, with the raw
+service or wrapped in `OffloadingSessionService`. Reports the Python memory
+retained after the run and at peak, the bytes written by the process
+(Linux only) and the bytes stored in the database and artifact store.
+
+Usage:
+    python benchmarks/state_offload.py [--pages N] [--sessions N] [--threshold BYTES]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from stub_llm import SAMPLE_OUTPUTS, configure_environment
+
+PAGE_TEMPLATE = (
+    "Section {page}.{index}: The system shall let registered customers manage order {page}-{index}, "
+    "including creation, approval by a supervisor, invoicing and archiving after {index} days. "
+)
+
+
+def synthetic_document(pages: int) -> str:
+    """Returns a document of `pages` pages of about 3,000 characters each."""
+    return "\n".join(
+        f"--- Page {page} ---\n" + "".join(PAGE_TEMPLATE.format(page=page, index=index) for index in range(16))
+        for page in range(1, pages + 1)
+    )
+
+
+def _scaled(item: dict, count: int) -> list:
+    items = []
+    for index in range(1, count + 1):
+        scaled = dict(item)
+        scaled["id"] = f"{item['id'].rsplit('-', 1)[0]}-{index:03d}"
+        scaled["name"] = f"{item['name']} {index}"
+        items.append(scaled)
+    return items
+
+
+def scale_outputs(pages: int) -> None:
+    """Grows the stub outputs in proportion to the document length."""
+    counts = {
+        "UserRequirementsOutput": ("requirements", pages * 4),
+        "ActorsOutput": ("actors", max(pages // 4, 1)),
+        "DataObjectsOutput": ("data_objects", pages),
+        "UseCasesOutput": ("use_cases", pages * 2),
+    }
+    for schema, (field, count) in counts.items():
+        SAMPLE_OUTPUTS[schema][field] = _scaled(SAMPLE_OUTPUTS[schema][field][0], count)
+
+
+def _written_bytes() -> int:
+    try:
+        with open("/proc/self/io", "r") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("wchar:"))
+    except (OSError, StopIteration):
+        return 0
+
+
+def _directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+async def _analyse(backend: str, offload: bool, pages: int, sessions: int, threshold: int) -> dict:
+    from google.adk.runners import Runner
+    from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+    from google.genai import types
+    from BA.agent import analysis_pipeline
+    from BA.pipeline.artifacts import ArtifactStore, OffloadingSessionService
+
+    workdir = tempfile.mkdtemp(prefix="ba-offload-")
+    db_path = os.path.join(workdir, "sessions.sqlite3")
+    artifacts = os.path.join(workdir, "artifacts")
+    document = synthetic_document(pages)
+
+    tracemalloc.start()
+    written = _written_bytes()
+    started = time.perf_counter()
+
+    if backend == "sqlite":
+        service = DatabaseSessionService(db_url=f"sqlite:///{db_path}")
+    else:
+        service = InMemorySessionService()
+    if offload:
+        service = OffloadingSessionService(service, ArtifactStore(artifacts), threshold)
+    runner = Runner(app_name="benchmark", agent=analysis_pipeline, session_service=service)
+
+    for index in range(sessions):
+        session = await service.create_session(
+            app_name="benchmark",
+            user_id="benchmark",
+            state={"business_analyst_output": f"Revision {index}\n{document}"},
+        )
+        message = types.Content(role="user", parts=[types.Part(text="Analyse the document.")])
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+        session = await service.get_session(app_name="benchmark", user_id="benchmark", session_id=session.id)
+        assert len(session.state.get("uc_agent_output")["use_cases"]) == pages * 2
+
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "retained_mb": retained / 2**20,
+        "peak_mb": peak / 2**20,
+        "written_mb": (_written_bytes() - written) / 2**20,
+        "stored_mb": _directory_bytes(workdir) / 2**20,
+        "seconds": seconds,
+    }
+
+
+def _run(backend: str, offload: bool, args: argparse.Namespace) -> dict:
+    env = dict(os.environ, BA_PIPELINE_MODE="direct")
+    command = [
+        sys.executable, __file__, "--child", "--backend", backend,
+        "--pages", str(args.pages), "--sessions", str(args.sessions), "--threshold", str(args.threshold),
+    ]
+    if offload:
+        command.append("--offload")
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=10, help="Documents analysed one after another")
+    parser.add_argument("--threshold", type=int, default=16 * 1024, help="Offload threshold in bytes")
+    parser.add_argument("--backend", choices=("memory", "sqlite"), help=argparse.SUPPRESS)
+    parser.add_argument("--offload", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        configure_environment()
+        scale_outputs(args.pages)
+        result = asyncio.run(_analyse(args.backend, args.offload, args.pages, args.sessions, args.threshold))
+        print(json.dumps(result))
+        return
+
+    print(f"{'backend':<10}{'offload':<9}{'retained MB':>12}{'peak MB':>10}{'written MB':>12}{'stored MB':>11}{'seconds':>9}")
+    for backend in ("memory", "sqlite"):
+        for offload in (False, True):
+            result = _run(backend, offload, args)
+            print(
+                f"{backend:<10}{'on' if offload else 'off':<9}{result['retained_mb']:>12.1f}{result['peak_mb']:>10.1f}"
+                f"{result['written_mb']:>12.1f}{result['stored_mb']:>11.1f}{result['seconds']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
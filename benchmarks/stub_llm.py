@@ -0,0 +1,131 @@
+"""
+Stubbed model shared by the offline benchmarks.
+
+`configure_environment()` must run before anything under `BA` is imported.
+It points every agent model env var at the stub and registers it with the
+ADK model registry, so the real agents run without Gemini access.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import AsyncGenerator, ClassVar, Dict, List
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse, LLMRegistry
+from google.genai import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODEL_ENV_VARS = [
+    "BA_VISTA_COORDINATOR_MODEL",
+    "UR_AGENT_MODEL",
+    "AC_AGENT_MODEL",
+    "DO_AGENT_MODEL",
+    "UC_AGENT_MODEL",
+]
+
+STUB_MODEL = "stub-model"
+
+# Minimal valid payload for every output schema used by the extraction agents
+SAMPLE_OUTPUTS: Dict[str, dict] = {
+    "UserRequirementsOutput": {
+        "requirements": [
+            {
+                "id": "UR-001",
+                "name": "User login",
+                "source": "Section 1",
+                "type": "functional",
+                "detail": "Registered users can log in with email and password.",
+                "covered_usr": "US-001",
+            }
+        ]
+    },
+    "ActorsOutput": {
+        "actors": [
+            {
+                "id": "AC-001",
+                "name": "Customer",
+                "role": "End user of the system",
+                "responsibilities": ["Logs in"],
+                "permissions": ["Read own account"],
+                "interactions": [],
+            }
+        ],
+        "actor_hierarchy": "Customer is the only actor.",
+        "stakeholder_summary": "Customers use the system.",
+    },
+    "DataObjectsOutput": {
+        "data_objects": [
+            {"id": "DO-001", "name": "Account", "description": "Customer credentials."}
+        ]
+    },
+    "UseCasesOutput": {
+        "use_cases": [
+            {
+                "id": "UC-001",
+                "name": "Log in",
+                "actors": ["Customer"],
+                "description": "Customer logs in.",
+                "preconditions": ["Customer is registered"],
+                "postconditions": ["Customer is authenticated"],
+            }
+        ]
+    },
+}
+
+
+def configure_environment() -> None:
+    """Points all agent models at the stub and makes `BA` importable."""
+    for var_name in MODEL_ENV_VARS:
+        os.environ[var_name] = STUB_MODEL
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "benchmark-project")
+    os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+    os.environ.setdefault("BA_STAGE_CACHE_ENABLED", "false")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    LLMRegistry.register(StubLlm)
+
+
+class StubLlm(BaseLlm):
+    """Answers like the real agents would, counting every invocation."""
+
+    calls: ClassVar[List[str]] = []
+    latency: ClassVar[float] = 0.0
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"stub-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        StubLlm.calls.append(llm_request.model or self.model)
+        if StubLlm.latency:
+            await asyncio.sleep(StubLlm.latency)
+
+        schema = llm_request.config.response_schema if llm_request.config else None
+        if schema is not None:
+            text = json.dumps(SAMPLE_OUTPUTS[schema.__name__])
+            if stream:
+                # Like Gemini SSE: partial text chunks, then the accumulated text
+                for start in range(0, len(text), 40):
+                    chunk = types.Part(text=text[start:start + 40])
+                    yield LlmResponse(content=types.Content(role="model", parts=[chunk]), partial=True)
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+            return
+
+        # Wrapper agents first call their extraction tool, then summarize
+        answered = any(
+            part.function_response
+            for content in llm_request.contents
+            for part in (content.parts or [])
+        )
+        if llm_request.tools_dict and not answered:
+            tool_name = next(iter(llm_request.tools_dict))
+            call = types.FunctionCall(name=tool_name, args={"request": "Extract from the content above."})
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+            return
+
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Done.")]))
@@ -0,0 +1,147 @@
+"""
+Times text ingestion of large markdown/text exports.
+
+Writes a synthetic export of `--mb` megabytes (headings, page markers and
+Windows-1252 punctuation, like a text export of a word processor document)
+and reads it three ways, printing seconds and peak Python memory (traced
+in a separate pass, so tracing does not skew the timings):
+
+- encoding loop: the former `read_document_content_tool` path, one
+  `read_text` per candidate encoding until one decodes
+- line reader: the former lazy reader, line by line through a text stream
+- sections: `iter_text_sections`, one read of a memory-mapped file split
+  into sections on the raw bytes
+
+Sections are checked to give back the same text as the line reader. The
+line reader limits sections in characters and the section splitter in
+bytes, so their part counts differ for non-ASCII text.
+
+Usage:
+    python benchmarks/text_ingestion.py [--mb N] [--encoding utf-8|cp1252] [--section-chars N]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+from stub_llm import configure_environment
+
+PARAGRAPH = (
+    "The “order service” shall validate every purchase order – including "
+    "line items, taxes and discounts – before it is forwarded to the approval workflow.\n"
+)
+
+_SECTION_START = re.compile(r"--- Page \d+ ---\s*$|#{1,6} ")
+
+
+def write_export(path: str, megabytes: int, encoding: str) -> None:
+    """Writes pages of headings and paragraphs until the file reaches `megabytes`."""
+    target = megabytes * 1024 * 1024
+    page = 0
+    with open(path, "w", encoding=encoding, newline="") as f:
+        while f.tell() < target:
+            page += 1
+            f.write(f"--- Page {page} ---\n## {page}. Order processing\n")
+            f.write(PARAGRAPH * 30)
+            f.write(f"### {page}.1 Approval rules\n")
+            f.write(PARAGRAPH * 20)
+
+
+def encoding_loop(path: str) -> Iterator[str]:
+    """The former tool path: the whole file is decoded once per encoding tried."""
+    for encoding in ("utf-8", "latin-1", "cp1252", "iso-8859-1"):
+        try:
+            yield Path(path).read_text(encoding=encoding)
+            return
+        except UnicodeDecodeError:
+            continue
+
+
+def line_reader(path: str, max_section_chars: int) -> Iterator[str]:
+    """The former lazy reader: sections assembled line by line from a text stream."""
+    from BA.documents.reader import text_encoding
+
+    with open(path, "r", encoding=text_encoding(path), errors="replace", newline="") as f:
+        lines: List[str] = []
+        size = 0
+        for line in f:
+            if lines and (size >= max_section_chars or _SECTION_START.match(line)):
+                yield "".join(lines)
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line)
+        if lines:
+            yield "".join(lines)
+
+
+def _digest(parts: Iterator[str]) -> str:
+    """Returns the SHA-256 of the concatenated parts, hashing one part at a time."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", errors="surrogatepass"))
+    return digest.hexdigest()
+
+
+def _measure(parts: Callable[[], Iterator[str]]) -> Tuple[int, int, float, int, str]:
+    """
+    Returns parts, characters, seconds, peak traced bytes and the digest of the text.
+
+    The timed pass only counts; memory is traced in a second pass that hashes the text.
+    """
+    started = time.perf_counter()
+    count = characters = 0
+    for part in parts():
+        count += 1
+        characters += len(part)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    digest = _digest(parts())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, characters, seconds, peak, digest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=300, help="Size of the synthetic export")
+    parser.add_argument("--encoding", choices=("utf-8", "cp1252"), default="cp1252")
+    parser.add_argument("--section-chars", type=int, default=4000)
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.documents import iter_text_sections
+
+    workdir = tempfile.mkdtemp(prefix="ba-text-")
+    path = os.path.join(workdir, "export.txt")
+    try:
+        write_export(path, args.mb, args.encoding)
+        size = os.path.getsize(path)
+        print(f"{size / 1024 / 1024:.0f} MB {args.encoding} export")
+        print(f"{'reader':<16}{'parts':>9}{'characters':>13}{'seconds':>9}{'peak MB':>9}")
+        results = {}
+        readers = (
+            ("encoding loop", lambda: encoding_loop(path)),
+            ("line reader", lambda: line_reader(path, args.section_chars)),
+            ("sections", lambda: iter_text_sections(path, args.section_chars)),
+        )
+        for name, parts in readers:
+            count, characters, seconds, peak, digest = _measure(parts)
+            results[name] = digest
+            print(f"{name:<16}{count:>9}{characters:>13}{seconds:>9.2f}{peak / 1024 / 1024:>9.1f}")
+        if results["sections"] != results["line reader"]:
+            raise SystemExit("Sections differ from the line reader output")
+        print("OK: sections match the line reader output")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares the size of the `uc_agent` prompt with full and compact upstream context.
+
+Builds synthetic stage outputs of increasing size and reports the estimated
+input tokens of `USE_CASES_PROMPT` with the full blobs injected (as ADK does
+for `{key}` placeholders) against `USE_CASES_COMPACT_PROMPT`.
+
+Usage:
+    python benchmarks/uc_context_tokens.py
+"""
+
+from typing import Any, Dict
+
+from stub_llm import configure_environment
+
+configure_environment()
+
+from BA.pipeline.chunking import estimate_tokens  # noqa: E402
+from BA.sub_agents.uc_agent.context import build_use_case_context  # noqa: E402
+from BA.sub_agents.uc_agent.prompt import USE_CASES_PROMPT, USE_CASES_COMPACT_PROMPT  # noqa: E402
+
+
+def sample_outputs(requirements: int) -> Dict[str, Any]:
+    """Builds stage outputs shaped like real ones, with verbose free-text fields."""
+    actors = max(1, requirements // 5)
+    data_objects = max(1, requirements // 3)
+    return {
+        "user_requirements_extraction": {
+            "requirements": [
+                {
+                    "id": f"UR-{i:03d}",
+                    "name": f"Requirement {i} for order processing",
+                    "source": f"Section {i % 12 + 1}, page {i % 40 + 1}",
+                    "type": "functional" if i % 4 else "non-functional",
+                    "detail": (
+                        f"The system shall let the user complete step {i} of the order workflow. "
+                        "Acceptance criteria: the action is validated, persisted, audited and "
+                        "confirmed to the user within two seconds under normal load."
+                    ),
+                    "covered_usr": f"US-{i:03d}, US-{i + 1:03d}",
+                }
+                for i in range(1, requirements + 1)
+            ]
+        },
+        "ac_agent_output": {
+            "actors": [
+                {
+                    "id": f"AC-{i:03d}",
+                    "name": f"Actor {i}",
+                    "role": "Processes customer orders",
+                    "responsibilities": ["Creates orders", "Reviews order status", "Handles returns"],
+                    "permissions": ["Read orders", "Write orders"],
+                    "interactions": [
+                        {
+                            "target": f"Actor {i + 1}",
+                            "interaction_type": "reports to",
+                            "description": "Escalates orders that cannot be fulfilled automatically.",
+                        }
+                    ],
+                }
+                for i in range(1, actors + 1)
+            ],
+            "actor_hierarchy": "Actors escalate to the next actor in the chain. " * 5,
+            "stakeholder_summary": "Stakeholders include customers, staff and managers. " * 5,
+        },
+        "do_agent_output": {
+            "data_objects": [
+                {"id": f"DO-{i:03d}", "name": f"Entity {i}", "description": "Stores order related data."}
+                for i in range(1, data_objects + 1)
+            ]
+        },
+    }
+
+
+def main() -> None:
+    print(f"{'requirements':>12}{'full tokens':>13}{'compact tokens':>16}{'saved':>8}")
+    for requirements in (10, 50, 200, 1000):
+        state = sample_outputs(requirements)
+        full = USE_CASES_PROMPT.format(**{key: str(value) for key, value in state.items()})
+        compact = USE_CASES_COMPACT_PROMPT.replace("{use_case_context}", build_use_case_context(state))
+        full_tokens, compact_tokens = estimate_tokens(full), estimate_tokens(compact)
+        print(
+            f"{requirements:>12}{full_tokens:>13}{compact_tokens:>16}"
+            f"{1 - compact_tokens / full_tokens:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares disk use, writes and memory of saving repeated uploads.
+
+Saves the same base64-encoded document `--uploads` times, as
+`save_document_files_tool` receives it in `inline_data`, first the former
+way (whole payload decoded in memory, a new file per upload), then
+through the content-addressed `UploadStore`. Prints seconds, disk space
+used by the saved files, bytes written and the peak Python memory on top
+of the payload.
+
+Usage:
+    python benchmarks/upload_dedup.py [--mb N] [--uploads N]
+"""
+
+import argparse
+import base64
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+from stub_llm import configure_environment
+
+
+def _disk_usage(*directories: str) -> int:
+    """Bytes allocated by the files under `directories`, counting hard-linked files once."""
+    inodes = {}
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                stat = os.lstat(os.path.join(root, name))
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_blocks * 512
+    return sum(inodes.values())
+
+
+def _measure(save: Callable[[], int]) -> Tuple[int, float, int]:
+    """Returns the bytes written, seconds and peak traced memory of `save`."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    written = save()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return written, seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=50, help="Size of the uploaded document")
+    parser.add_argument("--uploads", type=int, default=10, help="Times the same document is uploaded")
+    args = parser.parse_args()
+
+    configure_environment()
+    from BA.documents import UploadStore, iter_base64_chunks
+
+    payload = base64.b64encode(b"%PDF-1.7\n" + os.urandom(args.mb * 1024 * 1024)).decode("ascii")
+    workdir = tempfile.mkdtemp(prefix="ba-uploads-")
+    try:
+        former_dir = os.path.join(workdir, "former")
+        os.makedirs(former_dir)
+
+        def save_former() -> int:
+            written = 0
+            for number in range(args.uploads):
+                written += Path(former_dir, f"document_{number}.pdf").write_bytes(base64.b64decode(payload))
+            return written
+
+        session_dir = os.path.join(workdir, "session")
+        os.makedirs(session_dir)
+        store = UploadStore(os.path.join(workdir, "store"))
+
+        def save_store() -> int:
+            for number in range(args.uploads):
+                store.save(lambda: iter_base64_chunks(payload), ".pdf", os.path.join(session_dir, f"document_{number}.pdf"))
+            return store.stats()["bytes_written"]
+
+        print(f"{args.uploads} uploads of a {args.mb} MB document")
+        print(f"{'save':<16}{'seconds':>9}{'disk MB':>9}{'written MB':>12}{'peak MB':>9}")
+        for name, save, directories in (
+            ("former", save_former, [former_dir]),
+            ("upload store", save_store, [session_dir, store.root]),
+        ):
+            written, seconds, peak = _measure(save)
+            disk = _disk_usage(*directories)
+            print(f"{name:<16}{seconds:>9.2f}{disk / 2**20:>9.1f}{written / 2**20:>12.1f}{peak / 2**20:>9.1f}")
+        print(f"upload store: {store.stats()}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
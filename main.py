@@ -1,8 +1,25 @@
 import os
+from contextlib import ExitStack, asynccontextmanager
 
 import uvicorn
+from google.adk.cli import fast_api as adk_fast_api
 from google.adk.cli.fast_api import get_fast_api_app
 
+from BA.agent import analysis_pipeline
+from BA.api import JobStore, JobWorkerPool, create_jobs_router, create_metrics_router, create_stream_router
+from BA.config import (
+    ARTIFACT_OFFLOAD_BYTES,
+    ARTIFACT_OFFLOAD_ENABLED,
+    ARTIFACT_STORE_PATH,
+    JOBS_DB_PATH,
+    JOB_CONCURRENCY,
+    JOB_LEASE_SECONDS,
+    TRACE_SAMPLE_RATE,
+    TRACE_STORAGE_SPANS,
+)
+from BA.pipeline import ArtifactStore, offloading_session_services
+from BA.telemetry import configure_trace_sampling
+
 # Get the directory where main.py is located
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Example session DB URL (e.g., SQLite)
@@ -12,14 +29,43 @@ ALLOWED_ORIGINS = ["http://localhost", "http://localhost:8080", "*"]
 # Set web=True if you intend to serve a web interface, False otherwise
 SERVE_WEB_INTERFACE = True
 
-# Call the function to get the FastAPI app instance
-# Ensure the agent directory name ('capital_agent') matches your agent folder
-app = get_fast_api_app(
-    agents_dir=AGENT_DIR,
-    # session_db_url=SESSION_DB_URL,
-    allow_origins=ALLOWED_ORIGINS,
-    web=SERVE_WEB_INTERFACE,
-)
+# Bounded worker pool for batch analysis jobs; queued work is persisted in SQLite
+job_pool = JobWorkerPool(JobStore(JOBS_DB_PATH, JOB_LEASE_SECONDS), analysis_pipeline, JOB_CONCURRENCY)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await job_pool.start()
+    try:
+        yield
+    finally:
+        await job_pool.stop()
+
+# Trace sampling is read by the tracer provider that get_fast_api_app creates
+configure_trace_sampling(TRACE_SAMPLE_RATE, TRACE_STORAGE_SPANS)
+
+# Large session state values of the ADK app are offloaded like those of the job and streaming runners
+with ExitStack() as session_setup:
+    if ARTIFACT_OFFLOAD_ENABLED:
+        session_setup.enter_context(
+            offloading_session_services(adk_fast_api, ArtifactStore(ARTIFACT_STORE_PATH), ARTIFACT_OFFLOAD_BYTES)
+        )
+    # Call the function to get the FastAPI app instance
+    # Ensure the agent directory name ('capital_agent') matches your agent folder
+    app = get_fast_api_app(
+        agents_dir=AGENT_DIR,
+        # session_db_url=SESSION_DB_URL,
+        allow_origins=ALLOWED_ORIGINS,
+        web=SERVE_WEB_INTERFACE,
+        lifespan=lifespan,
+    )
+
+# Batch analysis job endpoints: POST /jobs, GET /jobs/{job_id}, GET /jobs/{job_id}/documents/{index}
+app.include_router(create_jobs_router(job_pool))
+# Streams each extracted item over SSE as soon as it is validated: POST /analyses/stream
+app.include_router(create_stream_router(analysis_pipeline))
+# Prometheus scrape endpoint: GET /metrics
+app.include_router(create_metrics_router())
 
 # You can add more FastAPI routes or configurations below if needed
 # Example: